@@ -6,4 +6,6 @@ docker compose run node npx gulp copyAssets;
 
 # Collect assets
 docker compose build
-docker compose run app python manage.py collectstatic --noinput
+# without DEBUG, as the deployed app runs, so that the manifest of hashed
+# names is written
+docker compose run -e DJANGO_DEBUG=False app python manage.py collectstatic --noinput
@@ -8,6 +8,9 @@ from django.contrib.auth.decorators import login_required
 import requests
 
 from cachetools.func import ttl_cache
+from prometheus_client import Counter, Gauge
+
+from registrar.utility.tracing import span
 
 
 DOMAIN_FILE_URL = (
@@ -27,6 +30,18 @@ DOMAIN_API_MESSAGES = {
     "success": "That domain is available!",
 }
 
+DOMAIN_LIST_LOOKUPS = Counter(
+    "domain_list_lookups_total",
+    "Lookups in the list of current .gov domains, by whether it was cached",
+    ["result"],
+)
+DOMAIN_LIST_FETCHED = Gauge(
+    "domain_list_fetched_timestamp_seconds",
+    "When the list of current .gov domains was last fetched, by the "
+    "process with the oldest copy",
+    multiprocess_mode="livemin",
+)
+
 
 # this file doesn't change that often, nor is it that big, so cache the result
 # in memory for ten minutes
@@ -39,7 +54,8 @@ def _domains():
     """
     DraftDomain = apps.get_model("registrar.DraftDomain")
     # 5 second timeout
-    file_contents = requests.get(DOMAIN_FILE_URL, timeout=5).text
+    with span("http", method="GET", url=DOMAIN_FILE_URL):
+        file_contents = requests.get(DOMAIN_FILE_URL, timeout=5).text
     domains = set()
     # skip the first line
     for line in file_contents.splitlines()[1:]:
@@ -49,6 +65,17 @@ def _domains():
         if DraftDomain.string_could_be_domain(domain):
             # lowercase everything when we put it in domains
             domains.add(domain.lower())
+    DOMAIN_LIST_FETCHED.set_to_current_time()
+    return domains
+
+
+def _cached_domains():
+    """Return `_domains()`, counting whether it had to be fetched."""
+    # another thread may fetch in between, which only skews the count
+    misses = _domains.cache_info().misses
+    domains = _domains()
+    fetched = _domains.cache_info().misses != misses
+    DOMAIN_LIST_LOOKUPS.labels("miss" if fetched else "hit").inc()
     return domains
 
 
@@ -61,10 +88,10 @@ def in_domains(domain):
     """
     domain = domain.lower()
     if domain.endswith(".gov"):
-        return domain.lower() in _domains()
+        return domain.lower() in _cached_domains()
     else:
         # domain search string doesn't end with .gov, add it on here
-        return (domain + ".gov") in _domains()
+        return (domain + ".gov") in _cached_domains()
 
 
 @require_http_methods(["GET"])
@@ -11,11 +11,14 @@ from jwkest.jwk import RSAKey  # type: ignore
 from oic import oic, rndstr, utils
 from oic.oauth2 import ErrorResponse
 from oic.oic import AuthorizationRequest, AuthorizationResponse, RegistrationResponse
-from oic.oic.message import AccessTokenResponse
+from oic.oic.message import AccessTokenResponse, ProviderConfigurationResponse
 from oic.utils.authn.client import CLIENT_AUTHN_METHOD
 from oic.utils import keyio
 
+from registrar.utility.tracing import span
+
 from . import exceptions as o_e
+from .provider_cache import CachedKeyBundle, ProviderCache
 
 __author__ = "roland"
 
@@ -71,7 +74,12 @@ class Client(oic.Client):
 
         try:
             # discover and store the provider (OP) urls, etc
-            self.provider_config(provider["srv_discovery_url"])
+            # this is usually read from the shared cache, not from the OP
+            self.provider_cache = ProviderCache(
+                provider["srv_discovery_url"], verify_ssl=verify_ssl
+            )
+            self.load_provider(self.provider_cache.get_or_fetch())
+            self.provider_cache.add_listener(self.load_provider)
             self.store_registration_info(
                 RegistrationResponse(**provider["client_registration"])
             )
@@ -83,6 +91,15 @@ class Client(oic.Client):
             )
             raise o_e.InternalError()
 
+    def load_provider(self, entry):
+        """Configure endpoints and signing keys from a provider cache entry."""
+        pcr = ProviderConfigurationResponse(**entry["provider_info"])
+        self.handle_provider_config(pcr, self.provider_cache.issuer, keys=False)
+        # replace, rather than add to, any keys we had for this issuer
+        self.keyjar.issuer_keys[self.issuer] = [
+            CachedKeyBundle(self.provider_cache, entry["jwks"])
+        ]
+
     def create_authn_request(
         self,
         session,
@@ -112,12 +129,12 @@ class Client(oic.Client):
             logger.error("Failed to assemble request arguments for %s" % state)
             raise o_e.InternalError(locator=state)
 
-        logger.debug("request args: %s" % request_args)
+        logger.debug("request args: %s", request_args)
 
         try:
             # prepare the request for sending
             cis = self.construct_AuthorizationRequest(request_args=request_args)
-            logger.debug("request: %s" % cis)
+            logger.debug("request: %s", cis)
 
             # obtain the url and headers from the prepared request
             url, body, headers, cis = self.uri_and_body(
@@ -126,9 +143,9 @@ class Client(oic.Client):
                 method="GET",
                 request_args=request_args,
             )
-            logger.debug("body: %s" % body)
-            logger.debug("URL: %s" % url)
-            logger.debug("headers: %s" % headers)
+            logger.debug("body: %s", body)
+            logger.debug("URL: %s", url)
+            logger.debug("headers: %s", headers)
         except Exception as err:
             logger.error(err)
             logger.error("Failed to prepare request for %s" % state)
@@ -177,7 +194,7 @@ class Client(oic.Client):
                 logger.error("Unable to process response %s for %s" % (error, state))
                 raise o_e.AuthenticationFailed(locator=state)
 
-        logger.debug("authn_response %s" % authn_response)
+        logger.debug("authn_response %s", authn_response)
 
         if not authn_response.get("state", None):
             logger.error("State value not received from OP for %s" % state)
@@ -222,7 +239,7 @@ class Client(oic.Client):
             )
             raise o_e.AuthenticationFailed(locator=state)
 
-        logger.debug("user info: %s" % info_response)
+        logger.debug("user info: %s", info_response)
         return info_response.to_dict()
 
     def _request_token(self, state, code, session):
@@ -252,7 +269,7 @@ class Client(oic.Client):
             )
             raise o_e.AuthenticationFailed(locator=state)
 
-        logger.debug("token response %s" % token_response)
+        logger.debug("token response %s", token_response)
 
         try:
             # get the token and other bits of info
@@ -273,6 +290,13 @@ class Client(oic.Client):
             logger.error("Unable to parse access token response for %s" % state)
             raise o_e.AuthenticationFailed(locator=state)
 
+    def http_request(self, url, method="GET", **kwargs):
+        """Make a request to the provider, as part of the current trace."""
+        with span("http", method=method, url=url) as attributes:
+            response = super().http_request(url, method, **kwargs)
+            attributes["status"] = response.status_code
+            return response
+
     def store_response(self, resp, info):
         """Make raw ID token available for internal use."""
         if isinstance(resp, AccessTokenResponse):
@@ -0,0 +1,243 @@
+"""Keep OpenID Connect provider metadata and signing keys close at hand.
+
+Discovering the provider (OP) means fetching its configuration document
+and then its JSON Web Key Set. Doing that whenever a worker boots, or on
+the login callback, puts Login.gov on the critical path of both.
+
+`ProviderCache` stores both documents in a Django cache which is shared
+between workers and survives restarts (see `OIDC_CACHE_ALIAS` in settings).
+Entries are refreshed in the background shortly before they expire, and
+the key set is refetched promptly when a token arrives signed by a key
+we have not seen before.
+"""
+
+import logging
+import threading
+import time
+
+import requests
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from oic.utils import keyio
+
+logger = logging.getLogger(__name__)
+
+# where provider information is found, relative to the issuer
+DISCOVERY_PATH = "/.well-known/openid-configuration"
+
+
+class ProviderCache:
+    """Fetch, store and refresh the configuration and keys of one OP."""
+
+    KEY_PREFIX = "djangooidc:provider:"
+
+    def __init__(self, issuer, verify_ssl=True, timeout=5):
+        self.issuer = issuer.rstrip("/")
+        self.verify_ssl = verify_ssl
+        self.timeout = timeout
+        # seconds that a cached entry may be used for
+        self.max_age = getattr(settings, "OIDC_CACHE_TIMEOUT", 43200)
+        # seconds before expiry that the background refresh happens
+        self.refresh_margin = getattr(settings, "OIDC_CACHE_REFRESH_MARGIN", 3600)
+        # seconds to wait between refetches triggered by unknown key ids
+        self.min_refetch_interval = getattr(
+            settings, "OIDC_CACHE_MIN_REFETCH_INTERVAL", 60
+        )
+        self._last_refetch = 0.0
+        self._listeners = []
+        self._refresher = None
+        self._awaiting_refresh = False
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "OIDC_CACHE_ALIAS", "default")]
+
+    @property
+    def key(self):
+        return self.KEY_PREFIX + self.issuer
+
+    def get(self):
+        """Return the cached entry, or None if there is no usable entry.
+
+        An entry is a dict with keys `provider_info`, `jwks` and `fetched_at`.
+        """
+        try:
+            entry = self.cache.get(self.key)
+        except Exception:
+            # for example, the cache table has not been created yet
+            logger.warning("Unable to read OP cache for %s", self.issuer, exc_info=True)
+            return None
+        if entry and time.time() - entry["fetched_at"] < self.max_age:
+            return entry
+        return None
+
+    def set(self, entry):
+        """Share an entry with every other worker."""
+        try:
+            # keep it in the cache a while longer than max_age, so that a
+            # stale copy is still available if the OP is unreachable
+            self.cache.set(self.key, entry, timeout=self.max_age * 2)
+        except Exception:
+            logger.warning(
+                "Unable to write OP cache for %s", self.issuer, exc_info=True
+            )
+
+    def fetch(self):
+        """Ask the OP for its configuration and key set."""
+        response = requests.get(
+            self.issuer + DISCOVERY_PATH, timeout=self.timeout, verify=self.verify_ssl
+        )
+        response.raise_for_status()
+        provider_info = response.json()
+
+        response = requests.get(
+            provider_info["jwks_uri"], timeout=self.timeout, verify=self.verify_ssl
+        )
+        response.raise_for_status()
+        jwks = response.json()
+        if "keys" not in jwks:
+            raise ValueError("No 'keys' in JWKS from %s" % provider_info["jwks_uri"])
+
+        logger.info("Fetched provider configuration and keys for %s", self.issuer)
+        return {"provider_info": provider_info, "jwks": jwks, "fetched_at": time.time()}
+
+    def refresh(self):
+        """Fetch a new entry, store it, and tell any listeners about it."""
+        entry = self.fetch()
+        self.set(entry)
+        self._notify(entry)
+        return entry
+
+    def get_or_fetch(self):
+        """Return the cached entry if there is one, otherwise go to the OP."""
+        return self.get() or self.refresh()
+
+    def refetch_for_unknown_kid(self, kid):
+        """Refresh the key set because a token was signed with `kid`.
+
+        Rate limited so that a stream of bad tokens cannot turn us into
+        a client which hammers the OP.
+        """
+        now = time.time()
+        if now - self._last_refetch < self.min_refetch_interval:
+            return None
+        self._last_refetch = now
+        logger.info("Unknown key id %s from %s, refetching keys", kid, self.issuer)
+        # another worker may have already done the work
+        entry = self.get()
+        if entry and kid in _kids(entry["jwks"]):
+            self._notify(entry)
+            return entry
+        try:
+            return self.refresh()
+        except Exception:
+            logger.warning("Unable to refetch keys for %s", self.issuer, exc_info=True)
+            return None
+
+    def add_listener(self, callback):
+        """Call `callback(entry)` whenever a new entry is loaded."""
+        self._listeners.append(callback)
+
+    def _notify(self, entry):
+        for callback in self._listeners:
+            callback(entry)
+
+    def seconds_until_refresh(self, entry):
+        """How long until `entry` should be refreshed (may be negative)."""
+        expires_at = entry["fetched_at"] + self.max_age
+        return expires_at - self.refresh_margin - time.time()
+
+    def start_background_refresh(self):
+        """Start a daemon thread which keeps the cached entry fresh.
+
+        Threads do not survive a fork, so call this in each worker process,
+        as wsgi.py does.
+        """
+        if self._refresher is not None and self._refresher.is_alive():
+            return
+        self._refresher = threading.Thread(
+            target=self._refresh_forever,
+            name="oidc-provider-refresh",
+            daemon=True,
+        )
+        self._refresher.start()
+
+    def _refresh_forever(self):
+        while True:
+            try:
+                delay = self._refresh_once()
+            except Exception:
+                logger.warning(
+                    "Background refresh failed for %s", self.issuer, exc_info=True
+                )
+                delay = self.min_refetch_interval
+            finally:
+                # this thread has connections of its own, which would be held
+                # open for hours while it sleeps
+                connections.close_all()
+            time.sleep(delay)
+
+    def _refresh_once(self):
+        """Refresh the entry if it is due. Returns seconds until it is next due."""
+        entry = self.get()
+        if entry and self._awaiting_refresh:
+            # another worker refreshed it while this one waited
+            self._awaiting_refresh = False
+            self._notify(entry)
+        if entry:
+            delay = self.seconds_until_refresh(entry)
+            if delay > 0:
+                return delay
+        # only one worker needs to talk to the OP; the others will
+        # find the new entry in the shared cache when they wake up
+        lock = self.key + ":lock"
+        if self.cache.add(lock, True, timeout=self.min_refetch_interval):
+            try:
+                self.refresh()
+            finally:
+                self.cache.delete(lock)
+            return 0
+        self._awaiting_refresh = True
+        return self.min_refetch_interval
+
+
+class CachedKeyBundle(keyio.KeyBundle):
+    """
+    A bundle of the OP's signing keys, loaded from a `ProviderCache`.
+
+    oic calls `update` when it cannot find a key with the id in a token
+    header; rather than fetching the key set ourselves, we let the
+    provider cache decide whether and how to refetch it.
+    """
+
+    def __init__(self, provider_cache, jwks, **kwargs):
+        super().__init__(keys=jwks["keys"], **kwargs)
+        self.provider_cache = provider_cache
+
+    def get_key_with_kid(self, kid):
+        for key in self._keys:
+            if key.kid == kid:
+                return key
+        entry = self.provider_cache.refetch_for_unknown_kid(kid)
+        if entry:
+            self.reload(entry["jwks"])
+        for key in self._keys:
+            if key.kid == kid:
+                return key
+        return None
+
+    def update(self):
+        """Keys come from the provider cache. Never fetch them here."""
+        return False
+
+    def reload(self, jwks):
+        """Replace the keys in this bundle."""
+        self._keys = []
+        self.do_keys(jwks["keys"])
+        self.last_updated = time.time()
+
+
+def _kids(jwks):
+    return [key.get("kid") for key in jwks.get("keys", [])]
@@ -0,0 +1,100 @@
+"""A tiny OpenID Connect provider (OP) for tests.
+
+It serves only the discovery document and the key set, which is all
+that is needed to exercise provider discovery and key caching.
+"""
+
+import json
+import threading
+
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from Cryptodome.PublicKey import RSA
+from jwkest.jwk import RSAKey  # type: ignore
+from oic import rndstr
+
+
+class MockOP:
+    """Run an OP on localhost in a background thread.
+
+    Usage:
+        with MockOP() as op:
+            ProviderCache(op.issuer).get_or_fetch()
+            self.assertEqual(op.requests["/jwks"], 1)
+    """
+
+    def __init__(self):
+        self.requests = Counter()
+        self.keys = []
+        self.rotate_key()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = None
+
+    @property
+    def issuer(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def rotate_key(self):
+        """Start signing with a new key. Returns the new key id."""
+        kid = rndstr(size=8)
+        self.keys.append(RSAKey(key=RSA.generate(2048), kid=kid, use="sig"))
+        return kid
+
+    def configuration(self):
+        return {
+            "issuer": self.issuer,
+            "authorization_endpoint": self.issuer + "/authorize",
+            "token_endpoint": self.issuer + "/token",
+            "userinfo_endpoint": self.issuer + "/userinfo",
+            "end_session_endpoint": self.issuer + "/logout",
+            "jwks_uri": self.issuer + "/jwks",
+            "response_types_supported": ["code"],
+            "subject_types_supported": ["pairwise"],
+            "id_token_signing_alg_values_supported": ["RS256"],
+        }
+
+    def jwks(self):
+        return {"keys": [key.serialize() for key in self.keys]}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _handler(self):
+        op = self
+
+        class Handler(BaseHTTPRequestHandler):
+            routes = {
+                "/.well-known/openid-configuration": op.configuration,
+                "/jwks": op.jwks,
+            }
+
+            def do_GET(self):
+                op.requests[self.path] += 1
+                if self.path not in self.routes:
+                    self.send_error(404)
+                    return
+                body = json.dumps(self.routes[self.path]()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,108 @@
+import time
+from unittest.mock import patch
+
+from Cryptodome.PublicKey import RSA
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from djangooidc.oidc import Client
+from djangooidc import provider_cache
+from djangooidc.provider_cache import CachedKeyBundle, ProviderCache
+
+from .common import less_console_noise
+from .mock_op import MockOP
+
+LOCAL_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+@override_settings(
+    CACHES=LOCAL_CACHE,
+    OIDC_CACHE_ALIAS="default",
+    OIDC_CACHE_BACKGROUND_REFRESH=False,
+)
+class ProviderCacheTest(TestCase):
+    def setUp(self):
+        self.op = MockOP().start()
+        self.addCleanup(self.op.stop)
+
+    def test_fetch_once_for_all_workers(self):
+        """A second worker reads the entry written by the first."""
+        first = ProviderCache(self.op.issuer).get_or_fetch()
+        second = ProviderCache(self.op.issuer).get_or_fetch()
+        self.assertEqual(first, second)
+        self.assertEqual(self.op.requests["/.well-known/openid-configuration"], 1)
+        self.assertEqual(self.op.requests["/jwks"], 1)
+
+    def test_expired_entry_is_refetched(self):
+        cache = ProviderCache(self.op.issuer)
+        entry = cache.fetch()
+        entry["fetched_at"] -= cache.max_age + 1
+        cache.set(entry)
+        self.assertIsNone(cache.get())
+        cache.get_or_fetch()
+        self.assertEqual(self.op.requests["/jwks"], 2)
+
+    def test_refresh_is_due_before_expiry(self):
+        cache = ProviderCache(self.op.issuer)
+        entry = cache.fetch()
+        entry["fetched_at"] = time.time() - cache.max_age + cache.refresh_margin / 2
+        self.assertLess(cache.seconds_until_refresh(entry), 0)
+        # but it is still usable until it actually expires
+        cache.set(entry)
+        self.assertIsNotNone(cache.get())
+
+    def test_unknown_kid_refetches_keys(self):
+        cache = ProviderCache(self.op.issuer)
+        bundle = CachedKeyBundle(cache, cache.get_or_fetch()["jwks"])
+        new_kid = self.op.rotate_key()
+        with less_console_noise():
+            key = bundle.get_key_with_kid(new_kid)
+        self.assertEqual(key.kid, new_kid)
+        self.assertEqual(self.op.requests["/jwks"], 2)
+
+    def test_unknown_kid_refetch_is_rate_limited(self):
+        cache = ProviderCache(self.op.issuer)
+        bundle = CachedKeyBundle(cache, cache.get_or_fetch()["jwks"])
+        with less_console_noise():
+            self.assertIsNone(bundle.get_key_with_kid("nonsense"))
+            self.assertIsNone(bundle.get_key_with_kid("nonsense"))
+        self.assertEqual(self.op.requests["/jwks"], 2)
+
+    def test_connections_are_closed_before_sleeping(self):
+        cache = ProviderCache(self.op.issuer)
+        cache.get_or_fetch()
+        calls = []
+
+        def sleep(seconds):
+            calls.append("sleep")
+            raise StopIteration
+
+        with patch.object(
+            provider_cache.connections,
+            "close_all",
+            side_effect=lambda: calls.append("close"),
+        ), patch.object(provider_cache.time, "sleep", side_effect=sleep):
+            with self.assertRaises(StopIteration):
+                cache._refresh_forever()
+        self.assertEqual(calls, ["close", "sleep"])
+
+    def test_client_cold_start_uses_cache(self):
+        """Once the cache is warm, creating a client does not contact the OP."""
+        provider = {
+            "srv_discovery_url": self.op.issuer,
+            "behaviour": settings.OIDC_PROVIDERS["login.gov"]["behaviour"],
+            "client_registration": {
+                **settings.OIDC_PROVIDERS["login.gov"]["client_registration"],
+                "sp_private_key": RSA.generate(2048).export_key(),
+            },
+        }
+        with override_settings(OIDC_PROVIDERS={"mock": provider}):
+            Client("mock")
+            self.op.stop()
+            client = Client("mock")
+        self.assertEqual(self.op.requests["/jwks"], 1)
+        self.assertEqual(client.authorization_endpoint, self.op.issuer + "/authorize")
+        kid = self.op.keys[0].kid
+        self.assertEqual(client.keyjar.get_key_by_kid(kid, client.issuer).kid, kid)
@@ -1,12 +1,14 @@
 # coding: utf-8
 
 import logging
+from time import perf_counter
 
 from django.conf import settings
 from django.contrib.auth import logout as auth_logout
 from django.contrib.auth import authenticate, login
 from django.http import HttpResponseRedirect
 from django.shortcuts import redirect, render
+from prometheus_client import Histogram
 from urllib.parse import parse_qs, urlencode
 
 from djangooidc.oidc import Client
@@ -15,11 +17,17 @@ from djangooidc import exceptions as o_e
 
 logger = logging.getLogger(__name__)
 
+CALLBACK_SECONDS = Histogram(
+    "oidc_callback_seconds",
+    "Time taken to log a user in after the provider sends them back",
+    ["result"],
+)
+
 try:
     # Initialize provider using pyOICD
     OP = getattr(settings, "OIDC_ACTIVE_PROVIDER")
     CLIENT = Client(OP)
-    logger.debug("client initialized %s" % CLIENT)
+    logger.debug("client initialized %s", CLIENT)
 except Exception as err:
     CLIENT = None  # type: ignore
     logger.warning(err)
@@ -65,18 +73,23 @@ def openid(request):
 
 def login_callback(request):
     """Analyze the token returned by the authentication provider (OP)."""
+    start = perf_counter()
+    result = "error"
     try:
         query = parse_qs(request.GET.urlencode())
         userinfo = CLIENT.callback(query, request.session)
         user = authenticate(request=request, **userinfo)
         if user:
             login(request, user)
-            logger.info("Successfully logged in user %s" % user)
+            logger.info("Successfully logged in user %s", user)
+            result = "success"
             return redirect(request.session.get("next", "/"))
         else:
             raise o_e.BannedUser()
     except Exception as err:
         return error_page(request, err)
+    finally:
+        CALLBACK_SECONDS.labels(result).observe(perf_counter() - start)
 
 
 def logout(request, next_page=None):
@@ -108,7 +121,7 @@ def logout(request, next_page=None):
         # Always remove Django session stuff - even if not logged out from OP.
         # Don't wait for the callback as it may never come.
         auth_logout(request)
-        logger.info("Successfully logged out user %s" % username)
+        logger.info("Successfully logged out user %s", username)
         next_page = getattr(settings, "LOGOUT_REDIRECT_URL", None)
         if next_page:
             request.session["next"] = next_page
@@ -12,7 +12,10 @@ class Cert:
     variable but Python's ssl library requires a file.
     """
 
-    def __init__(self, data=settings.SECRET_REGISTRY_CERT) -> None:
+    def __init__(self, data=None) -> None:
+        # read settings here, not at import time
+        if data is None:
+            data = settings.SECRET_REGISTRY_CERT
         self.filename = self._write(data)
 
     def __del__(self):
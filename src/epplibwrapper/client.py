@@ -1,8 +1,21 @@
 """Provide a wrapper around epplib to handle authentication and errors."""
 
 import logging
-from time import sleep
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter, sleep, time
+from typing import List, Optional
 
+from django.conf import settings
+from prometheus_client import Counter, Histogram
+
+from registrar.utility.tracing import span
+
+from .cert import Cert, Key
+from .errors import LoginError, RegistryError
+from .socket import Socket
+
+_import_start = perf_counter()
 try:
     from epplib.client import Client
     from epplib import commands
@@ -11,25 +24,27 @@ try:
 except ImportError:
     pass
 
-from django.conf import settings
-
-from .cert import Cert, Key
-from .errors import LoginError, RegistryError
-from .socket import Socket
-
 logger = logging.getLogger(__name__)
 
-try:
-    # Write cert and key to disk
-    CERT = Cert()
-    KEY = Key()
-except Exception:
-    CERT = None  # type: ignore
-    KEY = None  # type: ignore
-    logger.warning(
-        "Problem with client certificate. Registrar cannot contact registry.",
-        exc_info=True,
-    )
+# seconds spent importing epplib; useful when tracking down slow startups
+IMPORT_SECONDS = perf_counter() - _import_start
+logger.debug("epplib imported in %.1f ms", IMPORT_SECONDS * 1000)
+
+COMMAND_SECONDS = Histogram(
+    "registry_command_seconds",
+    "Time taken by the registry to answer a command, by its response code",
+    ["command", "code"],
+)
+RETRIES = Counter(
+    "registry_retries_total",
+    "Commands sent again after the registry could not be reached",
+    ["command"],
+)
+FAILURES = Counter(
+    "registry_failures_total",
+    "Commands given up on, after any retries",
+    ["command"],
+)
 
 
 class EPPLibWrapper:
@@ -42,6 +57,11 @@ class EPPLibWrapper:
     def __init__(self) -> None:
         """Initialize settings which will be used for all connections."""
 
+        # write cert and key to disk; they are removed again when
+        # this object is garbage collected
+        self._cert = Cert()
+        self._key = Key()
+
         # prepare (but do not send) a Login command
         self._login = commands.Login(
             cl_id=settings.SECRET_REGISTRY_CL_ID,
@@ -55,8 +75,8 @@ class EPPLibWrapper:
         self._client = Client(
             SocketTransport(
                 settings.SECRET_REGISTRY_HOSTNAME,
-                cert_file=CERT.filename,
-                key_file=KEY.filename,
+                cert_file=self._cert.filename,
+                key_file=self._key.filename,
                 password=settings.SECRET_REGISTRY_KEY_PASSPHRASE,
             )
         )
@@ -64,12 +84,35 @@ class EPPLibWrapper:
         # (it will also logout and disconnect when the context manager exits)
         self._connect = Socket(self._client, self._login)
 
-    def _send(self, command):
-        """Helper function used by `send`."""
+    def _send(self, commands, responses):
+        """
+        Helper function used by `send` and `send_all`.
+
+        Sends `commands` over one connection, appending to `responses` as each
+        succeeds, so that a retry can carry on from the command which failed.
+        """
+        cmd_type = None
         try:
-            cmd_type = command.__class__.__name__
-            with self._connect as wire:
-                response = wire.send(command)
+            # logging in is the part of this span which is not in a command's
+            with span("registry"), self._connect as wire:
+                for command in commands[len(responses) :]:
+                    cmd_type = command.__class__.__name__
+                    start = perf_counter()
+                    with span("registry command", command=cmd_type) as attributes:
+                        response = wire.send(command)
+                        attributes["code"] = response.code
+                    COMMAND_SECONDS.labels(cmd_type, response.code).observe(
+                        perf_counter() - start
+                    )
+                    if response.code >= 2000:
+                        raise RegistryError(response.msg, code=response.code)
+                    responses.append(response)
+        except LoginError as err:
+            message = "%s failed to execute due to a registry login error."
+            logger.warning(message, cmd_type, exc_info=True)
+            raise RegistryError(message) from err
+        except RegistryError:
+            raise
         except (ValueError, ParsingError) as err:
             message = "%s failed to execute due to some syntax error."
             logger.warning(message, cmd_type, exc_info=True)
@@ -78,44 +121,138 @@ class EPPLibWrapper:
             message = "%s failed to execute due to a connection error."
             logger.warning(message, cmd_type, exc_info=True)
             raise RegistryError(message) from err
-        except LoginError as err:
-            message = "%s failed to execute due to a registry login error."
-            logger.warning(message, cmd_type, exc_info=True)
-            raise RegistryError(message) from err
         except Exception as err:
             message = "%s failed to execute due to an unknown error."
             logger.warning(message, cmd_type, exc_info=True)
             raise RegistryError(message) from err
-        else:
-            if response.code >= 2000:
-                raise RegistryError(response.msg, code=response.code)
-            else:
-                return response
+        return responses
 
     def send(self, command, *, cleaned=False):
         """Login, send the command, then close the connection. Tries 3 times."""
+        return self.send_all([command], cleaned=cleaned)[0]
+
+    def send_all(self, commands, *, cleaned=False):
+        """
+        Login, send each command in turn, then close the connection.
+
+        Logging in costs several round trips, so this is much quicker than
+        calling `send` for each command. Stops at the first command which
+        fails. Tries each command 3 times.
+        """
         # try to prevent use of this method without appropriate safeguards
         if not cleaned:
             raise ValueError("Please sanitize user input before sending it.")
 
+        commands = list(commands)
+        responses: list = []
         counter = 0  # we'll try 3 times
-        while True:
+        while len(responses) < len(commands):
             try:
-                return self._send(command)
+                self._send(commands, responses)
             except RegistryError as err:
+                cmd_type = commands[len(responses)].__class__.__name__
                 if err.should_retry() and counter < 3:
                     counter += 1
+                    RETRIES.labels(cmd_type).inc()
                     sleep((counter * 50) / 1000)  # sleep 50 ms to 150 ms
                 else:  # don't try again
+                    FAILURES.labels(cmd_type).inc()
                     raise err
+        return responses
 
 
-try:
-    # Initialize epplib
-    CLIENT = EPPLibWrapper()
-    logger.debug("registry client initialized")
-except Exception:
-    CLIENT = None  # type: ignore
-    logger.warning(
-        "Unable to configure epplib. Registrar cannot contact registry.", exc_info=True
-    )
+class LazyEPPLibWrapper:
+    """
+    Stand-in for `EPPLibWrapper` which builds the real client on first use.
+
+    Building the client writes the certificate and key to disk, so doing it
+    at import time would make every process pay for it, including management
+    commands and tests which never talk to the registry.
+
+    An epplib client has one socket, which only one thread may use at a time.
+    Each command borrows a client which no other thread is using, building
+    another if every one is busy, and gives it back afterwards. So there are
+    only ever as many clients as there have been threads sending at once.
+
+    Web workers may call `warm_up` to pay that cost before the first request.
+
+    `last_answer` and `last_failure` are when the registry last answered a
+    command (even with an error code) and when it last could not be reached
+    or reported an error of its own, as timestamps, or None.
+    """
+
+    def __init__(self) -> None:
+        # clients which no thread is using
+        self._idle: List[EPPLibWrapper] = []
+        self._lock = Lock()
+        self._built = False
+        self.last_answer: Optional[float] = None
+        self.last_failure: Optional[float] = None
+
+    @property
+    def is_initialized(self) -> bool:
+        return self._built
+
+    def warm_up(self) -> bool:
+        """Build a client now. Returns False if that was not possible."""
+        try:
+            with self._borrow():
+                return True
+        except RegistryError:
+            return False
+
+    def send(self, command, *, cleaned=False):
+        """See `EPPLibWrapper.send`."""
+        with self._recording(), self._borrow() as wrapper:
+            return wrapper.send(command, cleaned=cleaned)
+
+    def send_all(self, commands, *, cleaned=False):
+        """See `EPPLibWrapper.send_all`."""
+        with self._recording(), self._borrow() as wrapper:
+            return wrapper.send_all(commands, cleaned=cleaned)
+
+    @contextmanager
+    def _recording(self):
+        """Note whether the registry answered the `with` block's commands."""
+        try:
+            yield
+        except RegistryError as err:
+            # errors without a code never reached the registry
+            if err.code is None or err.is_server_error():
+                self.last_failure = time()
+            else:
+                self.last_answer = time()
+            raise
+        self.last_answer = time()
+
+    @contextmanager
+    def _borrow(self):
+        """Lend the `with` block a client which no other thread is using."""
+        with self._lock:
+            wrapper = self._idle.pop() if self._idle else None
+        if wrapper is None:
+            wrapper = self._build()
+        try:
+            yield wrapper
+        finally:
+            with self._lock:
+                self._idle.append(wrapper)
+
+    def _build(self) -> EPPLibWrapper:
+        start = perf_counter()
+        try:
+            wrapper = EPPLibWrapper()
+        except Exception as err:
+            logger.warning(
+                "Unable to configure epplib. Registrar cannot contact registry.",
+                exc_info=True,
+            )
+            raise RegistryError("Registry client is not configured.") from err
+        self._built = True
+        logger.debug(
+            "registry client initialized in %.1f ms", (perf_counter() - start) * 1000
+        )
+        return wrapper
+
+
+CLIENT = LazyEPPLibWrapper()
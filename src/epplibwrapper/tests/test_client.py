@@ -0,0 +1,124 @@
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase
+from prometheus_client import REGISTRY
+
+from epplibwrapper import client
+from epplibwrapper.errors import RegistryError
+
+
+class LazyClientTest(SimpleTestCase):
+    def setUp(self):
+        self.lazy = client.LazyEPPLibWrapper()
+
+    def test_nothing_is_built_until_used(self):
+        with patch.object(client, "EPPLibWrapper") as wrapper:
+            client.LazyEPPLibWrapper()
+        wrapper.assert_not_called()
+
+    def test_wrapper_is_built_once(self):
+        with patch.object(client, "EPPLibWrapper") as wrapper:
+            self.assertTrue(self.lazy.warm_up())
+            self.lazy.send("command", cleaned=True)
+            self.lazy.send("command", cleaned=True)
+        wrapper.assert_called_once_with()
+        self.assertEqual(wrapper.return_value.send.call_count, 2)
+        self.assertTrue(self.lazy.is_initialized)
+
+    def test_threads_sending_at_once_have_clients_of_their_own(self):
+        with patch.object(client, "EPPLibWrapper") as wrapper:
+            wrapper.side_effect = lambda: Mock()
+            with self.lazy._borrow() as first, self.lazy._borrow() as second:
+                self.assertIsNot(first, second)
+            with self.lazy._borrow() as again:
+                self.assertIn(again, [first, second])
+        self.assertEqual(wrapper.call_count, 2)
+
+    def test_failed_construction_raises_registry_error(self):
+        with patch.object(client, "EPPLibWrapper", side_effect=OSError):
+            with self.assertLogs(client.logger, "WARNING"):
+                self.assertFalse(self.lazy.warm_up())
+            with self.assertLogs(client.logger, "WARNING"):
+                with self.assertRaises(RegistryError):
+                    self.lazy.send("command", cleaned=True)
+        self.assertFalse(self.lazy.is_initialized)
+
+
+class Response:
+    def __init__(self, code=1000, msg="ok"):
+        self.code = code
+        self.msg = msg
+
+
+class Wire:
+    """Stands in for a connected epplib client, answering from a script."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent = []
+        self.logins = 0
+
+    def __enter__(self):
+        self.logins += 1
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def send(self, command):
+        self.sent.append(command)
+        return self.responses.pop(0)
+
+
+class SendAllTest(SimpleTestCase):
+    def setUp(self):
+        # skip __init__, which needs registry credentials
+        self.wrapper = client.EPPLibWrapper.__new__(client.EPPLibWrapper)
+
+    def test_one_login_for_many_commands(self):
+        self.wrapper._connect = Wire([Response(), Response(), Response()])
+        responses = self.wrapper.send_all(["a", "b", "c"], cleaned=True)
+        self.assertEqual(len(responses), 3)
+        self.assertEqual(self.wrapper._connect.sent, ["a", "b", "c"])
+        self.assertEqual(self.wrapper._connect.logins, 1)
+
+    def test_retry_resumes_at_failed_command(self):
+        self.wrapper._connect = Wire(
+            [Response(), Response(code=2400, msg="busy"), Response()]
+        )
+        with patch.object(client, "sleep"):
+            self.wrapper.send_all(["a", "b"], cleaned=True)
+        self.assertEqual(self.wrapper._connect.sent, ["a", "b", "b"])
+        self.assertEqual(self.wrapper._connect.logins, 2)
+
+    def test_stops_at_first_error(self):
+        self.wrapper._connect = Wire([Response(code=2302, msg="exists")])
+        with self.assertRaises(RegistryError) as err:
+            self.wrapper.send_all(["a", "b"], cleaned=True)
+        self.assertEqual(err.exception.code, 2302)
+        self.assertEqual(self.wrapper._connect.sent, ["a"])
+
+    def test_requires_cleaned_input(self):
+        with self.assertRaises(ValueError):
+            self.wrapper.send_all(["a"])
+
+    def test_metrics(self):
+        def count(name, **labels):
+            return REGISTRY.get_sample_value(name, labels) or 0
+
+        answered = count("registry_command_seconds_count", command="str", code="1000")
+        retries = count("registry_retries_total", command="str")
+        failures = count("registry_failures_total", command="str")
+        self.wrapper._connect = Wire(
+            [Response(code=2400, msg="busy"), Response(), Response(code=2302)]
+        )
+        with patch.object(client, "sleep"):
+            self.wrapper.send("a", cleaned=True)
+            with self.assertRaises(RegistryError):
+                self.wrapper.send("b", cleaned=True)
+        self.assertEqual(
+            count("registry_command_seconds_count", command="str", code="1000"),
+            answered + 1,
+        )
+        self.assertEqual(count("registry_retries_total", command="str"), retries + 1)
+        self.assertEqual(count("registry_failures_total", command="str"), failures + 1)
@@ -1,16 +1,42 @@
-from django.contrib import admin
+from auditlog.admin import LogEntryAdmin  # type: ignore
+from auditlog.models import LogEntry  # type: ignore
+from django.conf import settings
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.contenttypes.models import ContentType
 from django.http.response import HttpResponseRedirect
 from django.urls import reverse
 
 from . import models
+from .utility.approval import approve_applications
+from .utility.audit import drain_audit_log_queue
+from .views.utility.pagination import EstimatedCountPaginator
 
 
 class AuditedAdmin(admin.ModelAdmin):
 
     """Custom admin to make auditing easier."""
 
+    # lists of big tables: count them approximately, and only once
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        """Fetch the relations which name each choice along with the choices.
+
+        Those are the relations that the related model's admin selects for
+        its list, whose rows are named the same way.
+        """
+        related_admin = self.admin_site._registry.get(db_field.related_model)
+        related = getattr(related_admin, "list_select_related", None)
+        if "queryset" not in kwargs and isinstance(related, (list, tuple)):
+            queryset = self.get_field_queryset(None, db_field, request)
+            if queryset is None:
+                queryset = db_field.related_model._default_manager.all()
+            kwargs["queryset"] = queryset.select_related(*related)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
     def history_view(self, request, object_id, extra_context=None):
         """On clicking 'History', take admin to the auditlog view for an object."""
         return HttpResponseRedirect(
@@ -22,6 +48,32 @@ class AuditedAdmin(admin.ModelAdmin):
         )
 
 
+class AuditLogEntryAdmin(LogEntryAdmin):
+
+    """The audit log, with one batch of queued entries moved into it first."""
+
+    def changelist_view(self, request, extra_context=None):
+        self._drain(request)
+        return super().changelist_view(request, extra_context)
+
+    def change_view(self, request, object_id, form_url="", extra_context=None):
+        self._drain(request)
+        return super().change_view(request, object_id, form_url, extra_context)
+
+    def _drain(self, request):
+        # the rest is left to `./manage.py drain_audit_log`
+        if not settings.AUDIT_LOG_QUEUE:
+            return
+        drain_audit_log_queue(settings.AUDIT_LOG_ADMIN_BATCH)
+        if models.QueuedLogEntry.objects.exists():
+            self.message_user(
+                request,
+                "Some recent changes are not shown yet. "
+                "They are waiting to be written to the audit log.",
+                messages.WARNING,
+            )
+
+
 class UserContactInline(admin.StackedInline):
 
     """Edit a user's profile on the user page."""
@@ -34,6 +86,77 @@ class MyUserAdmin(UserAdmin):
     """Custom user admin class to use our inlines."""
 
     inlines = [UserContactInline]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+class ContactAdmin(AuditedAdmin):
+
+    """Custom contact admin class to add search."""
+
+    search_fields = ["email", "first_name", "last_name"]
+
+
+class WebsiteAdmin(AuditedAdmin):
+
+    """Custom website admin class to add search."""
+
+    search_fields = ["website"]
+
+
+class UserDomainRoleAdmin(AuditedAdmin):
+
+    """Custom user domain role admin class to add search."""
+
+    # each row's name includes its user and domain
+    list_select_related = ["user", "domain"]
+    search_fields = ["user__email", "domain__name"]
+
+
+class DomainInvitationAdmin(AuditedAdmin):
+
+    """Custom domain invitation admin class to add search."""
+
+    list_select_related = ["domain"]
+    search_fields = ["email", "domain__name"]
+
+
+class DomainApplicationAdmin(AuditedAdmin):
+
+    """Custom domain application admin class to add search."""
+
+    list_select_related = ["requested_domain", "creator"]
+    search_fields = ["requested_domain__name", "creator__email"]
+    actions = ["approve_selected"]
+
+    @admin.action(description="Approve selected domain applications")
+    def approve_selected(self, request, queryset):
+        """Approve many applications at once, creating their domains."""
+        result = approve_applications(queryset)
+        if result.approved:
+            self.message_user(
+                request,
+                f"Approved {len(result.approved)} applications.",
+                messages.SUCCESS,
+            )
+        for name, reason in result.failed.items():
+            self.message_user(request, f"{name}: {reason}", messages.ERROR)
+
+
+class DomainInformationAdmin(AuditedAdmin):
+
+    """Custom domain information admin class to add search."""
+
+    list_select_related = ["domain", "creator"]
+    search_fields = ["domain__name", "creator__email"]
+
+
+class DomainAdmin(AuditedAdmin):
+
+    """Custom domain admin class to add search."""
+
+    search_fields = ["name"]
 
 
 class HostIPInline(admin.StackedInline):
@@ -43,20 +166,34 @@ class HostIPInline(admin.StackedInline):
     model = models.HostIP
 
 
+class DelegationInline(admin.TabularInline):
+
+    """Edit the domains a host is a name server for on the host page."""
+
+    model = models.Delegation
+    # a host may serve many domains; pick them by id rather than from a list
+    raw_id_fields = ["domain"]
+    readonly_fields = ["status", "detail", "checked_at", "expires_at"]
+    extra = 0
+
+
 class MyHostAdmin(AuditedAdmin):
 
     """Custom host admin class to use our inlines."""
 
-    inlines = [HostIPInline]
+    inlines = [HostIPInline, DelegationInline]
+    search_fields = ["name"]
 
 
+admin.site.unregister(LogEntry)
+admin.site.register(LogEntry, AuditLogEntryAdmin)
 admin.site.register(models.User, MyUserAdmin)
-admin.site.register(models.UserDomainRole, AuditedAdmin)
-admin.site.register(models.Contact, AuditedAdmin)
-admin.site.register(models.DomainInvitation, AuditedAdmin)
-admin.site.register(models.DomainApplication, AuditedAdmin)
-admin.site.register(models.DomainInformation, AuditedAdmin)
-admin.site.register(models.Domain, AuditedAdmin)
+admin.site.register(models.UserDomainRole, UserDomainRoleAdmin)
+admin.site.register(models.Contact, ContactAdmin)
+admin.site.register(models.DomainInvitation, DomainInvitationAdmin)
+admin.site.register(models.DomainApplication, DomainApplicationAdmin)
+admin.site.register(models.DomainInformation, DomainInformationAdmin)
+admin.site.register(models.Domain, DomainAdmin)
 admin.site.register(models.Host, MyHostAdmin)
 admin.site.register(models.Nameserver, MyHostAdmin)
-admin.site.register(models.Website, AuditedAdmin)
+admin.site.register(models.Website, WebsiteAdmin)
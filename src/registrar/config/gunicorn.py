@@ -0,0 +1,25 @@
+"""
+Gunicorn settings, used by run.sh.
+
+Each worker keeps its metrics in files in PROMETHEUS_MULTIPROC_DIR, which
+the /metrics view adds up. The directory is emptied when gunicorn starts,
+before any worker imports prometheus_client.
+"""
+
+import os
+import shutil
+import tempfile
+
+
+def on_starting(server):
+    directory = os.environ.setdefault(
+        "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "prometheus")
+    )
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -46,9 +46,40 @@ path = Path(__file__)
 
 env_db_url = env.dj_db_url("DATABASE_URL")
 env_debug = env.bool("DJANGO_DEBUG", default=False)
+env_db_conn_max_age = env.int("DJANGO_DB_CONN_MAX_AGE", default=60)
+env_db_pgbouncer = env.bool("DJANGO_DB_PGBOUNCER", default=False)
+env_db_replica_url = (
+    env.dj_db_url("DATABASE_REPLICA_URL")
+    if env.str("DATABASE_REPLICA_URL", "")
+    else None
+)
+env_replica_max_lag = env.float("DJANGO_REPLICA_MAX_LAG_SECONDS", default=5.0)
+env_replica_pin_seconds = env.int("DJANGO_REPLICA_PIN_SECONDS", default=10)
 env_log_level = env.str("DJANGO_LOG_LEVEL", "DEBUG")
+env_log_json = env.bool("DJANGO_LOG_JSON", default=not env_debug)
+env_log_sampling = env.dict("DJANGO_LOG_SAMPLING", subcast_values=int, default={})
 env_base_url = env.str("DJANGO_BASE_URL")
 env_getgov_public_site_url = env.str("GETGOV_PUBLIC_SITE_URL", "")
+env_registry_warm_up = env.bool("DJANGO_REGISTRY_WARM_UP", default=False)
+env_registry_max_workers = env.int("DJANGO_REGISTRY_MAX_WORKERS", default=4)
+env_delegation_check_concurrency = env.int("DJANGO_DELEGATION_CHECK_CONCURRENCY", 100)
+env_delegation_check_timeout = env.float("DJANGO_DELEGATION_CHECK_TIMEOUT", 3.0)
+env_audit_log_queue = env.bool("DJANGO_AUDIT_LOG_QUEUE", default=False)
+env_slow_query_ms = env.int("DJANGO_SLOW_QUERY_MS", default=500)
+env_query_budget_raise = env.bool("DJANGO_QUERY_BUDGET_RAISE", default=env_debug)
+env_query_log_sampling = env.int("DJANGO_QUERY_LOG_SAMPLING", default=10)
+env_tracing = env.bool("DJANGO_TRACING", default=True)
+env_trace_slow_ms = env.int("DJANGO_TRACE_SLOW_MS", default=1000)
+env_trace_file = env.str("DJANGO_TRACE_FILE", default=None)
+env_health_check_interval = env.int("DJANGO_HEALTH_CHECK_INTERVAL", default=30)
+env_health_check_timeout = env.float("DJANGO_HEALTH_CHECK_TIMEOUT", default=5.0)
+env_health_reported_check_interval = env.int(
+    "DJANGO_HEALTH_REPORTED_CHECK_INTERVAL", default=600
+)
+env_health_required_checks = env.list(
+    "DJANGO_HEALTH_REQUIRED_CHECKS", default=["database"]
+)
+env_startup_import_budget_ms = env.int("DJANGO_STARTUP_IMPORT_BUDGET_MS", 5000)
 
 secret_login_key = b64decode(secret("DJANGO_SECRET_LOGIN_KEY", ""))
 secret_key = secret("DJANGO_SECRET_KEY")
@@ -63,6 +94,8 @@ secret_registry_key = b64decode(secret("REGISTRY_KEY", ""))
 secret_registry_key_passphrase = secret("REGISTRY_KEY_PASSPHRASE", "")
 secret_registry_hostname = secret("REGISTRY_HOSTNAME")
 
+secret_metrics_token = secret("METRICS_TOKEN", None)
+
 # region: Basic Django Config-----------------------------------------------###
 
 # Build paths inside the project like this: BASE_DIR / "subdir".
@@ -96,6 +129,8 @@ INSTALLED_APPS = [
     # (and any other places you specify) into a single location
     # that can easily be served in production
     "django.contrib.staticfiles",
+    # PostgreSQL's lookups and indexes, like the admin's trigram indexes
+    "django.contrib.postgres",
     # application used for integrating with Login.gov
     "djangooidc",
     # audit logging of changes to models
@@ -122,6 +157,14 @@ MIDDLEWARE = [
     "allow_cidr.middleware.AllowCIDRMiddleware",
     # serve static assets in production
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    # give each request an id, which its log records include
+    "registrar.utility.logs.RequestIdMiddleware",
+    # count and time each request's queries, and hold views to a query budget
+    "registrar.utility.queries.QueryMiddleware",
+    # record where the time of slow requests goes
+    "registrar.utility.tracing.TracingMiddleware",
+    # let views which only read use a read replica
+    "registrar.utility.replicas.ReplicaMiddleware",
     # provide security enhancements to the request/response cycle
     "django.middleware.security.SecurityMiddleware",
     # store and retrieve arbitrary data on a per-site-visitor basis
@@ -143,6 +186,8 @@ MIDDLEWARE = [
     "csp.middleware.CSPMiddleware",
     # django-auditlog: obtain the request User for use in logging
     "auditlog.middleware.AuditlogMiddleware",
+    # write the request's audit log entries together, once they are committed
+    "registrar.utility.audit.AuditLogBufferMiddleware",
 ]
 
 # application object used by Django’s built-in servers (e.g. `runserver`)
@@ -156,13 +201,28 @@ WSGI_APPLICATION = "registrar.config.wsgi.application"
 
 # Caching is disabled by default.
 # For a low to medium traffic site, caching causes more
-# problems than it solves. Should caching be desired,
-# a reasonable start might be:
-# CACHES = {
-#     "default": {
-#         "BACKEND": "django.core.cache.backends.db.DatabaseCache",
-#     }
-# }
+# problems than it solves.
+CACHES = {
+    # Django's default, a per-process memory cache
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # shared between workers and persisted across restarts
+    # the table is created by `./manage.py createcachetable`
+    "oidc": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "djangooidc_cache",
+    },
+}
+
+# Which cache in CACHES may hold each user's roles on domains,
+# used when checking permissions. Must be shared between workers
+# (not "default"), or a removed role could linger in other workers.
+# None means roles are loaded from the database once per request.
+DOMAIN_ROLE_CACHE_ALIAS = None
+
+# seconds that a user's cached roles may be used for
+DOMAIN_ROLE_CACHE_TIMEOUT = 300
 
 # Absolute path to the directory where `collectstatic`
 # will place static files for deployment.
@@ -174,9 +234,25 @@ STATICFILES_DIRS = [
     BASE_DIR / "registrar" / "assets",
 ]
 
+# Without DEBUG, `collectstatic` gives each file a name which includes a hash
+# of its contents, writes gzip and brotli copies beside it and a manifest of
+# the names, and rewrites references between files to match. WhiteNoise
+# serves the hashed files as immutable, to be cached for good, and sends the
+# compressed copies as they are. Templates find the names with {% static %}.
+# `collectstatic` must have been run before the site starts.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        if env_debug
+        else "whitenoise.storage.CompressedManifestStaticFilesStorage"
+    },
+}
+
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # Django's backend, with a span in the request's trace for each render
+        "BACKEND": "registrar.utility.tracing.TracedDjangoTemplates",
         "DIRS": [BASE_DIR / "registrar" / "templates"],
         # look for templates inside installed apps
         #     required by django-debug-toolbar
@@ -219,18 +295,106 @@ IS_DEMO_SITE = True
 #     @transaction.non_atomic_requests
 env_db_url["ATOMIC_REQUESTS"] = True
 
+# Keep each worker's database connection open for this many seconds,
+# rather than connecting (with TLS, on cloud.gov) for every request.
+# 0 closes the connection at the end of each request
+env_db_url["CONN_MAX_AGE"] = env_db_conn_max_age
+
+# Make sure a connection which was kept open still works
+# before a request uses it, instead of failing the request
+env_db_url["CONN_HEALTH_CHECKS"] = True
+
+# Set DJANGO_DB_PGBOUNCER if the database is reached through PgBouncer in
+# transaction pooling mode. Each transaction may then be given a different
+# server connection, which server-side cursors (used by `.iterator()`)
+# cannot survive, so they are turned off
+env_db_url["DISABLE_SERVER_SIDE_CURSORS"] = env_db_pgbouncer
+
 DATABASES = {
     # dj-database-url package takes the supplied Postgres connection string
     # and converts it into a dictionary with the correct USER, HOST, etc
     "default": env_db_url,
 }
 
+# A read replica of the default database, if DATABASE_REPLICA_URL is set.
+# Test databases (benchmark_views') read the default through it. The test
+# runner does not read from it at all: see registrar.tests.runner
+if env_db_replica_url:
+    env_db_replica_url.update(
+        CONN_MAX_AGE=env_db_conn_max_age,
+        CONN_HEALTH_CHECKS=True,
+        DISABLE_SERVER_SIDE_CURSORS=env_db_pgbouncer,
+        TEST={"MIRROR": "default"},
+    )
+    DATABASES["replica"] = env_db_replica_url
+
+# Databases which views may read from, and the router which chooses one
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["registrar.utility.replicas.ReplicaRouter"]
+
+# Runs tests without reading from replicas
+TEST_RUNNER = "registrar.tests.runner.TestRunner"
+
+# URL names of views which may read from a replica, on GET requests.
+# Patterns such as "admin:*" may be used. A view's reads go to the primary
+# once it has written anything
+REPLICA_VIEWS = [
+    "home",
+    "domain",
+    "domain-users",
+    "application-status",
+    "available",
+    "admin:*_changelist",
+]
+
+# Replicas further behind the primary than this are not read from
+REPLICA_MAX_LAG_SECONDS = env_replica_max_lag
+
+# Seconds that each process reuses its measurement of a replica's lag
+REPLICA_LAG_CHECK_INTERVAL = 5
+
+# After writing, a visitor reads from the primary for this many seconds,
+# so that they see their change before the replicas have it
+REPLICA_PIN_SECONDS = env_replica_pin_seconds
+
+# Queries which take at least this many milliseconds are logged,
+# with the lines of code which ran them
+SLOW_QUERY_MS = env_slow_query_ms
+
+# The most queries a view may run, by URL name (such as "domain-users")
+# or namespace (such as "admin"), and for views not listed.
+# Raise a budget only when a view needs more queries for good reason;
+# a view which runs a query per row will soon blow its budget.
+QUERY_BUDGETS = {
+    # each step loads and saves the whole application and its relations
+    "application": 60,
+    # its approve action saves each application, and its domain, in turn;
+    # one application takes about 20 queries on top of the list's own
+    "admin:registrar_domainapplication_changelist": 60,
+}
+QUERY_BUDGET_DEFAULT = 30
+
+# If True, a view over its query budget raises QueryBudgetExceeded,
+# which fails the test that requested it. Otherwise it is logged.
+QUERY_BUDGET_RAISE = env_query_budget_raise
+
+# Slow queries and views over budget are logged the first time, then one
+# time in every QUERY_LOG_SAMPLING, per query fingerprint or view
+QUERY_LOG_SAMPLING = env_query_log_sampling
+
 # Specify default field type to use for primary keys
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Use our user model instead of the default
 AUTH_USER_MODEL = "registrar.User"
 
+# If True, audit log entries are queued in their own table and moved to
+# the audit log by `./manage.py drain_audit_log`, keeping that work out of
+# requests. The admin's audit log pages move at most AUDIT_LOG_ADMIN_BATCH
+# entries before showing it.
+AUDIT_LOG_QUEUE = env_audit_log_queue
+AUDIT_LOG_ADMIN_BATCH = 500
+
 # endregion
 # region: Email-------------------------------------------------------------###
 
@@ -299,6 +463,25 @@ CSP_FORM_ACTION = allowed_sources
 # as Host header may contain a proxy rather than the actual client
 USE_X_FORWARDED_HOST = True
 
+# endregion
+# region: Health checks-----------------------------------------------------###
+
+# Seconds between checks of the services this app depends on.
+# /health/ready/ reports the latest results, rather than checking.
+HEALTH_CHECK_INTERVAL = env_health_check_interval
+
+# Seconds between the checks which are only reported. Every worker runs
+# them, and they call services which every worker shares, such as SES.
+HEALTH_REPORTED_CHECK_INTERVAL = env_health_reported_check_interval
+
+# Seconds to wait for each check before reporting it as failing.
+HEALTH_CHECK_TIMEOUT = env_health_check_timeout
+
+# Checks which must pass for /health/ready/ to say this instance is ready.
+# The others (replica, registry, domain_list, email, login) are only reported,
+# and only to staff; anyone else is told just which checks are failing.
+HEALTH_REQUIRED_CHECKS = env_health_required_checks
+
 # endregion
 # region: Internationalisation----------------------------------------------###
 
@@ -357,6 +540,20 @@ PHONENUMBER_DEFAULT_REGION = "US"
 #   logger.error("Can't do this important task. Something is very wrong.")
 #   logger.critical("Going to crash now.")
 
+# Requests which take at least this many milliseconds have their trace
+# written out: how long each query, template, and call to the registry,
+# Login.gov or SES took. None (DJANGO_TRACING=False) turns tracing off.
+TRACE_SLOW_MS = env_trace_slow_ms if env_tracing else None
+
+# File to append traces to, one JSON object per line.
+# If None, they are logged by the "registrar.traces" logger.
+TRACE_FILE = env_trace_file
+
+# Keep one in every N debug and info records of these loggers
+# (and those below them), such as {"registrar.views": 10}.
+# Set as DJANGO_LOG_SAMPLING=registrar.views=10,epplibwrapper=5
+LOG_SAMPLING = env_log_sampling
+
 LOGGING = {
     "version": 1,
     # Don't import Django's existing loggers
@@ -372,19 +569,39 @@ LOGGING = {
         "simple": {
             "format": "%(levelname)s %(message)s",
         },
+        # one line of JSON per record, with the request's id
+        # and any fields given in `extra`
+        "json": {
+            "()": "registrar.utility.logs.JSONFormatter",
+        },
         "django.server": {
             "()": "django.utils.log.ServerFormatter",
             "format": "[{server_time}] {message}",
             "style": "{",
         },
     },
+    # define which log records are passed on, and add to them
+    "filters": {
+        "request_id": {
+            "()": "registrar.utility.logs.RequestIdFilter",
+        },
+        "sampling": {
+            "()": "registrar.utility.logs.SamplingFilter",
+            "rates": LOG_SAMPLING,
+        },
+    },
     # define where log messages will be sent;
     # each logger can have one or more handlers
     "handlers": {
+        # with JSON (the default unless DJANGO_DEBUG is set), records are
+        # formatted and written by a thread, not by the code logging them
         "console": {
             "level": env_log_level,
-            "class": "logging.StreamHandler",
-            "formatter": "verbose",
+            "class": "registrar.utility.logs.QueueStreamHandler"
+            if env_log_json
+            else "logging.StreamHandler",
+            "formatter": "json" if env_log_json else "verbose",
+            "filters": ["request_id", "sampling"],
         },
         "django.server": {
             "level": "INFO",
@@ -434,10 +651,16 @@ LOGGING = {
             "level": "INFO",
             "propagate": False,
         },
-        # Our app!
+        # Our app! Below DJANGO_LOG_LEVEL, logging calls return at once
         "registrar": {
             "handlers": ["console"],
-            "level": "DEBUG",
+            "level": env_log_level,
+            "propagate": False,
+        },
+        # traces of slow requests, unless TRACE_FILE is set
+        "registrar.traces": {
+            "handlers": ["console"],
+            "level": "INFO",
             "propagate": False,
         },
     },
@@ -479,6 +702,22 @@ OIDC_ALLOW_DYNAMIC_OP = False
 # (code does not currently support user selection)
 OIDC_ACTIVE_PROVIDER = "login.gov"
 
+# which cache in CACHES holds the provider's configuration and signing keys
+OIDC_CACHE_ALIAS = "oidc"
+
+# seconds that cached provider configuration and keys may be used for
+OIDC_CACHE_TIMEOUT = 43200
+
+# seconds before they expire that a background thread refreshes them
+OIDC_CACHE_REFRESH_MARGIN = 3600
+
+# minimum seconds between key refetches caused by an unknown key id
+OIDC_CACHE_MIN_REFETCH_INTERVAL = 60
+
+# refresh provider configuration and keys in a background thread, which
+# wsgi.py starts in each worker
+OIDC_CACHE_BACKGROUND_REFRESH = True
+
 
 OIDC_PROVIDERS = {
     "login.gov": {
@@ -510,6 +749,10 @@ OIDC_PROVIDERS = {
 # full Python import path to the root URLconf
 ROOT_URLCONF = "registrar.config.urls"
 
+# Absolute URL of this site, for links in emails which are
+# sent from management commands rather than during a request
+BASE_URL = env_base_url
+
 # URL to use when referring to static files located in STATIC_ROOT
 # Must be relative and end with "/"
 STATIC_URL = "public/"
@@ -529,6 +772,23 @@ SECRET_REGISTRY_KEY = secret_registry_key
 SECRET_REGISTRY_KEY_PASSPHRASE = secret_registry_key_passphrase
 SECRET_REGISTRY_HOSTNAME = secret_registry_hostname
 
+# The registry client is built the first time it is used.
+# If True, web workers build it as soon as they start instead,
+# so that the first request to each worker does not pay for it.
+REGISTRY_WARM_UP = env_registry_warm_up
+
+# How many domains may be updated in the registry at the same time
+# when one change is made across many domains. Each uses a registry client,
+# and so a connection, of its own; see epplibwrapper.client.LazyEPPLibWrapper.
+REGISTRY_MAX_WORKERS = env_registry_max_workers
+
+# How many DNS queries may be waiting for an answer at the same time
+# when checking that nameservers answer for their domains.
+DELEGATION_CHECK_CONCURRENCY = env_delegation_check_concurrency
+
+# Seconds to wait for a nameserver to answer before calling it unreachable.
+DELEGATION_CHECK_TIMEOUT = env_delegation_check_timeout
+
 # endregion
 # region: Security and Privacy----------------------------------------------###
 
@@ -538,6 +798,10 @@ SECRET_KEY = secret_key
 # Use this variable for doing SECRET_KEY rotation, see documentation
 SECRET_KEY_FALLBACKS: "list[str]" = []
 
+# Lets a scraper read /metrics by sending "Authorization: Bearer <token>".
+# Staff can read it when logged in. If None, only staff can.
+METRICS_TOKEN = secret_metrics_token
+
 # ~ Set by django.middleware.security.SecurityMiddleware
 # SECURE_CONTENT_TYPE_NOSNIFF = True
 # SECURE_CROSS_ORIGIN_OPENER_POLICY = "same-origin"
@@ -628,6 +892,16 @@ DATA_UPLOAD_MAX_NUMBER_FIELDS = 1000
 # age of session cookies, in seconds (28800 = 8 hours)
 SESSION_COOKIE_AGE = 28800
 
+# sessions are kept in the database, and in a cache if one is set below;
+# expired ones are deleted in batches
+SESSION_ENGINE = "registrar.utility.sessions"
+
+# Which cache in CACHES holds sessions in front of the database.
+# Must be shared between workers (not "default"), or a worker could
+# keep using a session which another has changed or ended.
+# None means sessions are read from the database on every request.
+SESSION_STORE_CACHE_ALIAS = None
+
 # instruct the browser to forbid client-side JavaScript
 # from accessing the cookie
 SESSION_COOKIE_HTTPONLY = True
@@ -656,6 +930,11 @@ SESSION_COOKIE_SECURE = True
 # Must use unix style "/" path separators.
 FIXTURE_DIRS: "list[str]" = []
 
+# Milliseconds a new worker may spend importing modules before it
+# serves its first request. Checked by `./manage.py startup_profile`,
+# which CI runs with the benchmarks; slow boots make autoscaling sluggish.
+STARTUP_IMPORT_BUDGET_MS = env_startup_import_budget_ms
+
 # endregion
 
 
@@ -690,6 +969,7 @@ if DEBUG:
     MIDDLEWARE.insert(0, "debug_toolbar.middleware.DebugToolbarMiddleware")
 
     DEBUG_TOOLBAR_CONFIG = {
-        # due to Docker, bypass Debug Toolbar's check on INTERNAL_IPS
-        "SHOW_TOOLBAR_CALLBACK": lambda _: True,
+        # due to Docker, bypass Debug Toolbar's check on INTERNAL_IPS;
+        #     shown only while DEBUG is on, so not in tests
+        "SHOW_TOOLBAR_CALLBACK": "registrar.utility.toolbar.show_toolbar",
     }
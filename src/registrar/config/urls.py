@@ -68,6 +68,8 @@ urlpatterns = [
         name="application-withdrawn",
     ),
     path("health/", views.health),
+    path("health/ready/", views.ready),
+    path("metrics/", views.metrics, name="metrics"),
     path("openid/", include("djangooidc.urls")),
     path("register/", include((application_urls, APPLICATION_NAMESPACE))),
     path("api/v1/available/<domain>", available, name="available"),
@@ -103,6 +105,11 @@ urlpatterns = [
         views.DomainAddUserView.as_view(),
         name="domain-users-add",
     ),
+    path(
+        "domain/<int:pk>/users/add-many",
+        views.DomainAddUsersView.as_view(),
+        name="domain-users-add-many",
+    ),
     path(
         "invitation/<int:pk>/delete",
         views.DomainInvitationDeleteView.as_view(http_method_names=["post"]),
@@ -7,6 +7,25 @@ For more information on this file, see
 https://docs.djangoproject.com/en/4.0/howto/deployment/wsgi/
 """
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
+from registrar.utility.health import CHECKER
+
 application = get_wsgi_application()
+
+if settings.REGISTRY_WARM_UP:
+    # build the registry client now, rather than on the first request
+    from epplibwrapper import CLIENT
+
+    CLIENT.warm_up()
+
+# check dependencies from now on, so that readiness is known by the first probe
+CHECKER.start()
+
+if settings.OIDC_CACHE_BACKGROUND_REFRESH:
+    # keep Login.gov's configuration and keys fresh, in this worker only
+    from djangooidc.views import CLIENT as OIDC_CLIENT
+
+    if OIDC_CLIENT is not None:
+        OIDC_CLIENT.provider_cache.start_background_refresh()
@@ -276,6 +276,19 @@ class DomainApplicationFixture:
             ]
             da.alternative_domains.add(*alternative_domains)
 
+    @classmethod
+    def create(cls, user: User, app: dict) -> DomainApplication:
+        """Create one domain application for `user`, filling in fake data."""
+        da, _ = DomainApplication.objects.get_or_create(
+            creator=user,
+            organization_name=app["organization_name"],
+        )
+        cls._set_non_foreign_key_fields(da, app)
+        cls._set_foreign_key_fields(da, app, user)
+        da.save()
+        cls._set_many_to_many_relations(da, app)
+        return da
+
     @classmethod
     def load(cls):
         """Creates domain applications for each user in the database."""
@@ -290,14 +303,7 @@ class DomainApplicationFixture:
             logger.debug("Loading domain applications for %s" % user)
             for app in cls.DA:
                 try:
-                    da, _ = DomainApplication.objects.get_or_create(
-                        creator=user,
-                        organization_name=app["organization_name"],
-                    )
-                    cls._set_non_foreign_key_fields(da, app)
-                    cls._set_foreign_key_fields(da, app, user)
-                    da.save()
-                    cls._set_many_to_many_relations(da, app)
+                    cls.create(user, app)
                 except Exception as e:
                     logger.warning(e)
 
@@ -1,6 +1,7 @@
 from .application_wizard import *
 from .domain import (
     DomainAddUserForm,
+    DomainAddUsersForm,
     NameserverFormset,
     DomainSecurityEmailForm,
     ContactForm,
@@ -1,6 +1,9 @@
 """Forms for domain management."""
 
+import re
+
 from django import forms
+from django.core.validators import validate_email
 from django.forms import formset_factory
 
 from phonenumber_field.widgets import RegionalPhoneNumberWidget
@@ -15,6 +18,39 @@ class DomainAddUserForm(forms.Form):
     email = forms.EmailField(label="Email")
 
 
+class DomainAddUsersForm(forms.Form):
+
+    """Form for adding many users to a domain at once."""
+
+    # more than this should be loaded with `./manage.py add_domain_users`
+    MAX_EMAILS = 500
+
+    emails = forms.CharField(
+        label="Email addresses, separated by commas or on separate lines",
+        widget=forms.Textarea(),
+        error_messages={"required": "Enter at least one email address."},
+    )
+
+    def clean_emails(self):
+        """Split the text into a list of valid email addresses."""
+        emails = [e for e in re.split(r"[\s,;]+", self.cleaned_data["emails"]) if e]
+        invalid = []
+        for email in emails:
+            try:
+                validate_email(email)
+            except forms.ValidationError:
+                invalid.append(email)
+        if invalid:
+            raise forms.ValidationError(
+                "These are not valid email addresses: %s" % ", ".join(invalid)
+            )
+        if len(emails) > self.MAX_EMAILS:
+            raise forms.ValidationError(
+                f"Enter no more than {self.MAX_EMAILS} email addresses at a time."
+            )
+        return emails
+
+
 class DomainNameserverForm(forms.Form):
 
     """Form for changing nameservers."""
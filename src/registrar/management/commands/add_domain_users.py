@@ -0,0 +1,59 @@
+"""Give many people access to a domain, for example a whole agency team."""
+
+import logging
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.urls import reverse
+
+from registrar.models import Domain
+from registrar.utility.domain_users import add_users_to_domain
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Add users to a domain by email address. "
+        "Addresses without an account are sent an invitation."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("domain", help="Name of the domain, like example.gov")
+        parser.add_argument("emails", nargs="*", help="Email addresses to add")
+        parser.add_argument(
+            "--file", help="File with more email addresses, one on each line"
+        )
+        parser.add_argument(
+            "--no-email",
+            action="store_true",
+            help="Create invitations without sending invitation emails",
+        )
+
+    def handle(self, domain, emails, **options):
+        try:
+            domain = Domain.objects.get(name=domain)
+        except Domain.DoesNotExist:
+            raise CommandError(f"No domain named {domain}.")
+
+        emails = list(emails)
+        if options["file"]:
+            with open(options["file"]) as f:
+                emails += [line.strip() for line in f]
+
+        domain_url = settings.BASE_URL + reverse("domain", kwargs={"pk": domain.pk})
+        result = add_users_to_domain(
+            domain, emails, domain_url, send_email=not options["no_email"]
+        )
+
+        logger.info(
+            "Added %d users (%d already added), invited %d (%d already invited)",
+            len(result.added),
+            len(result.already_added),
+            len(result.invited),
+            len(result.already_invited),
+        )
+        if result.not_sent:
+            raise CommandError(
+                "Could not send invitations to: " + ", ".join(result.not_sent)
+            )
@@ -0,0 +1,51 @@
+"""Approve many domain applications at once."""
+
+import logging
+
+from django.core.management import BaseCommand, CommandError
+
+from registrar.models import DomainApplication
+from registrar.utility.approval import approve_applications
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Approve the domain applications with the given ids, or every "
+        "submitted application, and create their domains in the registry."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("ids", nargs="*", type=int, help="Application ids")
+        parser.add_argument(
+            "--all-submitted",
+            action="store_true",
+            help="Approve every submitted application",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Domains to create at the same time (default: REGISTRY_MAX_WORKERS)",
+        )
+
+    def handle(self, ids, **options):
+        if ids and options["all_submitted"]:
+            raise CommandError("Give application ids or --all-submitted, not both.")
+        if options["all_submitted"]:
+            applications = DomainApplication.objects.filter(
+                status=DomainApplication.SUBMITTED
+            )
+        elif ids:
+            applications = DomainApplication.objects.filter(id__in=ids)
+        else:
+            raise CommandError("Give application ids or --all-submitted.")
+
+        result = approve_applications(applications, max_workers=options["workers"])
+
+        logger.info("Approved %d applications", len(result.approved))
+        if result.failed:
+            raise CommandError(
+                "Could not approve: "
+                + ", ".join(f"{name} ({why})" for name, why in result.failed.items())
+            )
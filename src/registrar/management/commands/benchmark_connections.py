@@ -0,0 +1,65 @@
+"""Measure what connecting to the database costs each request."""
+
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs a request's database work many times over, connecting for "
+        "each request and then keeping the connection, and reports the time "
+        "taken per request. Run it where the app runs, against its database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument(
+            "--queries", type=int, default=10, help="Queries per request"
+        )
+        parser.add_argument("--database", default="default")
+
+    def handle(self, requests, queries, database, **options):
+        self.requests, self.queries = requests, queries
+        self.connection = connections[database]
+        kept = settings.DATABASES[database].get("CONN_MAX_AGE") or 60
+        setups = [
+            ("connect for each request", 0),
+            (f"keep for {kept}s", kept),
+        ]
+        self.stdout.write(f"{'connection':<26}{'ms per request':>16}{'connects':>10}")
+        for name, max_age in setups:
+            ms, opened = self.measure(max_age)
+            self.stdout.write(f"{name:<26}{ms:>16.2f}{opened:>10}")
+
+    def measure(self, max_age):
+        """Time requests with CONN_MAX_AGE set to `max_age`."""
+        connection = self.connection
+        original = connection.settings_dict["CONN_MAX_AGE"]
+        opened = []
+
+        def count(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        connection.close()
+        connection.settings_dict["CONN_MAX_AGE"] = max_age
+        connection_created.connect(count)
+        try:
+            start = perf_counter()
+            for _ in range(self.requests):
+                # these signals close connections which are not to be kept
+                request_started.send(sender=self.__class__)
+                with connection.cursor() as cursor:
+                    for _ in range(self.queries):
+                        cursor.execute("SELECT 1")
+                request_finished.send(sender=self.__class__)
+            elapsed = perf_counter() - start
+        finally:
+            connection_created.disconnect(count)
+            connection.settings_dict["CONN_MAX_AGE"] = original
+            connection.close()
+        return elapsed / self.requests * 1000, len(opened)
@@ -0,0 +1,78 @@
+"""Measure what logging costs the code which logs."""
+
+import logging
+import subprocess  # nosec
+from time import perf_counter
+
+from django.core.management import BaseCommand
+
+from registrar.utility.logs import (
+    JSONFormatter,
+    QueueStreamHandler,
+    RequestIdFilter,
+    request_id,
+)
+
+VERBOSE = "[%(asctime)s] %(levelname)s [%(name)s:%(lineno)s] %(message)s"
+
+
+class Command(BaseCommand):
+    help = (
+        "Logs what a request typically logs, many times over, with each "
+        "way of handling records, and reports the time taken per request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument(
+            "--debug", type=int, default=20, help="Debug records per request"
+        )
+        parser.add_argument(
+            "--info", type=int, default=2, help="Info records per request"
+        )
+
+    def handle(self, requests, debug, info, **options):
+        self.requests, self.debug, self.info = requests, debug, info
+        # like a container's output: a pipe, read by another process
+        reader = subprocess.Popen(  # nosec
+            ["cat"], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True
+        )
+        with reader:
+            pipe = reader.stdin
+            setups = [
+                ("text, written in the request", logging.StreamHandler(pipe), VERBOSE),
+                ("JSON, written in the request", logging.StreamHandler(pipe), None),
+                ("JSON, written by a thread", QueueStreamHandler(pipe), None),
+            ]
+            self.stdout.write(f"{'handler':<34}{'level':>7}{'µs per request':>16}")
+            for name, handler, text_format in setups:
+                handler.setFormatter(
+                    logging.Formatter(text_format) if text_format else JSONFormatter()
+                )
+                handler.addFilter(RequestIdFilter())
+                for level in (logging.DEBUG, logging.INFO):
+                    micros = self.measure(handler, level)
+                    self.stdout.write(
+                        f"{name:<34}{logging.getLevelName(level):>7}{micros:>16.1f}"
+                    )
+                handler.close()
+
+    def measure(self, handler, level):
+        logger = logging.getLogger("registrar.benchmark")
+        logger.handlers, logger.propagate = [handler], False
+        logger.setLevel(level)
+        token = request_id.set("benchmark")
+        try:
+            start = perf_counter()
+            for i in range(self.requests):
+                for _ in range(self.debug):
+                    logger.debug("step %s of application %s", "purpose", i)
+                for _ in range(self.info):
+                    logger.info("saved application %s", i, extra={"user": i})
+            elapsed = perf_counter() - start
+            # records still queued are not the request's cost, but are written
+            handler.flush()
+        finally:
+            request_id.reset(token)
+            logger.handlers = []
+        return elapsed / self.requests * 1e6
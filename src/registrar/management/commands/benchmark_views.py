@@ -0,0 +1,396 @@
+"""Measure query counts, latency and memory for every registrar URL."""
+
+import json
+import logging
+import random
+import re
+import statistics
+import tracemalloc
+from time import perf_counter
+from unittest.mock import patch
+
+from auditlog.context import disable_auditlog  # type: ignore
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.template.base import Template
+from django.test import Client
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from django.urls import URLResolver, get_resolver
+from faker import Faker
+
+from registrar.fixtures import DomainApplicationFixture, fake
+from registrar.models import Domain, DomainApplication, DomainInvitation, User
+from registrar.utility.queries import QueryMonitor
+
+logger = logging.getLogger(__name__)
+
+BASELINE = settings.BASE_DIR / "registrar" / "tests" / "view_benchmarks.json"
+
+# URLs which are not measured, and why
+SKIP = {
+    "openid/": "redirects to Login.gov",
+    "api/v1/available/": "calls the registry and fetches the list of domains",
+    "logout/": "ends the session",
+    "metrics/": "is for scrapers, and changes with every request",
+    "health/ready/": "reports checks which run in the background",
+    "__debug__/": "debug toolbar",
+}
+
+# which seeded object fills in the parameters of a route, by route prefix
+SAMPLES = [
+    ("application/<id>/edit/", {"id": "started_application"}),
+    ("application/", {"pk": "submitted_application"}),
+    ("domain/", {"pk": "domain"}),
+    ("invitation/", {"pk": "invitation"}),
+]
+
+# differences smaller than these are noise, however large the percentage
+MIN_DIFFERENCE = {"p50_ms": 5, "p95_ms": 10, "render_ms": 5, "peak_kib": 64}
+
+PARAMETER = re.compile(r"<(?:\w+:)?(\w+)>")
+
+# what every domain's nameservers are, instead of asking the registry
+HOSTS = {"ns1.example.com": (), "ns2.example.com": ()}
+
+
+class RenderTimer:
+    """Add up the time spent rendering templates, while in a `with` block.
+
+    Only the outermost render is timed, as included templates are rendered
+    within it.
+    """
+
+    def __init__(self):
+        self.ms = 0.0
+        self._depth = 0
+
+    def __enter__(self):
+        render = Template.render
+        timer = self
+
+        def timed(template, context):
+            timer._depth += 1
+            start = perf_counter()
+            try:
+                return render(template, context)
+            finally:
+                timer._depth -= 1
+                if not timer._depth:
+                    timer.ms += (perf_counter() - start) * 1000
+
+        self._patcher = patch.object(Template, "render", timed)
+        self._patcher.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._patcher.stop()
+
+
+class ViewBenchmark:
+    """
+    Seed the database, then request every URL as a logged in user.
+
+    Each URL is requested `repeat` times after one warm-up request. Every
+    request runs in a transaction which is rolled back afterwards, so views
+    which change data (withdrawing an application, for example) can be
+    requested repeatedly and see the same data each time.
+    """
+
+    STATUSES = [
+        DomainApplication.STARTED,
+        DomainApplication.SUBMITTED,
+        DomainApplication.INVESTIGATING,
+    ]
+
+    def __init__(self, users=1000, applications=3, invitations=2, owned=30, repeat=20):
+        self.users = users
+        self.applications = applications
+        self.invitations = invitations
+        self.owned = owned
+        self.repeat = max(repeat, 2)
+        self.samples: dict = {}
+        self._count = 0
+
+    def seed(self):
+        """Create users with applications, domains and invitations."""
+        # same data every time, so that runs can be compared
+        random.seed(0)  # nosec
+        Faker.seed(0)
+        with disable_auditlog(), transaction.atomic():
+            self.user = User.objects.create(
+                username="benchmark",
+                email="benchmark@example.com",
+                is_staff=True,
+                is_superuser=True,
+            )
+            self._seed_user(self.user, self.owned)
+            for i in range(self.users):
+                user = User.objects.create(
+                    username=f"benchmark-{i}", email=fake.ascii_safe_email()
+                )
+                self._seed_user(user, self.applications)
+                if i % 100 == 99:
+                    logger.info("Seeded %d users", i + 1)
+
+        owned = DomainApplication.objects.filter(creator=self.user)
+        self.samples = {
+            "started_application": owned.filter(status=DomainApplication.STARTED)
+            .values_list("id", flat=True)
+            .first(),
+            "submitted_application": owned.filter(status=DomainApplication.SUBMITTED)
+            .values_list("id", flat=True)
+            .first(),
+            "domain": owned.exclude(approved_domain=None)
+            .values_list("approved_domain", flat=True)
+            .first(),
+        }
+        self.samples["invitation"] = (
+            DomainInvitation.objects.filter(domain=self.samples["domain"])
+            .values_list("id", flat=True)
+            .first()
+        )
+
+    def _seed_user(self, user, count):
+        for _ in range(count):
+            self._count += 1
+            status = self.STATUSES[self._count % len(self.STATUSES)]
+            application = DomainApplicationFixture.create(
+                user,
+                {
+                    "status": status,
+                    "organization_name": f"Benchmark {self._count}",
+                    "requested_domain": f"benchmark-{self._count}.gov",
+                },
+            )
+            if status == DomainApplication.INVESTIGATING:
+                application.approve()
+                application.save()
+                DomainInvitation.objects.bulk_create(
+                    DomainInvitation(
+                        email=fake.ascii_safe_email(),
+                        domain=application.approved_domain,
+                    )
+                    for _ in range(self.invitations)
+                )
+
+    def routes(self):
+        """Yield (route, url or None, reason for skipping) for every URL."""
+        for route in _routes(get_resolver().url_patterns):
+            reason = next((r for s, r in SKIP.items() if s in route), None)
+            if reason:
+                yield route, None, reason
+                continue
+            if "(" in route:
+                yield route, None, "is a regular expression with parameters"
+                continue
+            url = route.replace("^", "").replace("$", "")
+            names = PARAMETER.findall(url)
+            if names:
+                kwargs = next(
+                    (k for prefix, k in SAMPLES if route.startswith(prefix)), {}
+                )
+                if set(names) - set(kwargs):
+                    yield route, None, "needs parameters we do not provide"
+                    continue
+                url = PARAMETER.sub(
+                    lambda m: str(self.samples[kwargs[m.group(1)]]), url
+                )
+            yield route, "/" + url, None
+
+    def run(self):
+        """Measure every URL. Returns results and skipped URLs, by route."""
+        client = Client()
+        client.force_login(self.user)
+        results, skipped = {}, {}
+        # the registry's latency is not ours to measure
+        with patch.object(Domain, "_fetch_hosts", side_effect=lambda: dict(HOSTS)):
+            for route, url, reason in self.routes():
+                if url is None:
+                    skipped[route] = reason
+                else:
+                    results[route] = self.measure(client, url)
+        return results, skipped
+
+    def measure(self, client, url):
+        """Request `url` repeatedly and summarize what it cost."""
+        timings, renders, counts = [], [], []
+        for _ in range(self.repeat + 1):
+            with transaction.atomic():
+                # counted on every connection, so reads sent to the replica
+                # are included too
+                with QueryMonitor().installed() as queries, RenderTimer() as r:
+                    start = perf_counter()
+                    response = client.get(url)
+                    timings.append((perf_counter() - start) * 1000)
+                renders.append(r.ms)
+                counts.append(queries.count)
+                transaction.set_rollback(True)
+        # the first request loaded templates and filled caches
+        timings, renders, counts = timings[1:], renders[1:], counts[1:]
+
+        # tracing allocations is slow, so do it separately from timing
+        with transaction.atomic():
+            tracemalloc.start()
+            try:
+                client.get(url)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            transaction.set_rollback(True)
+
+        return {
+            "status": response.status_code,
+            # the most any request took, in case the count varies
+            "queries": max(counts),
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(statistics.quantiles(timings, n=20)[18], 2),
+            "render_ms": round(statistics.median(renders), 2),
+            "peak_kib": round(peak / 1024, 1),
+        }
+
+
+def compare(results, baseline, tolerance, metrics):
+    """Describe each way in which `results` are worse than `baseline`."""
+    problems = []
+    for route, result in results.items():
+        before = baseline.get(route)
+        if before is None:
+            continue
+        if result["queries"] > before["queries"]:
+            problems.append(
+                f"{route}: {result['queries']} queries, was {before['queries']}"
+            )
+        for metric in metrics:
+            if metric not in before:
+                continue
+            limit = max(
+                before[metric] * (1 + tolerance),
+                before[metric] + MIN_DIFFERENCE[metric],
+            )
+            if result[metric] > limit:
+                problems.append(
+                    f"{route}: {metric} is {result[metric]}, was {before[metric]}"
+                )
+    return problems
+
+
+def _routes(patterns, prefix=""):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _routes(pattern.url_patterns, prefix + str(pattern.pattern))
+        else:
+            yield prefix + str(pattern.pattern)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a test database, requests every URL and reports query counts, "
+        "latency and memory. Fails if a URL is worse than the stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument(
+            "--applications", type=int, default=3, help="Applications per user"
+        )
+        parser.add_argument(
+            "--invitations", type=int, default=2, help="Invitations per domain"
+        )
+        parser.add_argument(
+            "--owned",
+            type=int,
+            default=30,
+            help="Applications belonging to the user making the requests",
+        )
+        parser.add_argument("--repeat", type=int, default=20, help="Requests per URL")
+        parser.add_argument("--baseline", default=str(BASELINE))
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.5,
+            help="Allowed fractional increase in latency and memory",
+        )
+        parser.add_argument(
+            "--ignore-timing",
+            action="store_true",
+            help="Only compare queries and memory, for noisy machines",
+        )
+        parser.add_argument(
+            "--update",
+            action="store_true",
+            help="Write the results to the baseline instead of comparing",
+        )
+        parser.add_argument(
+            "--require-baseline",
+            action="store_true",
+            help="Fail if there is no baseline to compare with, as in CI",
+        )
+
+    def handle(self, *args, **options):
+        benchmark = ViewBenchmark(
+            users=options["users"],
+            applications=options["applications"],
+            invitations=options["invitations"],
+            owned=options["owned"],
+            repeat=options["repeat"],
+        )
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            self.stdout.write("Seeding database. . .")
+            benchmark.seed()
+            results, skipped = benchmark.run()
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(
+            f"{'route':<60}{'status':>7}{'queries':>9}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'render ms':>10}{'peak KiB':>10}"
+        )
+        for route, r in results.items():
+            self.stdout.write(
+                f"{route:<60}{r['status']:>7}{r['queries']:>9}"
+                f"{r['p50_ms']:>9}{r['p95_ms']:>9}{r['render_ms']:>10}"
+                f"{r['peak_kib']:>10}"
+            )
+        for route, reason in skipped.items():
+            self.stdout.write(f"skipped {route}: {reason}")
+
+        if options["update"]:
+            with open(options["baseline"], "w") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+                f.write("\n")
+            self.stdout.write(f"Wrote {options['baseline']}")
+            return
+
+        self._compare(results, options)
+
+    def _compare(self, results, options):
+        """Fail if `results` are worse than the baseline."""
+        try:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            message = f"No baseline at {options['baseline']}; record one with --update"
+            if options["require_baseline"]:
+                raise CommandError(message)
+            self.stdout.write(message)
+            return
+
+        metrics = ["peak_kib"]
+        if not options["ignore_timing"]:
+            metrics += ["p50_ms", "p95_ms", "render_ms"]
+        problems = compare(results, baseline, options["tolerance"], metrics)
+        for route in sorted(set(results) - set(baseline)):
+            self.stdout.write(f"{route} is not in the baseline")
+        if problems:
+            raise CommandError("Views got slower:\n" + "\n".join(problems))
+        self.stdout.write(self.style.SUCCESS("No regressions."))
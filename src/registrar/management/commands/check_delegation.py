@@ -0,0 +1,62 @@
+"""Check that nameservers answer for the domains they are listed for."""
+
+import logging
+
+from django.core.management import BaseCommand, CommandError
+
+from registrar.models import Domain
+from registrar.utility.delegation import DelegationChecker, Status, check_delegations
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Ask every nameserver of the given domains (or of all domains) "
+        "whether it answers for them, and record each answer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("domains", nargs="*", help="Domain names (default: all)")
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Check hosts again even if their last answer has not expired",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            help="Queries in flight at once (default: DELEGATION_CHECK_CONCURRENCY)",
+        )
+
+    def handle(self, domains, **options):
+        queryset = Domain.objects.all()
+        if domains:
+            queryset = queryset.filter(name__in=domains)
+            if not queryset.exists():
+                raise CommandError("None of those domains exist.")
+
+        results = check_delegations(
+            queryset.iterator(),
+            checker=DelegationChecker(concurrency=options["concurrency"]),
+            force=options["force"],
+        )
+
+        problems = [
+            (zone, result)
+            for zone, zone_results in results.items()
+            for result in zone_results
+            if result.status != Status.OK
+        ]
+        for zone, result in problems:
+            logger.warning(
+                "%s: %s (%s) is %s: %s",
+                zone,
+                result.host,
+                result.address,
+                result.status,
+                result.detail,
+            )
+        logger.info(
+            "Checked %d domains; %d answers were not OK", len(results), len(problems)
+        )
@@ -0,0 +1,37 @@
+"""Move queued audit log entries into the audit log."""
+
+import logging
+import time
+
+from django.core.management import BaseCommand
+
+from registrar.utility.audit import drain_audit_log_queue
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move audit log entries queued while AUDIT_LOG_QUEUE is set "
+        "into the audit log, in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Entries per transaction"
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep running, checking the queue this many seconds apart",
+        )
+
+    def handle(self, batch_size, interval, **options):
+        while True:
+            moved = drain_audit_log_queue(batch_size)
+            while moved:
+                logger.info("Moved %d audit log entries", moved)
+                moved = drain_audit_log_queue(batch_size)
+            if interval is None:
+                return
+            time.sleep(interval)
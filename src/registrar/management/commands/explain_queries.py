@@ -0,0 +1,92 @@
+"""Check that the queries which run most often are answered from indexes."""
+
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models.functions import Lower
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from registrar.models import Contact, DomainApplication, DomainInvitation, User
+
+from .benchmark_views import ViewBenchmark
+
+# a line of a plan which reads a whole table: "Seq Scan on ..." on
+# PostgreSQL, "SCAN table" (without "USING ... INDEX") on SQLite
+SEQUENTIAL = re.compile(r"Seq Scan on|\bSCAN \w+\s*$")
+
+
+def hot_queries(user, domain):
+    """The queries which run most often, by where they run, for `user`."""
+    email = user.email
+    return {
+        "User.first_login": DomainInvitation.objects.filter(
+            email=email, status=DomainInvitation.INVITED
+        ),
+        "signals.handle_profile": Contact.objects.filter(email=email),
+        "views.index": DomainApplication.objects.filter(
+            creator=user, status=DomainApplication.SUBMITTED
+        ),
+        "DomainInvitation.retrieve": User.objects.filter(email=email),
+        "domain_users._users_by_email": User.objects.annotate(
+            email_lower=Lower("email")
+        ).filter(email_lower__in=[email.lower()]),
+        "add_users_to_domain": DomainInvitation.objects.filter(domain=domain)
+        .annotate(email_lower=Lower("email"))
+        .filter(email_lower__in=[email.lower()]),
+    }
+
+
+def sequential_scans(plan):
+    """The lines of a plan from `QuerySet.explain` which read a whole table."""
+    return [line.strip() for line in plan.splitlines() if SEQUENTIAL.search(line)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a test database, shows the plan of each of the hottest "
+        "queries, and fails if any of them reads a whole table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument(
+            "--applications", type=int, default=3, help="Applications per user"
+        )
+
+    def handle(self, *args, users, applications, **options):
+        benchmark = ViewBenchmark(users=users, applications=applications)
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            self.stdout.write("Seeding database. . .")
+            benchmark.seed()
+            # let the planner know how big the tables are now
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+            problems = self.explain(benchmark.user, benchmark.samples["domain"])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+        if problems:
+            raise CommandError(
+                "Queries read whole tables:\n" + "\n".join(sorted(problems))
+            )
+        self.stdout.write(self.style.SUCCESS("Every query uses an index."))
+
+    def explain(self, user, domain):
+        """Show each query's plan. Returns the names of those which scan."""
+        problems = []
+        for name, queryset in hot_queries(user, domain).items():
+            plan = queryset.explain()
+            self.stdout.write(f"{name}:")
+            for line in plan.splitlines():
+                self.stdout.write(f"    {line}")
+            if sequential_scans(plan):
+                problems.append(name)
+        return problems
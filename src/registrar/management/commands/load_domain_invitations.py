@@ -42,6 +42,10 @@ class Command(BaseCommand):
                 # lowercase the domain names now
                 contact_domains[row[1]].append(row[0].lower())
         logger.info("Loaded domains for %d contacts", len(contact_domains))
+        domains = Domain.objects.in_bulk(
+            {name for names in contact_domains.values() for name in names},
+            field_name="name",
+        )
 
         # now we have a mapping of user IDs to lists of domains for that user
         # iterate over the contacts list and for contacts in our mapping,
@@ -59,7 +63,10 @@ class Command(BaseCommand):
                     continue
                 for domain_name in contact_domains[userid]:
                     email_address = row[6]
-                    domain = Domain.objects.get(name=domain_name)
+                    domain = domains.get(domain_name)
+                    if domain is None:
+                        logger.warning("No domain %s for %s", domain_name, userid)
+                        continue
                     to_create.append(
                         DomainInvitation(
                             email=email_address.lower(),
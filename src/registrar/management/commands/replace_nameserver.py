@@ -0,0 +1,53 @@
+"""Change a nameserver on every domain a user manages."""
+
+import logging
+
+from django.core.management import BaseCommand, CommandError
+
+from registrar.models import Domain
+from registrar.utility.nameservers import replace_nameserver
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Replace one nameserver with another on every domain "
+        "that the user with the given email address manages."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="Email address of the user")
+        parser.add_argument("old", help="Nameserver to replace, like ns1.example.com")
+        parser.add_argument("new", help="Nameserver to use instead")
+        parser.add_argument(
+            "addresses",
+            nargs="*",
+            help="IP addresses of the new nameserver, if it is subordinate",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Domains to update at the same time (default: REGISTRY_MAX_WORKERS)",
+        )
+
+    def handle(self, email, old, new, addresses, **options):
+        domains = Domain.objects.filter(permissions__user__email__iexact=email)
+        if not domains.exists():
+            raise CommandError(f"{email} does not manage any domains.")
+
+        result = replace_nameserver(
+            domains, old, (new, *addresses), max_workers=options["workers"]
+        )
+
+        logger.info(
+            "Changed %d domains; %d did not use %s",
+            len(result.changed),
+            len(result.unchanged),
+            old,
+        )
+        if result.failed:
+            raise CommandError(
+                "Could not update: "
+                + ", ".join(f"{name} ({why})" for name, why in result.failed.items())
+            )
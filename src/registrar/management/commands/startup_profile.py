@@ -0,0 +1,187 @@
+"""Measure how long it takes a fresh worker to boot and serve a request."""
+
+import json
+import os
+import re
+import subprocess  # nosec
+import sys
+from dataclasses import dataclass, field
+from typing import List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# apps whose import cost is summarized in the report
+APPS = ["registrar", "djangooidc"]
+
+# Run in a separate interpreter so that nothing is already imported.
+# Python's -X importtime writes its report to stderr; timings go to stdout.
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+# read before the middleware loads: AllowCIDRMiddleware replaces it with "*"
+from django.conf import settings
+host = settings.ALLOWED_HOSTS[0]
+from registrar.config.wsgi import application
+from wsgiref.util import setup_testing_defaults
+environ = {"PATH_INFO": sys.argv[1], "HTTP_HOST": host}
+setup_testing_defaults(environ)
+environ["wsgi.url_scheme"] = "https"
+status = []
+response = application(environ, lambda s, h, e=None: status.append(s))
+b"".join(response)
+response.close()
+done = time.perf_counter()
+print(json.dumps({
+    "setup": setup - start,
+    "first_request": done - setup,
+    "status": status[0],
+}))
+"""
+
+IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+@dataclass
+class Module:
+    """One line of `python -X importtime` output, with its children."""
+
+    name: str
+    self_us: int
+    cumulative_us: int
+    children: List["Module"] = field(default_factory=list)
+
+    @property
+    def cumulative_ms(self) -> float:
+        return self.cumulative_us / 1000
+
+
+@dataclass
+class Profile:
+    """The result of booting one worker."""
+
+    modules: List[Module]
+    setup: float
+    first_request: float
+    status: str
+
+    @property
+    def import_ms(self) -> float:
+        return sum(module.cumulative_ms for module in self.modules)
+
+    def app_ms(self, app: str) -> float:
+        """Milliseconds spent importing `app`, including what it imports."""
+        return sum(module.cumulative_ms for module in _outermost(self.modules, app))
+
+
+def parse_importtime(output: str) -> List[Module]:
+    """Turn `-X importtime` output into a tree of modules.
+
+    A module is printed after everything it imports, indented by two
+    spaces more than the module which imported it.
+    """
+    pending: dict = {}
+    for line in output.splitlines():
+        match = IMPORTTIME.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = len(indent) // 2
+        module = Module(name, int(self_us), int(cumulative_us))
+        module.children = pending.pop(depth + 1, [])
+        pending.setdefault(depth, []).append(module)
+    return pending.get(0, [])
+
+
+def run_profile(path="/health/") -> Profile:
+    """Boot a fresh interpreter, send it one request, and time both."""
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+    result = subprocess.run(  # nosec
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            PROBE,
+            path,
+        ],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=settings.BASE_DIR,
+    )
+    if result.returncode:
+        raise CommandError("Worker failed to start:\n" + result.stderr[-2000:])
+    timings = json.loads(result.stdout.splitlines()[-1])
+    return Profile(modules=parse_importtime(result.stderr), **timings)
+
+
+def _outermost(modules, app):
+    """Modules belonging to `app` which were not imported by another of them."""
+    for module in modules:
+        if module.name == app or module.name.startswith(app + "."):
+            yield module
+        else:
+            yield from _outermost(module.children, app)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures import cost and time to first request of a fresh worker. "
+        "Fails if imports take longer than STARTUP_IMPORT_BUDGET_MS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path", default="/health/", help="URL to request once booted"
+        )
+        parser.add_argument(
+            "--min-ms",
+            type=float,
+            default=5.0,
+            help="Hide modules which took less than this to import",
+        )
+        parser.add_argument(
+            "--depth", type=int, default=4, help="How deep to print the tree"
+        )
+        parser.add_argument(
+            "--budget",
+            type=float,
+            default=settings.STARTUP_IMPORT_BUDGET_MS,
+            help="Maximum milliseconds for all imports",
+        )
+
+    def handle(self, *args, **options):
+        profile = run_profile(options["path"])
+
+        for module in sorted(profile.modules, key=lambda m: -m.cumulative_us):
+            self._print_tree(module, 0, options["min_ms"], options["depth"])
+
+        self.stdout.write("")
+        for app in APPS:
+            self.stdout.write(f"{app + ' imports':<28}{profile.app_ms(app):>10.1f} ms")
+        self.stdout.write(f"{'all imports':<28}{profile.import_ms:>10.1f} ms")
+        self.stdout.write(f"{'django.setup()':<28}{profile.setup * 1000:>10.1f} ms")
+        self.stdout.write(
+            f"{'first request':<28}{profile.first_request * 1000:>10.1f} ms"
+            f"  ({options['path']} {profile.status})"
+        )
+
+        if profile.import_ms > options["budget"]:
+            raise CommandError(
+                f"Imports took {profile.import_ms:.0f} ms, "
+                f"over the budget of {options['budget']:.0f} ms."
+            )
+
+    def _print_tree(self, module, depth, min_ms, max_depth):
+        if module.cumulative_ms < min_ms or depth >= max_depth:
+            return
+        self.stdout.write(
+            f"{module.cumulative_ms:>10.1f} ms {module.self_us / 1000:>8.1f} ms  "
+            f"{'  ' * depth}{module.name}"
+        )
+        for child in sorted(module.children, key=lambda m: -m.cumulative_us):
+            self._print_tree(child, depth + 1, min_ms, max_depth)
@@ -0,0 +1,33 @@
+"""Delete expired sessions."""
+
+import logging
+import time
+
+from django.core.management import BaseCommand
+
+from registrar.utility.sessions import SessionStore
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Delete expired sessions from the database, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Sessions per statement"
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep running, sweeping this many seconds apart",
+        )
+
+    def handle(self, batch_size, interval, **options):
+        while True:
+            deleted = SessionStore.clear_expired(batch_size)
+            if deleted:
+                logger.info("Deleted %d expired sessions", deleted)
+            if interval is None:
+                return
+            time.sleep(interval)
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.1 on 2026-10-19 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("registrar", "0026_alter_domainapplication_address_line2_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="host",
+            name="delegation_checked_at",
+            field=models.DateTimeField(
+                blank=True, help_text="When the host was last checked", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="host",
+            name="delegation_detail",
+            field=models.TextField(
+                blank=True, help_text="What went wrong when the host was last checked"
+            ),
+        ),
+        migrations.AddField(
+            model_name="host",
+            name="delegation_expires_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the last check's answer goes out of date",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="host",
+            name="delegation_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("ok", "Answers for its domains"),
+                    ("lame", "Does not answer for its domains"),
+                    ("unreachable", "Could not be reached"),
+                ],
+                help_text="Whether the host answered for its domains when last checked",
+                max_length=20,
+            ),
+        ),
+    ]
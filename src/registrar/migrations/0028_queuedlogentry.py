@@ -0,0 +1,35 @@
+# Generated by Django 4.2.1 on 2026-10-19 13:05
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("registrar", "0027_host_delegation_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QueuedLogEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("timestamp", models.DateTimeField()),
+                (
+                    "entry",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        help_text="Field values of the auditlog LogEntry, by attribute name",
+                    ),
+                ),
+            ],
+        ),
+    ]
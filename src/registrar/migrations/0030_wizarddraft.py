@@ -0,0 +1,52 @@
+# Generated by Django 4.2.1 on 2026-10-19 13:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("registrar", "0029_admin_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WizardDraft",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("prefix", models.CharField(max_length=100)),
+                (
+                    "data",
+                    models.JSONField(
+                        default=dict,
+                        help_text="Progress through the form, such as the current step",
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="wizard_drafts",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "prefix"), name="unique_wizard_draft_per_user"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.1 on 2026-10-19 14:17
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("registrar", "0030_wizarddraft"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="domainapplication",
+            index=models.Index(
+                fields=["creator", "status"], name="application_creator_status"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="domaininvitation",
+            index=models.Index(
+                fields=["email", "status"], name="invitation_email_status"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["email"], name="user_email"),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"), name="user_email_lower"
+            ),
+        ),
+    ]
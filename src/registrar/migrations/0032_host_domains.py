@@ -0,0 +1,33 @@
+# Generated by Django 4.2.1 on 2026-10-19 16:02
+
+from django.db import migrations, models
+
+
+def link_hosts_to_their_domains(apps, schema_editor):
+    """Until now a host only knew one domain which used it."""
+    Host = apps.get_model("registrar", "Host")
+    Through = Host.domains.through
+    Through.objects.bulk_create(
+        Through(host_id=host_id, domain_id=domain_id)
+        for host_id, domain_id in Host.objects.values_list("id", "domain_id")
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("registrar", "0031_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="host",
+            name="domains",
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="Domains which use this host as a name server",
+                related_name="nameserver_hosts",
+                to="registrar.domain",
+            ),
+        ),
+        migrations.RunPython(link_hosts_to_their_domains, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 4.2.1 on 2026-10-19 17:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("registrar", "0032_host_domains"),
+    ]
+
+    operations = [
+        # Host.domains keeps its table; only now it has a model of its own
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="Delegation",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "domain",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="delegations",
+                                to="registrar.domain",
+                            ),
+                        ),
+                        (
+                            "host",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="delegations",
+                                to="registrar.host",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "db_table": "registrar_host_domains",
+                        "unique_together": {("host", "domain")},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name="host",
+                    name="domains",
+                    field=models.ManyToManyField(
+                        blank=True,
+                        help_text="Domains which use this host as a name server",
+                        related_name="nameserver_hosts",
+                        through="registrar.Delegation",
+                        to="registrar.domain",
+                    ),
+                ),
+            ],
+        ),
+        # a host's answer is now kept per domain; old answers are checked again
+        migrations.AddField(
+            model_name="delegation",
+            name="checked_at",
+            field=models.DateTimeField(
+                blank=True, help_text="When the host was last checked", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="delegation",
+            name="detail",
+            field=models.TextField(
+                blank=True, help_text="What went wrong when the host was last checked"
+            ),
+        ),
+        migrations.AddField(
+            model_name="delegation",
+            name="expires_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the last check's answer goes out of date",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="delegation",
+            name="status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("ok", "Answers for the domain"),
+                    ("lame", "Does not answer for the domain"),
+                    ("unreachable", "Could not be reached"),
+                ],
+                help_text="Whether the host answered for the domain when last checked",
+                max_length=20,
+            ),
+        ),
+        migrations.RemoveField(
+            model_name="host",
+            name="delegation_checked_at",
+        ),
+        migrations.RemoveField(
+            model_name="host",
+            name="delegation_detail",
+        ),
+        migrations.RemoveField(
+            model_name="host",
+            name="delegation_expires_at",
+        ),
+        migrations.RemoveField(
+            model_name="host",
+            name="delegation_status",
+        ),
+    ]
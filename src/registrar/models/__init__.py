@@ -1,6 +1,7 @@
-from auditlog.registry import auditlog  # type: ignore
+from registrar.utility import audit
 
 from .contact import Contact
+from .delegation import Delegation
 from .domain_application import DomainApplication
 from .domain_information import DomainInformation
 from .domain import Domain
@@ -11,11 +12,14 @@ from .domain_invitation import DomainInvitation
 from .nameserver import Nameserver
 from .user_domain_role import UserDomainRole
 from .public_contact import PublicContact
+from .queued_log_entry import QueuedLogEntry
 from .user import User
 from .website import Website
+from .wizard_draft import WizardDraft
 
 __all__ = [
     "Contact",
+    "Delegation",
     "DomainApplication",
     "DomainInformation",
     "Domain",
@@ -26,19 +30,22 @@ __all__ = [
     "Nameserver",
     "UserDomainRole",
     "PublicContact",
+    "QueuedLogEntry",
     "User",
     "Website",
+    "WizardDraft",
 ]
 
-auditlog.register(Contact)
-auditlog.register(DomainApplication)
-auditlog.register(Domain)
-auditlog.register(DraftDomain)
-auditlog.register(DomainInvitation)
-auditlog.register(HostIP)
-auditlog.register(Host)
-auditlog.register(Nameserver)
-auditlog.register(UserDomainRole)
-auditlog.register(PublicContact)
-auditlog.register(User)
-auditlog.register(Website)
+# audit log entries are buffered, instead of written one per save
+audit.register(Contact)
+audit.register(DomainApplication)
+audit.register(Domain)
+audit.register(DraftDomain)
+audit.register(DomainInvitation)
+audit.register(HostIP)
+audit.register(Host)
+audit.register(Nameserver)
+audit.register(UserDomainRole)
+audit.register(PublicContact)
+audit.register(User)
+audit.register(Website)
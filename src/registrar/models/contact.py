@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 from phonenumber_field.modelfields import PhoneNumberField  # type: ignore
 
@@ -54,6 +56,22 @@ class Contact(TimeStampedModel):
         db_index=True,
     )
 
+    class Meta:
+        indexes = [
+            # the admin's searches, which ignore case and match any part
+            GinIndex(
+                OpClass(Upper("email"), name="gin_trgm_ops"), name="contact_email_trgm"
+            ),
+            GinIndex(
+                OpClass(Upper("first_name"), name="gin_trgm_ops"),
+                name="contact_first_name_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("last_name"), name="gin_trgm_ops"),
+                name="contact_last_name_trgm",
+            ),
+        ]
+
     def get_formatted_name(self):
         """Returns the contact's name in Western order."""
         names = [n for n in [self.first_name, self.middle_name, self.last_name] if n]
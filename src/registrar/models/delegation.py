@@ -0,0 +1,61 @@
+from django.db import models
+
+
+class Delegation(models.Model):
+    """
+    One host listed as a name server of one domain.
+
+    Also records whether the host answered for that domain when last
+    checked. A host serving several domains may answer for some of them
+    and not others, so the answer is kept here rather than on the host.
+    Filled in by `registrar.utility.delegation`, not by users.
+    """
+
+    class Status(models.TextChoices):
+        OK = "ok", "Answers for the domain"
+        LAME = "lame", "Does not answer for the domain"
+        UNREACHABLE = "unreachable", "Could not be reached"
+
+    host = models.ForeignKey(
+        "registrar.Host",
+        on_delete=models.CASCADE,
+        related_name="delegations",
+    )
+
+    domain = models.ForeignKey(
+        "registrar.Domain",
+        on_delete=models.CASCADE,
+        related_name="delegations",
+    )
+
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        blank=True,
+        help_text="Whether the host answered for the domain when last checked",
+    )
+
+    detail = models.TextField(
+        blank=True,
+        help_text="What went wrong when the host was last checked",
+    )
+
+    checked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the host was last checked",
+    )
+
+    expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the last check's answer goes out of date",
+    )
+
+    class Meta:
+        # the table Django made for `Host.domains` before this model existed
+        db_table = "registrar_host_domains"
+        unique_together = [("host", "domain")]
+
+    def __str__(self) -> str:
+        return f"{self.host} for {self.domain}"
@@ -1,19 +1,28 @@
 import logging
 
 from datetime import date
+from typing import Optional
 from django_fsm import FSMField  # type: ignore
 
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import models, transaction
+from django.db.models.functions import Upper
 
 from epplibwrapper import (
     CLIENT as registry,
     commands,
+    common,
 )
 
+from registrar.utility import audit
+
 from .utility.domain_field import DomainField
 from .utility.domain_helper import DomainHelper
 from .utility.time_stamped_model import TimeStampedModel
 
+from .delegation import Delegation
+from .host import Host
+from .host_ip import HostIP
 from .public_contact import PublicContact
 
 logger = logging.getLogger(__name__)
@@ -168,7 +177,7 @@ class Domain(TimeStampedModel, DomainHelper):
         raise NotImplementedError()
 
     @property
-    def nameservers(self) -> list[tuple[str]]:
+    def nameservers(self) -> list[tuple[str, ...]]:
         """
         Get or set a complete list of nameservers for this domain.
 
@@ -178,18 +187,215 @@ class Domain(TimeStampedModel, DomainHelper):
 
         Subordinate hosts (something.your-domain.gov) MUST have IP addresses,
         while non-subordinate hosts MUST NOT.
+
+        The registry is asked once per object; later reads use that answer.
+        Setting sends only the differences: hosts which the registry does not
+        have yet are created, and every host added to or removed from this
+        domain is sent in a single update.
         """
-        # TODO: call EPP to get this info instead of returning fake data.
-        return [
-            ("ns1.example.com",),
-            ("ns2.example.com",),
-            ("ns3.example.com",),
-        ]
+        return [(name, *addresses) for name, addresses in self._hosts().items()]
 
     @nameservers.setter  # type: ignore
-    def nameservers(self, hosts: list[tuple[str]]):
-        # TODO: call EPP to set this info.
-        pass
+    def nameservers(self, hosts: list[tuple[str, ...]]):
+        desired = self._clean_hosts(hosts)
+        current = self._hosts()
+
+        added = [name for name in desired if name not in current]
+        removed = [name for name in current if name not in desired]
+        readdressed = [
+            name
+            for name in desired
+            if name in current and set(desired[name]) != set(current[name])
+        ]
+        if not (added or removed or readdressed):
+            return
+
+        requests = [
+            commands.CreateHost(name=name, addrs=self._ips(desired[name]))
+            for name in self._missing_hosts(added)
+        ]
+        for name in readdressed:
+            requests.append(
+                commands.UpdateHost(
+                    name=name,
+                    add=self._ips(set(desired[name]) - set(current[name])),
+                    rem=self._ips(set(current[name]) - set(desired[name])),
+                )
+            )
+        if added or removed:
+            requests.append(
+                commands.UpdateDomain(
+                    name=self.name,
+                    add=[common.HostObjSet(added)] if added else [],
+                    rem=[common.HostObjSet(removed)] if removed else [],
+                )
+            )
+        # one connection; stops before updating the domain if a host fails
+        registry.send_all(requests, cleaned=True)
+
+        self._nameservers = desired
+        self._save_hosts(desired)
+
+    def _hosts(self) -> dict[str, tuple[str, ...]]:
+        """This domain's hosts and their addresses, asking the registry once."""
+        if self._nameservers is None:
+            self._nameservers = self._fetch_hosts()
+        return self._nameservers
+
+    @property
+    def lame_nameservers(self) -> list[Host]:
+        """
+        This domain's hosts which did not answer for it when last checked.
+
+        Reads what `registrar.utility.delegation` stored; nothing is sent
+        to the nameservers here, so pages can show it without waiting.
+        """
+        return list(
+            Host.objects.filter(
+                name__in=list(self._hosts()),
+                delegations__domain=self,
+                delegations__status__in=[
+                    Delegation.Status.LAME,
+                    Delegation.Status.UNREACHABLE,
+                ],
+            ).order_by("name")
+        )
+
+    def _fetch_hosts(self) -> dict[str, tuple[str, ...]]:
+        response = registry.send(commands.InfoDomain(name=self.name), cleaned=True)
+        names = [self._clean_host_name(name) for name in response.res_data[0].hosts]
+
+        # only subordinate hosts have addresses; fetch them over one connection
+        subordinate = [name for name in names if self._is_subordinate(name)]
+        responses = (
+            registry.send_all(
+                [commands.InfoHost(name=name) for name in subordinate], cleaned=True
+            )
+            if subordinate
+            else []
+        )
+        addresses = {
+            name: tuple(ip.addr for ip in info.res_data[0].addrs)
+            for name, info in zip(subordinate, responses)
+        }
+        return {name: addresses.get(name, ()) for name in names}
+
+    def _missing_hosts(self, names: list[str]) -> list[str]:
+        """Which of these hosts the registry does not have. One request."""
+        if not names:
+            return []
+        response = registry.send(commands.CheckHost(names), cleaned=True)
+        return [name for name, host in zip(names, response.res_data) if host.avail]
+
+    def _save_hosts(self, hosts: dict[str, tuple[str, ...]]):
+        """Record hosts and addresses locally, creating only the missing rows.
+
+        Hosts which this domain no longer uses are unlinked from it, and
+        deleted once no domain uses them. A host shared with other domains
+        is handed to one of them if it belonged to this one.
+        """
+        with transaction.atomic():
+            known = set(
+                Host.objects.filter(name__in=list(hosts)).values_list("name", flat=True)
+            )
+            new = [name for name in hosts if name not in known]
+            Host.objects.bulk_create(
+                [Host(name=name, domain=self) for name in new], ignore_conflicts=True
+            )
+            # bulk_create sends no signals, and with ignore_conflicts no ids
+            if new:
+                audit.record_created(
+                    Host.objects.filter(name__in=new).select_related("domain")
+                )
+            # subdomains of this domain belong to it, whoever recorded them first
+            for host in Host.objects.filter(
+                name__in=[name for name in hosts if self._is_subordinate(name)]
+            ).exclude(domain=self):
+                host.domain = self
+                host.save(update_fields=["domain"])
+
+            dropped = list(
+                self.nameserver_hosts.exclude(name__in=list(hosts)).values_list(
+                    "id", flat=True
+                )
+            )
+            self.nameserver_hosts.remove(*dropped)
+            self.nameserver_hosts.add(*Host.objects.filter(name__in=list(hosts)))
+            self._forget_hosts(dropped)
+
+            subordinate_hosts = {
+                host.id: host
+                for host in Host.objects.filter(
+                    name__in=[name for name in hosts if self._is_subordinate(name)]
+                )
+            }
+            subordinate = {
+                host_id: set(hosts[host.name])
+                for host_id, host in subordinate_hosts.items()
+            }
+            existing: dict[int, set[str]] = {}
+            for host_id, address in HostIP.objects.filter(
+                host__in=list(subordinate)
+            ).values_list("host_id", "address"):
+                existing.setdefault(host_id, set()).add(address)
+            for host_id, addresses in existing.items():
+                stale = addresses - subordinate[host_id]
+                if stale:
+                    HostIP.objects.filter(host_id=host_id, address__in=stale).delete()
+            audit.record_created(
+                HostIP.objects.bulk_create(
+                    HostIP(host=subordinate_hosts[host_id], address=address)
+                    for host_id, addresses in subordinate.items()
+                    for address in addresses - existing.get(host_id, set())
+                )
+            )
+
+    def _forget_hosts(self, host_ids: list[int]):
+        """Delete these hosts if no domain uses them, or else hand them over."""
+        if not host_ids:
+            return
+        unused = list(
+            Host.objects.filter(id__in=host_ids, domains=None).values_list(
+                "id", flat=True
+            )
+        )
+        HostIP.objects.filter(host__in=unused).delete()
+        Host.objects.filter(id__in=unused).delete()
+        for host in Host.objects.filter(id__in=host_ids, domain=self):
+            # every host left is used by some other domain
+            successor = host.domains.order_by("id").first()
+            if successor is not None and not self._is_subordinate(host.name):
+                host.domain = successor
+                host.save(update_fields=["domain"])
+
+    def _clean_hosts(self, hosts) -> dict[str, tuple[str, ...]]:
+        """Normalize names and addresses, and check the addressing rules."""
+        cleaned: dict[str, tuple[str, ...]] = {}
+        for name, *addresses in hosts:
+            name = self._clean_host_name(name)
+            if not name:
+                continue
+            addresses = [a.strip() for a in addresses if a and a.strip()]
+            if self._is_subordinate(name) and not addresses:
+                raise ValueError("%s must have an IP address" % name)
+            if not self._is_subordinate(name) and addresses:
+                raise ValueError("%s must not have an IP address" % name)
+            cleaned[name] = tuple(dict.fromkeys(addresses))
+        return cleaned
+
+    @staticmethod
+    def _clean_host_name(name: str) -> str:
+        return name.strip().lower().rstrip(".")
+
+    def _is_subordinate(self, name: str) -> bool:
+        return name.endswith("." + self.name.lower())
+
+    @staticmethod
+    def _ips(addresses) -> list:
+        return [
+            common.Ip(addr=address, ip="v6" if ":" in address else None)
+            for address in sorted(addresses)
+        ]
 
     @property
     def statuses(self) -> list[str]:
@@ -276,6 +482,9 @@ class Domain(TimeStampedModel, DomainHelper):
     def __str__(self) -> str:
         return self.name
 
+    # registry hosts for this domain, once fetched; see `nameservers`
+    _nameservers: Optional[dict[str, tuple[str, ...]]] = None
+
     name = DomainField(
         max_length=253,
         blank=False,
@@ -292,6 +501,14 @@ class Domain(TimeStampedModel, DomainHelper):
         help_text="Very basic info about the lifecycle of this domain object",
     )
 
+    class Meta:
+        indexes = [
+            # the admin's searches, which ignore case and match any part
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"), name="domain_name_trgm"
+            ),
+        ]
+
     # ForeignKey on UserDomainRole creates a "permissions" member for
     # all of the user-roles that are in place for this domain
 
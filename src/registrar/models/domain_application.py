@@ -462,6 +462,14 @@ class DomainApplication(TimeStampedModel):
         help_text="Acknowledged .gov acceptable use policy",
     )
 
+    class Meta:
+        indexes = [
+            # a user's applications with a given status, on the home page
+            models.Index(
+                fields=["creator", "status"], name="application_creator_status"
+            ),
+        ]
+
     def __str__(self):
         try:
             if self.requested_domain and self.requested_domain.name:
@@ -600,24 +608,13 @@ class DomainApplication(TimeStampedModel):
         return False
 
     def to_dict(self):
-        """This is to process to_dict for Domain Information, making it friendly
-        to "copy" it
-
-        More information can be found at this- (This used #5)
-        https://stackoverflow.com/questions/21925671/convert-django-model-object-to-dict-with-all-of-the-fields-intact/29088221#29088221
-        """  # noqa 590
-        opts = self._meta
-        data = {}
-        for field in chain(opts.concrete_fields, opts.private_fields):
-            if field.get_internal_type() in ("ForeignKey", "OneToOneField"):
-                # get the related instance of the FK value
-                fk_id = field.value_from_object(self)
-                if fk_id:
-                    data[field.name] = field.related_model.objects.get(id=fk_id)
-                else:
-                    data[field.name] = None
-            else:
-                data[field.name] = field.value_from_object(self)
-        for field in opts.many_to_many:
-            data[field.name] = field.value_from_object(self)
-        return data
+        """This application's field values, to "copy" it into Domain Information.
+
+        Fields are keyed by attribute name, so relations are given as ids
+        (`creator_id`) and reading them runs no queries. Many-to-many fields
+        are not included; see `DomainInformation.create_many_from_da`.
+        """
+        return {
+            field.attname: field.value_from_object(self)
+            for field in chain(self._meta.concrete_fields, self._meta.private_fields)
+        }
@@ -14,8 +14,9 @@ class DomainInformation(TimeStampedModel):
 
     """A registrant's domain information for that domain, exported from
     DomainApplication. We use these field from DomainApplication with few exceptation
-    which are 'removed' via pop at the bottom of this file. Most of design for domain
-    management's user information are based on application, but we cannot change
+    which are left out by `create_many_from_da` at the bottom of this file. Most of
+    design for domain management's user information are based on application, but we
+    cannot change
     the application once approved, so copying them that way we can make changes
     after its approved. Most fields here are copied from Application."""
 
@@ -209,37 +210,71 @@ class DomainInformation(TimeStampedModel):
         except Exception:
             return ""
 
+    # application fields which are not copied, though they exist here too
+    NOT_COPIED = {"id", "created_at", "updated_at"}
+
     @classmethod
     def create_from_da(cls, domain_application, domain=None):
-        """Takes in a DomainApplication dict and converts it into DomainInformation"""
-        da_dict = domain_application.to_dict()
-        # remove the id so one can be assinged on creation
-        da_id = da_dict.pop("id", None)
-        # check if we have a record that corresponds with the domain
-        # application, if so short circuit the create
-        domain_info = cls.objects.filter(domain_application__id=da_id).first()
-        if domain_info:
-            return domain_info
-        # the following information below is not needed in the domain information:
-        da_dict.pop("status", None)
-        da_dict.pop("current_websites", None)
-        da_dict.pop("investigator", None)
-        da_dict.pop("alternative_domains", None)
-        da_dict.pop("requested_domain", None)
-        da_dict.pop("approved_domain", None)
-        other_contacts = da_dict.pop("other_contacts", [])
-        domain_info = cls(**da_dict)
-        domain_info.domain_application = domain_application
-        # Save so the object now have PK
-        # (needed to process the manytomany below before, first)
-        domain_info.save()
-
-        # Process the remaining "many to many" stuff
-        domain_info.other_contacts.add(*other_contacts)
-        if domain:
-            domain_info.domain = domain
-        domain_info.save()
-        return domain_info
+        """Takes in a DomainApplication and converts it into DomainInformation"""
+        return cls.create_many_from_da([(domain_application, domain)])[0]
+
+    @classmethod
+    def create_many_from_da(cls, applications_and_domains):
+        """Copy many DomainApplications into DomainInformation at once.
+
+        Takes (application, domain) pairs and returns the information for
+        each, in order. Applications copied before are not copied again.
+        Fields are copied by attribute name, so related objects are never
+        fetched, and the number of queries does not depend on how many
+        applications there are.
+        """
+        pairs = list(applications_and_domains)
+        existing = {
+            info.domain_application_id: info
+            for info in cls.objects.filter(
+                domain_application__in=[application.id for application, _ in pairs]
+            )
+        }
+
+        copied = {field.attname for field in cls._meta.concrete_fields}
+        copied -= cls.NOT_COPIED
+        created = {}
+        for application, domain in pairs:
+            if application.id in existing or application.id in created:
+                continue
+            values = application.to_dict()
+            created[application.id] = cls(
+                domain_application=application,
+                domain=domain,
+                **{name: values[name] for name in copied if name in values},
+            )
+        cls.objects.bulk_create(created.values())
+        cls._copy_other_contacts(created)
+
+        return [existing.get(a.id) or created[a.id] for a, _ in pairs]
+
+    @classmethod
+    def _copy_other_contacts(cls, infos_by_application_id):
+        """Copy the applications' other contacts with one read and one write."""
+        if not infos_by_application_id:
+            return
+        source = DomainApplication._meta.get_field("other_contacts")
+        target = cls._meta.get_field("other_contacts")
+        rows = source.remote_field.through.objects.filter(
+            **{f"{source.m2m_column_name()}__in": list(infos_by_application_id)}
+        ).values_list(source.m2m_column_name(), source.m2m_reverse_name())
+        Through = target.remote_field.through
+        Through.objects.bulk_create(
+            Through(
+                **{
+                    target.m2m_column_name(): infos_by_application_id[
+                        application_id
+                    ].id,
+                    target.m2m_reverse_name(): contact_id,
+                }
+            )
+            for application_id, contact_id in rows
+        )
 
     class Meta:
         verbose_name_plural = "Domain Information"
@@ -3,7 +3,9 @@
 import logging
 
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 from django_fsm import FSMField, transition  # type: ignore
 
@@ -39,6 +41,17 @@ class DomainInvitation(TimeStampedModel):
         protected=True,  # can't alter state except through transition methods!
     )
 
+    class Meta:
+        indexes = [
+            # the invitations waiting for a user when they first log in
+            models.Index(fields=["email", "status"], name="invitation_email_status"),
+            # the admin's searches, which ignore case and match any part
+            GinIndex(
+                OpClass(Upper("email"), name="gin_trgm_ops"),
+                name="invitation_email_trgm",
+            ),
+        ]
+
     def __str__(self):
         return f"Invitation for {self.email} on {self.domain} is {self.status}"
 
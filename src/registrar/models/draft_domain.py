@@ -1,6 +1,8 @@
 import logging
 
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 from .utility.domain_helper import DomainHelper
 from .utility.time_stamped_model import TimeStampedModel
@@ -20,3 +22,12 @@ class DraftDomain(TimeStampedModel, DomainHelper):
         default=None,  # prevent saving without a value
         help_text="Fully qualified domain name",
     )
+
+    class Meta:
+        indexes = [
+            # the admin's searches, which ignore case and match any part
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="draftdomain_name_trgm",
+            ),
+        ]
@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 from .utility.time_stamped_model import TimeStampedModel
 
@@ -13,6 +15,11 @@ class Host(TimeStampedModel):
 
     This model exists ONLY to allow a new registrant to draft DNS entries
     before their application is approved.
+
+    One host may be a name server for several domains; `domains` lists them.
+    `domain` is the one it belongs to: the domain it is a subdomain of, if
+    it is one of ours, or else one of the domains which use it. Whether it
+    answers for each of them is kept on the `Delegation` linking the two.
     """
 
     name = models.CharField(
@@ -30,3 +37,19 @@ class Host(TimeStampedModel):
         related_name="host",  # access this Host via the Domain as `domain.host`
         help_text="Domain to which this host belongs",
     )
+
+    domains = models.ManyToManyField(
+        "registrar.Domain",
+        blank=True,
+        related_name="nameserver_hosts",
+        through="registrar.Delegation",
+        help_text="Domains which use this host as a name server",
+    )
+
+    class Meta:
+        indexes = [
+            # the admin's searches, which ignore case and match any part
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"), name="host_name_trgm"
+            ),
+        ]
@@ -27,9 +27,13 @@ class PublicContact(TimeStampedModel):
         TECHNICAL = "technical", "Technical"
         SECURITY = "security", "Security"
 
-    def save(self, *args, **kwargs):
-        """Save to the registry and also locally in the registrar database."""
-        if hasattr(self, "domain"):
+    def save(self, *args, skip_epp_save=False, **kwargs):
+        """Save to the registry and also locally in the registrar database.
+
+        With `skip_epp_save`, only the local row is saved, for a contact
+        which is already in the registry.
+        """
+        if hasattr(self, "domain") and not skip_epp_save:
             match self.contact_type:
                 case PublicContact.ContactTypeChoices.REGISTRANT:
                     self.domain.registrant_contact = self
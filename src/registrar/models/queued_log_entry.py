@@ -0,0 +1,20 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class QueuedLogEntry(models.Model):
+    """
+    An audit log entry which has not been written to the audit log yet.
+
+    Used only when AUDIT_LOG_QUEUE is set. Requests then write here, which
+    is cheaper than the audit log's indexed table, and a worker moves the
+    entries across in batches. See `registrar.utility.audit`.
+    """
+
+    # when the change was committed; becomes the entry's timestamp
+    timestamp = models.DateTimeField()
+
+    entry = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        help_text="Field values of the auditlog LogEntry, by attribute name",
+    )
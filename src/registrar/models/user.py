@@ -1,9 +1,12 @@
 import logging
 
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Lower, Upper
 
 from .domain_invitation import DomainInvitation
+from .user_domain_role import UserDomainRole
 
 from phonenumber_field.modelfields import PhoneNumberField  # type: ignore
 
@@ -30,6 +33,27 @@ class User(AbstractUser):
         db_index=True,
     )
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # the user with an email address, such as an invitation's
+            models.Index(fields=["email"], name="user_email"),
+            # finding users by email address regardless of case
+            models.Index(Lower("email"), name="user_email_lower"),
+            # the admin's searches, which ignore case and match any part
+            GinIndex(
+                OpClass(Upper("email"), name="gin_trgm_ops"), name="user_email_trgm"
+            ),
+        ]
+
+    def domain_roles(self) -> dict:
+        """This user's role on each of their domains, by domain id.
+
+        Remembered on this object, which lives for one request.
+        """
+        if not hasattr(self, "_domain_roles"):
+            self._domain_roles = UserDomainRole.roles_for(self.pk)
+        return self._domain_roles
+
     def __str__(self):
         # this info is pulled from Login.gov
         if self.first_name or self.last_name:
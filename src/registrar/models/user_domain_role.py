@@ -1,4 +1,6 @@
-from django.db import models
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models, transaction
 
 from .utility.time_stamped_model import TimeStampedModel
 
@@ -40,6 +42,59 @@ class UserDomainRole(TimeStampedModel):
     def __str__(self):
         return "User {} is {} on domain {}".format(self.user, self.role, self.domain)
 
+    CACHE_PREFIX = "registrar:domain_roles:"
+
+    @classmethod
+    def roles_for(cls, user_id) -> dict:
+        """Return the user's role on each of their domains, by domain id.
+
+        If DOMAIN_ROLE_CACHE_ALIAS is set, the result is cached there under
+        a per-user version number, which `invalidate` increments whenever
+        the user's roles change.
+        """
+        alias = settings.DOMAIN_ROLE_CACHE_ALIAS
+        if not alias:
+            return cls._load_roles(user_id)
+
+        cache = caches[alias]
+        version = cache.get_or_set(cls._version_key(user_id), 1, timeout=None)
+        key = f"{cls.CACHE_PREFIX}{user_id}:{version}"
+        roles = cache.get(key)
+        if roles is None:
+            roles = cls._load_roles(user_id)
+            cache.set(key, roles, timeout=settings.DOMAIN_ROLE_CACHE_TIMEOUT)
+        return roles
+
+    @classmethod
+    def invalidate(cls, user_id):
+        """Forget any cached roles of this user, once the change is committed.
+
+        Waiting for the commit stops another request from caching the old
+        roles under the new version.
+        """
+        alias = settings.DOMAIN_ROLE_CACHE_ALIAS
+        if not alias:
+            return
+
+        def bump():
+            try:
+                caches[alias].incr(cls._version_key(user_id))
+            except ValueError:
+                # nothing has been cached for this user
+                pass
+
+        transaction.on_commit(bump)
+
+    @classmethod
+    def _version_key(cls, user_id):
+        return f"{cls.CACHE_PREFIX}{user_id}:version"
+
+    @classmethod
+    def _load_roles(cls, user_id) -> dict:
+        return dict(
+            cls.objects.filter(user_id=user_id).values_list("domain_id", "role")
+        )
+
     class Meta:
         constraints = [
             # a user can have only one role on a given domain, that is, there can
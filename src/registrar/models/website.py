@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 from .utility.time_stamped_model import TimeStampedModel
 
@@ -16,5 +18,14 @@ class Website(TimeStampedModel):
         help_text="",
     )
 
+    class Meta:
+        indexes = [
+            # the admin's searches, which ignore case and match any part
+            GinIndex(
+                OpClass(Upper("website"), name="gin_trgm_ops"),
+                name="website_website_trgm",
+            ),
+        ]
+
     def __str__(self) -> str:
         return str(self.website)
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.db import models
+
+
+class WizardDraft(models.Model):
+    """
+    Where a user has got to in a multi-page form, such as the application.
+
+    This is kept here rather than in the session so that pages of the form
+    which change nothing write nothing. See `views.utility.WizardStorage`.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="wizard_drafts",
+    )
+    # which form this is, such as "wizard_application"
+    prefix = models.CharField(max_length=100)
+    data = models.JSONField(
+        default=dict,
+        help_text="Progress through the form, such as the current step",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "prefix"], name="unique_wizard_draft_per_user"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.prefix} for {self.user}"
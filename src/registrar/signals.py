@@ -2,10 +2,12 @@ import logging
 
 from django.conf import settings
 from django.core.management import call_command
-from django.db.models.signals import post_save, post_migrate
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, post_migrate
 from django.dispatch import receiver
 
-from .models import User, Contact
+from .models import User, Contact, UserDomainRole
+from .utility.queries import CONNECTIONS_OPENED
 
 
 logger = logging.getLogger(__name__)
@@ -57,6 +59,13 @@ def handle_profile(sender, instance, **kwargs):
             )
 
 
+@receiver(post_save, sender=UserDomainRole)
+@receiver(post_delete, sender=UserDomainRole)
+def handle_domain_role(sender, instance, **kwargs):
+    """Forget cached domain roles of a user whose roles have changed."""
+    UserDomainRole.invalidate(instance.user_id)
+
+
 @receiver(post_migrate)
 def handle_loaddata(**kwargs):
     """Attempt to load test fixtures when in DEBUG mode."""
@@ -65,3 +74,9 @@ def handle_loaddata(**kwargs):
             call_command("load")
         except Exception as e:
             logger.warning(e)
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    """Count each new database connection, for /metrics."""
+    CONNECTIONS_OPENED.labels(connection.alias).inc()
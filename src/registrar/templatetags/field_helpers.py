@@ -1,10 +1,63 @@
 """Custom field helpers for our inputs."""
-import re
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
 
 from django import template
 
 register = template.Library()
 
+# context variables which are not "magic" but which the field's template uses
+PASSED_THROUGH = ("sublabel_text", "www_gov")
+
+
+@dataclass(frozen=True)
+class FieldPlan:
+    """What is the same each time a field of a given form is shown."""
+
+    # the widget's attributes, less its class
+    attrs: Dict[str, object]
+    classes: Tuple[str, ...]
+    label_tag: str
+    label_classes: Tuple[str, ...]
+
+
+# by form class and field name; a form must give a field the same
+# widget attributes every time it is made
+_plans: Dict[Tuple[type, str], FieldPlan] = {}
+
+
+def field_plan(field) -> FieldPlan:
+    """The parts of `input_with_errors` which depend only on the field."""
+    key = (type(field.form), field.name)
+    plan = _plans.get(key)
+    if plan is None:
+        attrs = dict(field.field.widget.attrs)
+        classes = (attrs.pop("class"),) if "class" in attrs else ()
+        label_classes = []
+        if field.use_fieldset:
+            label_classes.append("usa-legend")
+        if field.widget_type == "checkbox":
+            label_classes.append("usa-checkbox__label")
+        elif not field.use_fieldset:
+            label_classes.append("usa-label")
+        plan = _plans[key] = FieldPlan(
+            attrs=attrs,
+            classes=classes,
+            label_tag="legend" if field.use_fieldset else "label",
+            label_classes=tuple(label_classes),
+        )
+    return plan
+
+
+def _context_options(context) -> dict:
+    """The "magic" variables of `context`, as `context.flatten()` would have them."""
+    options = {}
+    for layer in context.dicts:
+        for key, value in layer.items():
+            if key.startswith(("attr_", "add_")) or key in PASSED_THROUGH:
+                options[key] = value
+    return options
+
 
 @register.inclusion_tag("includes/input_with_errors.html", takes_context=True)
 def input_with_errors(context, field=None):  # noqa: C901
@@ -42,42 +95,40 @@ def input_with_errors(context, field=None):  # noqa: C901
             fieldset/legend/field
         - checkbox label styling is different (this is handled, don't worry about it)
     """
-    context = context.flatten()
+    options = _context_options(context)
+    plan = field_plan(field)
+    context = {key: options[key] for key in PASSED_THROUGH if key in options}
     context["field"] = field
+    context["label_tag"] = plan.label_tag
 
-    # get any attributes specified in the field's definition
-    attrs = dict(field.field.widget.attrs)
+    attrs = dict(plan.attrs)
 
     # these will be converted to CSS strings
-    classes = []
-    label_classes = []
-    legend_classes = []
-    group_classes = []
+    classes: List[str] = list(plan.classes)
+    label_classes: List[str] = []
+    legend_classes: List[str] = []
+    group_classes: List[str] = []
 
     # this will be converted to an attribute string
     described_by = []
 
-    if "class" in attrs:
-        classes.append(attrs.pop("class"))
-
     # parse context for field attributes and classes
     # ---
-    # here we loop through all items in the context dictionary
-    # (this is the context which was being used to render the
-    #  outer template in which this {% input_with_errors %} appeared!)
-    # and look for "magic" keys -- these are used to modify the
-    # appearance and behavior of the final HTML
-    for key, value in context.items():
+    # here we loop through the "magic" keys from the context which
+    # was being used to render the outer template in which this
+    # {% input_with_errors %} appeared -- these are used to modify
+    # the appearance and behavior of the final HTML
+    for key, value in options.items():
         if key.startswith("attr_"):
-            attr_name = re.sub("_", "-", key[5:])
+            attr_name = key[5:].replace("_", "-")
             attrs[attr_name] = value
         elif key.startswith("add_error_attr_") and field.errors:
-            attr_name = re.sub("_", "-", key[15:])
+            attr_name = key[15:].replace("_", "-")
             attrs[attr_name] = value
 
         elif key == "add_class":
             classes.append(value)
-        elif key == "add_required_class" and field.required:
+        elif key == "add_required_class" and field.field.required:
             classes.append(value)
         elif key == "add_error_class" and field.errors:
             classes.append(value)
@@ -98,18 +149,7 @@ def input_with_errors(context, field=None):  # noqa: C901
         # associate the field programmatically with its hint text
         described_by.append(f"{attrs['id']}__message")
 
-    if field.use_fieldset:
-        context["label_tag"] = "legend"
-    else:
-        context["label_tag"] = "label"
-
-    if field.use_fieldset:
-        label_classes.append("usa-legend")
-
-    if field.widget_type == "checkbox":
-        label_classes.append("usa-checkbox__label")
-    elif not field.use_fieldset:
-        label_classes.append("usa-label")
+    label_classes.extend(plan.label_classes)
 
     if field.errors:
         # associate the field programmatically with its error message
@@ -2,12 +2,14 @@ import os
 import logging
 
 from contextlib import contextmanager
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 from typing import List, Dict
 
 from django.conf import settings
 from django.contrib.auth import get_user_model, login
 
+from registrar.models import Domain
+
 
 def get_handlers():
     """Obtain pointers to all StreamHandlers."""
@@ -84,3 +86,30 @@ class MockSESClient(Mock):
 
     def send_email(self, *args, **kwargs):
         self.EMAILS_SENT.append({"args": args, "kwargs": kwargs})
+
+
+class MockRegistry:
+    """
+    Stand in for the registry in tests of pages which show domains.
+
+    Every domain has `hosts` as its nameservers. Whatever else is sent
+    to the registry is recorded on `registry`, a Mock.
+    """
+
+    def __init__(self, hosts=None):
+        if hosts is None:
+            hosts = {"ns1.example.com": (), "ns2.example.com": ()}
+        self.hosts = hosts
+        self._patchers = [
+            patch("registrar.models.domain.registry"),
+            patch.object(Domain, "_fetch_hosts", side_effect=lambda: dict(hosts)),
+        ]
+
+    def start(self):
+        self.registry = self._patchers[0].start()
+        self._patchers[1].start()
+        return self
+
+    def stop(self):
+        for patcher in reversed(self._patchers):
+            patcher.stop()
@@ -0,0 +1,22 @@
+"""The test runner, set as TEST_RUNNER in settings."""
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """Run tests with every read going to the primary database.
+
+    Each test's data is in a transaction which is never committed, so a
+    replica could not see it. Tests of routing turn replicas back on with
+    `override_settings(DATABASE_REPLICAS=[...])`.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._primary_only = override_settings(DATABASE_REPLICAS=[])
+        self._primary_only.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._primary_only.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,100 @@
+"""Test the admin's lists of big tables."""
+
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from registrar.models import DomainApplication, DraftDomain, User
+from registrar.views.utility.pagination import EstimatedCountPaginator
+
+
+class TestAdminChangelists(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com"
+        )
+        self.client.force_login(self.admin)
+
+    def add_applications(self, count):
+        start = DomainApplication.objects.count()
+        for i in range(start, start + count):
+            creator = User.objects.create(username=f"user{i}", email=f"u{i}@a.gov")
+            DomainApplication.objects.create(
+                creator=creator,
+                requested_domain=DraftDomain.objects.create(name=f"city{i}.gov"),
+            )
+
+    def get_applications(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("admin:registrar_domainapplication_changelist"), params
+            )
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_queries_do_not_grow_with_rows(self):
+        self.add_applications(2)
+        self.get_applications()  # fill caches such as content types
+        _, few = self.get_applications()
+        self.add_applications(5)
+        response, many = self.get_applications()
+        self.assertEqual(few, many)
+        self.assertContains(response, "city6.gov")
+
+    def test_choices_do_not_query_per_row(self):
+        """Naming each application in a form's choices needs no queries."""
+        url = reverse("admin:registrar_domaininformation_add")
+        self.add_applications(2)
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        self.add_applications(5)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+        self.assertEqual(len(few), len(many))
+        self.assertContains(response, "city6.gov")
+
+    def test_search(self):
+        self.add_applications(3)
+        response, _ = self.get_applications(q="city1")
+        self.assertContains(response, "city1.gov")
+        self.assertNotContains(response, "city2.gov")
+
+        response, _ = self.get_applications(q="u2@a.gov")
+        self.assertContains(response, "city2.gov")
+        self.assertNotContains(response, "city1.gov")
+
+
+class TestEstimatedCountPaginator(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create(username=f"user{i}") for i in range(5)]
+        self.queryset = User.objects.order_by("username")
+
+    def test_exact_count_without_estimate(self):
+        self.assertEqual(EstimatedCountPaginator(self.queryset, 2).count, 5)
+
+    @patch("registrar.views.utility.pagination.estimated_count", return_value=99999)
+    def test_estimate_for_big_tables(self, _):
+        self.assertEqual(EstimatedCountPaginator(self.queryset, 2).count, 99999)
+        # filtered lists are counted exactly
+        filtered = self.queryset.filter(username__startswith="user")
+        self.assertEqual(EstimatedCountPaginator(filtered, 2).count, 5)
+
+    @patch("registrar.views.utility.pagination.estimated_count", return_value=500)
+    def test_exact_count_for_small_tables(self, _):
+        self.assertEqual(EstimatedCountPaginator(self.queryset, 2).count, 5)
+
+    def test_pages(self):
+        paginator = EstimatedCountPaginator(self.queryset, 2)
+        self.assertEqual(
+            [
+                [user.username for user in paginator.page(number)]
+                for number in paginator.page_range
+            ],
+            [["user0", "user1"], ["user2", "user3"], ["user4"]],
+        )
+        self.assertTrue(paginator.page(2).has_next())
+        self.assertFalse(paginator.page(3).has_next())
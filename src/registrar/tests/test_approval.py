@@ -0,0 +1,177 @@
+"""Test approving many domain applications at once."""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.contrib.messages import get_messages
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+from django.test import TestCase
+from django.urls import reverse
+
+from epplibwrapper import RegistryError
+from registrar.models import (
+    Domain,
+    DomainApplication,
+    DomainInformation,
+    DraftDomain,
+    PublicContact,
+    User,
+    UserDomainRole,
+)
+from registrar.utility.approval import approve_applications
+
+from .common import less_console_noise
+
+
+class TestApproveApplications(TestCase):
+    def setUp(self):
+        patcher = patch("registrar.utility.approval.registry")
+        self.registry = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.taken = set()
+        self.registry.send.side_effect = lambda command, **kwargs: SimpleNamespace(
+            res_data=[
+                SimpleNamespace(avail=name not in self.taken) for name in command.names
+            ]
+        )
+        self.creator = User.objects.create(username="mayor")
+
+    def application(self, name, status=DomainApplication.SUBMITTED):
+        return DomainApplication.objects.create(
+            creator=self.creator,
+            requested_domain=DraftDomain.objects.create(name=name),
+            status=status,
+        )
+
+    def test_approves_and_creates(self):
+        applications = [self.application(f"city{i}.gov") for i in range(3)]
+        result = approve_applications(
+            DomainApplication.objects.filter(id__in=[a.id for a in applications]),
+            max_workers=1,
+        )
+        self.assertEqual(
+            sorted(result.approved), ["city0.gov", "city1.gov", "city2.gov"]
+        )
+        self.assertEqual(result.failed, {})
+
+        # one availability check for all of them
+        self.registry.send.assert_called_once()
+        self.assertEqual(self.registry.send_all.call_count, 3)
+
+        for application in DomainApplication.objects.all():
+            self.assertEqual(application.status, DomainApplication.APPROVED)
+            domain = application.approved_domain
+            self.assertEqual(domain.name, application.requested_domain.name)
+            self.assertEqual(
+                DomainInformation.objects.get(domain=domain).creator, self.creator
+            )
+            self.assertTrue(
+                UserDomainRole.objects.filter(user=self.creator, domain=domain).exists()
+            )
+            self.assertEqual(
+                PublicContact.objects.get(domain=domain).contact_type,
+                PublicContact.ContactTypeChoices.REGISTRANT,
+            )
+
+    def test_failures_are_reported_per_application(self):
+        ok = self.application("city1.gov")
+        started = self.application("city2.gov", status=DomainApplication.STARTED)
+        self.application("city3.gov")
+        duplicate = self.application("city3.gov")
+        Domain.objects.create(name="city4.gov")
+        used = self.application("city4.gov")
+        self.taken.add("city5.gov")
+        taken = self.application("city5.gov")
+
+        result = approve_applications(DomainApplication.objects.all(), max_workers=1)
+
+        self.assertEqual(sorted(result.approved), ["city1.gov", "city3.gov"])
+        self.assertEqual(
+            sorted(result.failed), ["city2.gov", "city3.gov", "city4.gov", "city5.gov"]
+        )
+        for application in [started, duplicate, used, taken]:
+            application.refresh_from_db()
+            self.assertIsNone(application.approved_domain)
+        ok.refresh_from_db()
+        self.assertEqual(ok.status, DomainApplication.APPROVED)
+
+    def test_registry_errors_do_not_stop_the_others(self):
+        for i in range(3):
+            self.application(f"city{i}.gov")
+        self.registry.send_all.side_effect = [None, RegistryError("busy"), None]
+        with less_console_noise():
+            result = approve_applications(
+                DomainApplication.objects.order_by("id"), max_workers=1
+            )
+        self.assertEqual(result.failed, {"city1.gov": "busy"})
+        self.assertEqual(sorted(result.approved), ["city0.gov", "city2.gov"])
+        self.assertFalse(Domain.objects.filter(name="city1.gov").exists())
+
+    def test_save_failures_do_not_undo_the_others(self):
+        for i in range(3):
+            self.application(f"city{i}.gov")
+        create_from_da = DomainInformation.create_from_da
+
+        def fail_for_city1(application, domain):
+            if domain.name == "city1.gov":
+                raise IntegrityError("duplicate")
+            return create_from_da(application, domain=domain)
+
+        with patch.object(
+            DomainInformation, "create_from_da", side_effect=fail_for_city1
+        ), less_console_noise():
+            result = approve_applications(
+                DomainApplication.objects.order_by("id"), max_workers=1
+            )
+        self.assertEqual(sorted(result.approved), ["city0.gov", "city2.gov"])
+        self.assertEqual(list(result.failed), ["city1.gov"])
+        self.assertFalse(Domain.objects.filter(name="city1.gov").exists())
+        self.assertEqual(
+            DomainApplication.objects.get(requested_domain__name="city1.gov").status,
+            DomainApplication.SUBMITTED,
+        )
+
+    def test_availability_check_fails(self):
+        self.application("city1.gov")
+        self.registry.send.side_effect = RegistryError("down")
+        with less_console_noise():
+            result = approve_applications(DomainApplication.objects.all())
+        self.assertEqual(list(result.failed), ["city1.gov"])
+        self.registry.send_all.assert_not_called()
+        self.assertFalse(Domain.objects.exists())
+
+    def test_admin_action(self):
+        self.application("city1.gov")
+        self.taken.add("city2.gov")
+        self.application("city2.gov")
+        admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com"
+        )
+        self.client.force_login(admin)
+        with less_console_noise():
+            response = self.client.post(
+                reverse("admin:registrar_domainapplication_changelist"),
+                {
+                    "action": "approve_selected",
+                    "_selected_action": list(
+                        DomainApplication.objects.values_list("id", flat=True)
+                    ),
+                },
+            )
+        self.assertEqual(response.status_code, 302)
+        shown = [str(message) for message in get_messages(response.wsgi_request)]
+        self.assertEqual(
+            shown,
+            ["Approved 1 applications.", "city2.gov: Not available in the registry."],
+        )
+
+    def test_command(self):
+        self.application("city1.gov")
+        self.application("city2.gov", status=DomainApplication.STARTED)
+        call_command("approve_applications", all_submitted=True, workers=1)
+        self.assertTrue(Domain.objects.filter(name="city1.gov").exists())
+
+        application = self.application("city3.gov", status=DomainApplication.STARTED)
+        with self.assertRaises(CommandError):
+            call_command("approve_applications", application.id)
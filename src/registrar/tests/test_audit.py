@@ -0,0 +1,161 @@
+"""Test writing audit log entries in batches."""
+
+from auditlog.context import disable_auditlog, set_actor  # type: ignore
+from auditlog.models import LogEntry  # type: ignore
+from django.core.management import call_command
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from registrar.models import Contact, QueuedLogEntry, User
+from registrar.utility.audit import (
+    AuditLogBufferMiddleware,
+    buffered_audit_log,
+    drain_audit_log_queue,
+)
+
+
+class TestBufferedAuditLog(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="auditor")
+        LogEntry.objects.all().delete()
+
+    def test_unbuffered_writes_as_it_goes(self):
+        Contact.objects.create(first_name="Ann")
+        self.assertEqual(LogEntry.objects.count(), 1)
+
+    def test_written_together_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with buffered_audit_log():
+                contact = Contact.objects.create(first_name="Ann")
+                contact.last_name = "Ames"
+                contact.save()
+                Contact.objects.create(first_name="Bob")
+                self.assertEqual(LogEntry.objects.count(), 0)
+            self.assertEqual(LogEntry.objects.count(), 0)
+
+        self.assertEqual(
+            list(LogEntry.objects.order_by("id").values_list("action", flat=True)),
+            [LogEntry.Action.CREATE, LogEntry.Action.UPDATE, LogEntry.Action.CREATE],
+        )
+        update = LogEntry.objects.get(action=LogEntry.Action.UPDATE)
+        self.assertEqual(update.changes_dict["last_name"], ["None", "Ames"])
+        self.assertEqual(update.object_id, contact.id)
+
+    def test_one_insert(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with buffered_audit_log():
+                for name in ["Ann", "Bob", "Cat"]:
+                    Contact.objects.create(first_name=name)
+        # one delete (of entries for reused pks) and one insert, in a savepoint
+        with self.assertNumQueries(4):
+            for callback in callbacks:
+                callback()
+        self.assertEqual(LogEntry.objects.count(), 3)
+
+    def test_rolled_back_changes_are_not_logged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with buffered_audit_log():
+                Contact.objects.create(first_name="Ann")
+                try:
+                    with transaction.atomic():
+                        Contact.objects.create(first_name="Bob")
+                        raise ValueError()
+                except ValueError:
+                    pass
+        self.assertEqual(
+            list(LogEntry.objects.values_list("object_repr", flat=True)),
+            [str(Contact.objects.get(first_name="Ann"))],
+        )
+
+    def test_actor_is_recorded(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with set_actor(self.user, remote_addr="10.0.0.1"):
+                with buffered_audit_log():
+                    Contact.objects.create(first_name="Ann")
+        entry = LogEntry.objects.get()
+        self.assertEqual(entry.actor, self.user)
+        self.assertEqual(entry.remote_addr, "10.0.0.1")
+
+    def test_disabled(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with buffered_audit_log(), disable_auditlog():
+                Contact.objects.create(first_name="Ann")
+        self.assertEqual(LogEntry.objects.count(), 0)
+
+    def test_middleware(self):
+        def view(request):
+            Contact.objects.create(first_name="Ann")
+            self.assertEqual(LogEntry.objects.count(), 0)
+            return HttpResponse()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AuditLogBufferMiddleware(view)(RequestFactory().get("/"))
+        self.assertEqual(LogEntry.objects.count(), 1)
+
+
+@override_settings(AUDIT_LOG_QUEUE=True)
+class TestAuditLogQueue(TestCase):
+    def setUp(self):
+        LogEntry.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            with buffered_audit_log():
+                self.contact = Contact.objects.create(first_name="Ann")
+                self.contact.last_name = "Ames"
+                self.contact.save()
+
+    def test_queued(self):
+        self.assertEqual(LogEntry.objects.count(), 0)
+        self.assertEqual(QueuedLogEntry.objects.count(), 2)
+
+    def test_unbuffered_entries_are_queued(self):
+        Contact.objects.create(first_name="Bob")
+        self.assertEqual(LogEntry.objects.count(), 0)
+        self.assertEqual(QueuedLogEntry.objects.count(), 3)
+
+    def test_drain(self):
+        queued = list(QueuedLogEntry.objects.order_by("id"))
+        self.assertEqual(drain_audit_log_queue(batch_size=1), 1)
+        self.assertEqual(drain_audit_log_queue(), 1)
+        self.assertEqual(drain_audit_log_queue(), 0)
+
+        entries = list(LogEntry.objects.order_by("id"))
+        self.assertEqual(
+            [entry.action for entry in entries],
+            [LogEntry.Action.CREATE, LogEntry.Action.UPDATE],
+        )
+        # the time of the change, not of draining
+        self.assertEqual(
+            [entry.timestamp for entry in entries], [q.timestamp for q in queued]
+        )
+        self.assertEqual(entries[1].object_id, self.contact.id)
+        self.assertFalse(QueuedLogEntry.objects.exists())
+
+    def test_command(self):
+        call_command("drain_audit_log", batch_size=1)
+        self.assertEqual(LogEntry.objects.count(), 2)
+        self.assertFalse(QueuedLogEntry.objects.exists())
+
+    def test_admin_shows_queued_entries(self):
+        admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com"
+        )
+        self.client.force_login(admin)
+        response = self.client.get(reverse("admin:auditlog_logentry_changelist"))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(QueuedLogEntry.objects.exists())
+        self.assertContains(response, "Ames")
+
+    @override_settings(AUDIT_LOG_ADMIN_BATCH=1)
+    def test_admin_moves_one_batch(self):
+        admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com"
+        )
+        self.client.force_login(admin)
+        # creating and logging in the admin queued entries too
+        queued = QueuedLogEntry.objects.count()
+        response = self.client.get(reverse("admin:auditlog_logentry_changelist"))
+        self.assertEqual(LogEntry.objects.count(), 1)
+        self.assertEqual(QueuedLogEntry.objects.count(), queued - 1)
+        self.assertContains(response, "Some recent changes are not shown yet.")
@@ -0,0 +1,47 @@
+from django.core.management import CommandError
+from django.test import Client, SimpleTestCase, TestCase
+
+from registrar.management.commands.benchmark_views import (
+    Command,
+    ViewBenchmark,
+    compare,
+)
+
+from .common import less_console_noise
+
+
+class TestViewBenchmark(TestCase):
+    def setUp(self):
+        self.benchmark = ViewBenchmark(
+            users=2, applications=3, invitations=1, owned=3, repeat=2
+        )
+        self.benchmark.seed()
+
+    def test_every_url_is_measured_or_skipped(self):
+        """Each URL is measured, or skipped for a stated reason."""
+        with less_console_noise():
+            results, skipped = self.benchmark.run()
+        self.assertIn("", results)
+        self.assertIn("domain/<int:pk>/users", results)
+        self.assertIn("application/<int:pk>/withdrawconfirmed", results)
+        self.assertTrue(all(skipped.values()))
+        for route, result in results.items():
+            self.assertLess(result["status"], 500, route)
+
+    def test_queries_are_counted(self):
+        client = Client()
+        client.force_login(self.benchmark.user)
+        self.assertGreater(self.benchmark.measure(client, "/")["queries"], 0)
+
+    def test_compare_flags_more_queries(self):
+        before = {"p50_ms": 10, "p95_ms": 20, "peak_kib": 100, "queries": 5}
+        after = {**before, "queries": 6, "p50_ms": 11}
+        problems = compare({"": after}, {"": before}, 0.5, ["p50_ms", "p95_ms"])
+        self.assertEqual(problems, [": 6 queries, was 5"])
+
+
+class TestBaseline(SimpleTestCase):
+    def test_missing_baseline_fails_when_required(self):
+        options = {"baseline": "/nonexistent.json", "require_baseline": True}
+        with self.assertRaisesRegex(CommandError, "No baseline"):
+            Command()._compare({}, options)
@@ -0,0 +1,276 @@
+"""Test checking nameservers against a stub DNS server on this machine."""
+
+import asyncio
+import struct
+import threading
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from registrar.models import Delegation, Domain, Host
+from registrar.utility.delegation import (
+    AA,
+    IN,
+    MAX_TTL,
+    QR,
+    SOA,
+    TC,
+    DelegationChecker,
+    Status,
+    build_query,
+    check_delegations,
+    parse_response,
+)
+
+from .common import MockRegistry
+
+
+class StubNameserver:
+    """
+    Answers SOA queries over UDP and TCP on 127.0.0.1.
+
+    How it answers depends on the zone asked about: see `answer`. Runs its
+    own event loop in a thread, so code under test can use `asyncio.run`.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self._listen(), self.loop).result()
+        return self
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.udp.close)
+        self.loop.call_soon_threadsafe(self.tcp.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    async def _listen(self):
+        stub = self
+
+        class UDP(asyncio.DatagramProtocol):
+            def connection_made(self, transport):
+                self.transport = transport
+
+            def datagram_received(self, data, addr):
+                reply = stub.answer(data, tcp=False)
+                if reply is not None:
+                    self.transport.sendto(reply, addr)
+
+        self.tcp = await asyncio.start_server(self._serve_tcp, "127.0.0.1", 0)
+        self.port = self.tcp.sockets[0].getsockname()[1]
+        self.udp, _ = await self.loop.create_datagram_endpoint(
+            UDP, local_addr=("127.0.0.1", self.port)
+        )
+
+    async def _serve_tcp(self, reader, writer):
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+        reply = self.answer(await reader.readexactly(length), tcp=True)
+        # for cut.gov, promise more than is sent before hanging up
+        promised = len(reply) + (10 if self.queries[-1][0] == "cut" else 0)
+        writer.write(struct.pack("!H", promised) + reply)
+        await writer.drain()
+        writer.close()
+
+    def answer(self, query, tcp):
+        """Zones are named for how they are answered, like ok.gov or silent.gov.
+
+        short.gov is answered with a message which ends too soon, and cut.gov
+        with a TCP reply shorter than its length says.
+        """
+        end = query.index(b"\0", 12) + 5
+        question = query[12:end]
+        zone = question[1 : 1 + question[0]].decode()
+        self.queries.append((zone, tcp))
+
+        flags, answers = QR | AA, 1
+        if zone == "silent":
+            return None
+        if zone == "refused":
+            flags, answers = QR | 5, 0
+        if zone == "notauth":
+            flags = QR
+        if zone in ("big", "cut") and not tcp:
+            flags, answers = QR | AA | TC, 0
+
+        header = query[:2] + struct.pack("!HHHHH", flags, 1, answers, 0, 0)
+        # SOA rdata: two names pointing back at the question, and five numbers
+        rdata = b"\xc0\x0c\xc0\x0c" + struct.pack("!IIIII", 1, 2, 3, 4, 5)
+        record = b"\xc0\x0c" + struct.pack("!HHIH", SOA, IN, 120, len(rdata)) + rdata
+        reply = header + question + record * answers
+        if zone == "short":
+            # ends partway through the answer's fixed fields
+            return reply[: len(header + question) + 6]
+        return reply
+
+
+class TestMessages(TestCase):
+    def test_parse_own_query_is_rejected(self):
+        """A query is not a response."""
+        with self.assertRaises(ValueError):
+            parse_response(build_query("igorville.gov", 7), 7)
+
+    def test_parse_wrong_id(self):
+        stub = StubNameserver()
+        reply = stub.answer(build_query("ok.gov", 7), tcp=False)
+        with self.assertRaises(ValueError):
+            parse_response(reply, 8)
+
+    def test_parse_soa_ttl(self):
+        stub = StubNameserver()
+        flags, rcode, ttl = parse_response(
+            stub.answer(build_query("ok.gov", 7), tcp=False), 7
+        )
+        self.assertTrue(flags & AA)
+        self.assertEqual((rcode, ttl), (0, 120))
+
+
+class TestDelegationChecker(TestCase):
+    def setUp(self):
+        self.stub = StubNameserver().start()
+        self.addCleanup(self.stub.stop)
+        self.checker = DelegationChecker(
+            concurrency=10, timeout=0.2, port=self.stub.port
+        )
+
+    def check(self, *zones):
+        results = asyncio.run(
+            self.checker.check(
+                {f"{zone}.gov": {"ns1.example.com": ("127.0.0.1",)} for zone in zones}
+            )
+        )
+        return {zone: result for zone, (result,) in results.items()}
+
+    def test_statuses(self):
+        results = self.check("ok", "refused", "notauth", "silent")
+        self.assertEqual(results["ok.gov"].status, Status.OK)
+        self.assertEqual(results["ok.gov"].ttl, 120)
+        self.assertEqual(results["refused.gov"].status, Status.LAME)
+        self.assertEqual(results["notauth.gov"].status, Status.LAME)
+        self.assertEqual(results["silent.gov"].status, Status.UNREACHABLE)
+
+    def test_truncated_answer_is_asked_again_over_tcp(self):
+        results = self.check("big")
+        self.assertEqual(results["big.gov"].status, Status.OK)
+        self.assertEqual(self.stub.queries, [("big", False), ("big", True)])
+
+    def test_answers_cut_short_fail_only_their_host(self):
+        results = self.check("short", "cut", "ok")
+        self.assertEqual(results["short.gov"].status, Status.UNREACHABLE)
+        self.assertEqual(results["cut.gov"].status, Status.UNREACHABLE)
+        self.assertIn("cut short", results["cut.gov"].detail)
+        self.assertEqual(results["ok.gov"].status, Status.OK)
+
+    def test_answers_are_cached(self):
+        self.check("ok")
+        self.check("ok")
+        self.assertEqual(len(self.stub.queries), 1)
+
+    def test_expired_answers_are_asked_again(self):
+        self.check("ok")
+        for key, (expires, result) in self.checker._cache.items():
+            self.checker._cache[key] = (expires - MAX_TTL, result)
+        self.check("ok")
+        self.assertEqual(len(self.stub.queries), 2)
+
+    def test_many_zones_at_once(self):
+        """Slow servers are waited for together, not one after another."""
+        zones = [f"silent{i}" for i in range(20)]
+        started = timezone.now()
+        results = self.check(*zones)
+        self.assertEqual(len(results), 20)
+        self.assertLess(timezone.now() - started, timedelta(seconds=2))
+
+    def test_unresolvable_host(self):
+        results = asyncio.run(
+            self.checker.check({"ok.gov": {"ns1.example.invalid": ()}})
+        )
+        self.assertEqual(results["ok.gov"][0].status, Status.UNREACHABLE)
+
+
+class TestCheckDelegations(TestCase):
+    def setUp(self):
+        self.stub = StubNameserver().start()
+        self.addCleanup(self.stub.stop)
+        self.registry = MockRegistry(
+            {"ns1.example.com": ("127.0.0.1",), "ns2.example.com": ("127.0.0.1",)}
+        ).start()
+        self.addCleanup(self.registry.stop)
+        self.checker = DelegationChecker(timeout=0.2, port=self.stub.port)
+
+    def test_saves_status_per_host(self):
+        domain = Domain.objects.create(name="refused.gov")
+        check_delegations([domain], checker=self.checker)
+        delegation = Delegation.objects.get(host__name="ns1.example.com")
+        self.assertEqual(delegation.domain, domain)
+        self.assertEqual(delegation.status, Status.LAME)
+        self.assertIn("127.0.0.1", delegation.detail)
+        self.assertGreater(delegation.expires_at, timezone.now())
+        self.assertEqual(
+            [h.name for h in Domain.objects.get(pk=domain.pk).lame_nameservers],
+            ["ns1.example.com", "ns2.example.com"],
+        )
+
+    def test_status_is_kept_per_domain(self):
+        """A host which answers for one domain but not another is lame for one."""
+        domains = [
+            Domain.objects.create(name="ok.gov"),
+            Domain.objects.create(name="refused.gov"),
+        ]
+        check_delegations(domains, checker=self.checker)
+        host = Host.objects.get(name="ns1.example.com")
+        self.assertEqual(
+            sorted(host.delegations.values_list("domain__name", "status")),
+            [("ok.gov", Status.OK), ("refused.gov", Status.LAME)],
+        )
+        self.assertEqual(Domain.objects.get(name="ok.gov").lame_nameservers, [])
+        self.assertEqual(
+            [h.name for h in Domain.objects.get(name="refused.gov").lame_nameservers],
+            ["ns1.example.com", "ns2.example.com"],
+        )
+
+    def test_fresh_hosts_are_not_checked_again(self):
+        domain = Domain.objects.create(name="ok.gov")
+        check_delegations([domain], checker=self.checker)
+        self.checker._cache.clear()
+        check_delegations([Domain.objects.get(pk=domain.pk)], checker=self.checker)
+        self.assertEqual(len(self.stub.queries), 1)
+
+        check_delegations(
+            [Domain.objects.get(pk=domain.pk)], checker=self.checker, force=True
+        )
+        self.assertEqual(len(self.stub.queries), 2)
+
+    def test_fresh_for_one_domain_is_not_fresh_for_another(self):
+        check_delegations([Domain.objects.create(name="ok.gov")], checker=self.checker)
+        self.checker._cache.clear()
+        check_delegations(
+            [Domain.objects.create(name="refused.gov")], checker=self.checker
+        )
+        self.assertEqual([zone for zone, _ in self.stub.queries], ["ok", "refused"])
+        self.assertEqual(
+            Delegation.objects.get(
+                host__name="ns1.example.com", domain__name="refused.gov"
+            ).status,
+            Status.LAME,
+        )
+
+    def test_command(self):
+        Domain.objects.create(name="ok.gov")
+        Domain.objects.create(name="refused.gov")
+        with patch(
+            "registrar.management.commands.check_delegation.DelegationChecker",
+            lambda concurrency: self.checker,
+        ):
+            call_command("check_delegation", "ok.gov")
+        self.assertEqual(
+            Delegation.objects.get(host__name="ns1.example.com").status, Status.OK
+        )
+        self.assertEqual([zone for zone, _ in self.stub.queries], ["ok"])
@@ -0,0 +1,108 @@
+"""Test adding many users to a domain at once."""
+
+from unittest.mock import MagicMock
+
+from auditlog.models import LogEntry  # type: ignore
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.test import TestCase
+
+from registrar.models import Domain, DomainInvitation, User, UserDomainRole
+from registrar.utility.domain_users import add_users_to_domain
+
+import boto3_mocking  # type: ignore
+
+
+class TestAddUsersToDomain(TestCase):
+    def setUp(self):
+        self.domain = Domain.objects.create(name="igorville.gov")
+        self.mayor = User.objects.create(username="mayor", email="mayor@igorville.gov")
+        self.clerk = User.objects.create(username="clerk", email="clerk@igorville.gov")
+        UserDomainRole.objects.create(
+            user=self.clerk, domain=self.domain, role=UserDomainRole.Roles.ADMIN
+        )
+        DomainInvitation.objects.create(domain=self.domain, email="old@igorville.gov")
+
+    @boto3_mocking.patching
+    def test_sorts_emails(self):
+        """Each address is added, invited, or left alone."""
+        mock_client = MagicMock()
+        with boto3_mocking.clients.handler_for("sesv2", mock_client):
+            result = add_users_to_domain(
+                self.domain,
+                [
+                    "Mayor@igorville.gov",
+                    "clerk@igorville.gov",
+                    "new@igorville.gov",
+                    "old@igorville.gov",
+                    "new@igorville.gov",
+                ],
+                "https://example.com/domain/1",
+            )
+        self.assertEqual(result.added, ["Mayor@igorville.gov"])
+        self.assertEqual(result.already_added, ["clerk@igorville.gov"])
+        self.assertEqual(result.invited, ["new@igorville.gov"])
+        self.assertEqual(result.already_invited, ["old@igorville.gov"])
+        self.assertEqual(result.not_sent, [])
+        self.assertTrue(
+            UserDomainRole.objects.filter(user=self.mayor, domain=self.domain).exists()
+        )
+        self.assertEqual(mock_client.return_value.send_email.call_count, 1)
+
+    @boto3_mocking.patching
+    def test_invitations_are_sent_in_batches(self):
+        mock_client = MagicMock()
+        mock_client.return_value.send_bulk_email.side_effect = lambda **kwargs: {
+            "BulkEmailEntryResults": [
+                {"Status": "SUCCESS"} for _ in kwargs["BulkEmailEntries"]
+            ]
+        }
+        emails = [f"new{i}@igorville.gov" for i in range(120)]
+        with boto3_mocking.clients.handler_for("sesv2", mock_client):
+            result = add_users_to_domain(self.domain, emails, "")
+        self.assertEqual(result.not_sent, [])
+        self.assertEqual(mock_client.return_value.send_bulk_email.call_count, 3)
+        mock_client.return_value.send_email.assert_not_called()
+
+    def test_query_count_does_not_grow(self):
+        """Hundreds of addresses take the same queries as one."""
+        emails = [f"person{i}@igorville.gov" for i in range(200)]
+        User.objects.bulk_create(
+            User(username=email, email=email) for email in emails[:100]
+        )
+        # lookups, two bulk inserts, a read of the new roles, and a savepoint
+        with self.assertNumQueries(8):
+            add_users_to_domain(self.domain, emails, "", send_email=False)
+        self.assertEqual(
+            DomainInvitation.objects.filter(email__startswith="person").count(), 100
+        )
+
+    def test_additions_are_audited(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            add_users_to_domain(
+                self.domain,
+                ["mayor@igorville.gov", "new@igorville.gov"],
+                "",
+                send_email=False,
+            )
+        created = LogEntry.objects.filter(action=LogEntry.Action.CREATE)
+        self.assertTrue(
+            created.filter(
+                content_type=ContentType.objects.get_for_model(UserDomainRole),
+                object_pk=UserDomainRole.objects.get(user=self.mayor).pk,
+            ).exists()
+        )
+        self.assertTrue(
+            created.filter(
+                content_type=ContentType.objects.get_for_model(DomainInvitation),
+                object_pk=DomainInvitation.objects.get(email="new@igorville.gov").pk,
+            ).exists()
+        )
+
+    def test_management_command(self):
+        call_command(
+            "add_domain_users", "igorville.gov", "new@igorville.gov", "--no-email"
+        )
+        self.assertTrue(
+            DomainInvitation.objects.filter(email="new@igorville.gov").exists()
+        )
@@ -0,0 +1,149 @@
+"""Test the health checks behind /health/ready/."""
+
+import threading
+from unittest.mock import patch
+
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+
+from epplibwrapper import client as registry
+from epplibwrapper.errors import RegistryError
+from registrar.models import User
+from registrar.utility import health
+
+
+def failing():
+    raise ConnectionError("10.0.0.5 refused the connection")
+
+
+@override_settings(
+    HEALTH_CHECK_INTERVAL=30,
+    HEALTH_REPORTED_CHECK_INTERVAL=600,
+    HEALTH_CHECK_TIMEOUT=0.2,
+    HEALTH_REQUIRED_CHECKS=["database"],
+)
+class TestHealthChecker(SimpleTestCase):
+    def checker(self, **checks):
+        checker = health.HealthChecker(checks)
+        # never start the background thread
+        checker.start = lambda: None
+        return checker
+
+    def test_ready_when_required_checks_pass(self):
+        checker = self.checker(database=lambda: "answered", email=failing)
+        with self.assertLogs(health.logger, "WARNING"):
+            checker.run_once()
+        report = checker.report()
+        self.assertTrue(report["ready"])
+        self.assertEqual(report["failing"], ["email"])
+        self.assertEqual(report["checks"]["database"]["detail"], "answered")
+        # the error's message is logged, but not made public
+        self.assertEqual(report["checks"]["email"]["detail"], "ConnectionError")
+
+    def test_not_ready_when_required_check_fails(self):
+        checker = self.checker(database=failing)
+        with self.assertLogs(health.logger, "WARNING"):
+            checker.run_once()
+        self.assertFalse(checker.report()["ready"])
+
+    def test_not_ready_before_first_check(self):
+        report = self.checker(database=lambda: "answered").report()
+        self.assertFalse(report["ready"])
+        self.assertEqual(report["checks"]["database"]["detail"], "not checked yet")
+
+    def test_old_results_do_not_count(self):
+        checker = self.checker(database=lambda: "answered")
+        checker.run_once()
+        checker.results["database"].checked_at -= 91
+        self.assertFalse(checker.report()["ready"])
+
+    def test_reported_checks_are_run_less_often(self):
+        calls = []
+        checker = self.checker(
+            database=lambda: "answered", email=lambda: calls.append(1) or "sent"
+        )
+        checker.run_once()
+        checker.results["database"].checked_at -= 31
+        checker.results["email"].checked_at -= 31
+        checker.run_once()
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(checker.report()["checks"]["email"]["ok"])
+
+        checker.results["email"].checked_at -= 600
+        checker.run_once()
+        self.assertEqual(len(calls), 2)
+
+    def test_slow_check_is_not_waited_for(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        calls = []
+
+        def stuck():
+            calls.append(1)
+            release.wait(5)
+            return "answered"
+
+        checker = self.checker(database=stuck)
+        checker.run_once()
+        checker.run_once()
+        report = checker.report()
+        self.assertFalse(report["ready"])
+        self.assertIn("no answer", report["checks"]["database"]["detail"])
+        # a check which is still running is not started again
+        self.assertEqual(len(calls), 1)
+
+    def test_failure_is_logged_once(self):
+        checker = self.checker(database=failing)
+        with self.assertLogs(health.logger, "WARNING") as logs:
+            checker.run_once()
+            checker.run_once()
+        self.assertEqual(len(logs.records), 1)
+
+
+class TestChecks(TestCase):
+    def test_database(self):
+        self.assertEqual(health.check_database(), "answered")
+
+    def test_registry_failure_after_answer(self):
+        lazy = registry.LazyEPPLibWrapper()
+        with patch.object(registry, "EPPLibWrapper") as wrapper:
+            lazy.send("command", cleaned=True)
+            wrapper.return_value.send.side_effect = RegistryError("connection")
+            with self.assertRaises(RegistryError):
+                lazy.send("command", cleaned=True)
+            with patch("epplibwrapper.CLIENT", lazy):
+                with self.assertRaises(ConnectionError):
+                    health.check_registry()
+
+    def test_registry_error_code_is_an_answer(self):
+        lazy = registry.LazyEPPLibWrapper()
+        with patch.object(registry, "EPPLibWrapper") as wrapper:
+            wrapper.return_value.send.side_effect = RegistryError("exists", code=2302)
+            with self.assertRaises(RegistryError):
+                lazy.send("command", cleaned=True)
+            with patch("epplibwrapper.CLIENT", lazy):
+                self.assertIn("answered", health.check_registry())
+
+
+class TestHealthViews(SimpleTestCase):
+    def test_status_follows_readiness(self):
+        for ready, status in ((True, 200), (False, 503)):
+            report = {"ready": ready, "failing": ["email"], "checks": {"email": {}}}
+            with patch.object(health.CHECKER, "report", return_value=report):
+                response = Client().get("/health/ready/")
+            self.assertEqual(response.status_code, status)
+            # what each check found is not shown to anonymous callers
+            self.assertEqual(response.json(), {"ready": ready, "failing": ["email"]})
+
+    def test_liveness_does_not_touch_the_database(self):
+        # SimpleTestCase fails any query
+        self.assertEqual(Client().get("/health/").status_code, 200)
+
+
+class TestHealthViewsForStaff(TestCase):
+    def test_staff_see_each_check(self):
+        staff = User.objects.create(username="staff", is_staff=True)
+        self.client.force_login(staff)
+        report = {"ready": True, "failing": [], "checks": {"email": {"ok": True}}}
+        with patch.object(health.CHECKER, "report", return_value=report):
+            response = self.client.get("/health/ready/")
+        self.assertEqual(response.json(), report)
@@ -0,0 +1,123 @@
+"""Test structured logging."""
+
+import io
+import json
+import logging
+import sys
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from registrar.utility.logs import (
+    JSONFormatter,
+    Lazy,
+    QueueStreamHandler,
+    RequestIdFilter,
+    RequestIdMiddleware,
+    SamplingFilter,
+    request_id,
+)
+
+
+def make_record(level=logging.INFO, name="registrar.test", msg="hello", **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestJSONFormatter(SimpleTestCase):
+    def test_fields(self):
+        token = request_id.set("abc")
+        self.addCleanup(request_id.reset, token)
+        record = make_record(user=5)
+        RequestIdFilter().filter(record)
+        entry = json.loads(JSONFormatter().format(record))
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["logger"], "registrar.test")
+        self.assertEqual(entry["message"], "hello")
+        self.assertEqual(entry["request_id"], "abc")
+        self.assertEqual(entry["user"], 5)
+
+    def test_exception(self):
+        try:
+            raise ValueError("bad")
+        except ValueError:
+            record = logging.LogRecord(
+                "registrar", logging.ERROR, __file__, 1, "failed", None, True
+            )
+            record.exc_info = sys.exc_info()
+        entry = json.loads(JSONFormatter().format(record))
+        self.assertIn("ValueError: bad", entry["exception"])
+
+
+class TestSamplingFilter(SimpleTestCase):
+    def test_keeps_one_in_n(self):
+        sampling = SamplingFilter({"registrar": 3})
+        kept = [sampling.filter(make_record(logging.DEBUG)) for _ in range(9)]
+        self.assertEqual(kept.count(True), 3)
+
+    def test_warnings_always_kept(self):
+        sampling = SamplingFilter({"registrar": 100})
+        self.assertTrue(
+            all(sampling.filter(make_record(logging.WARNING)) for _ in range(5))
+        )
+
+    def test_other_loggers_kept(self):
+        sampling = SamplingFilter({"registrar.views": 100})
+        self.assertTrue(all(sampling.filter(make_record()) for _ in range(5)))
+
+
+class TestQueueStreamHandler(SimpleTestCase):
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.handler = QueueStreamHandler(self.stream)
+        self.handler.setFormatter(JSONFormatter())
+        self.addCleanup(self.handler.close)
+        self.logger = logging.getLogger("registrar.test_logs")
+        self.logger.addHandler(self.handler)
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.addCleanup(self.logger.removeHandler, self.handler)
+
+    def lines(self):
+        self.handler.flush()
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_written_by_thread(self):
+        self.logger.info("saved %s", "application", extra={"user": 1})
+        [entry] = self.lines()
+        self.assertEqual(entry["message"], "saved application")
+        self.assertEqual(entry["user"], 1)
+
+    def test_message_is_kept_as_logged(self):
+        state = ["started"]
+        self.logger.info("state: %s", state)
+        state.append("submitted")
+        self.assertEqual(self.lines()[0]["message"], "state: ['started']")
+
+    def test_lazy_only_when_written(self):
+        calls = []
+
+        def summary():
+            calls.append(1)
+            return "summary"
+
+        self.logger.debug("state: %s", Lazy(summary))
+        self.logger.info("state: %s", Lazy(summary))
+        self.assertEqual([e["message"] for e in self.lines()], ["state: summary"])
+        self.assertEqual(len(calls), 1)
+
+
+class TestRequestIdMiddleware(SimpleTestCase):
+    def test_id_from_header(self):
+        middleware = RequestIdMiddleware(lambda request: HttpResponse(request_id.get()))
+        request = RequestFactory().get("/", HTTP_X_VCAP_REQUEST_ID="router-id")
+        response = middleware(request)
+        self.assertEqual(response["X-Request-ID"], "router-id")
+        self.assertEqual(response.content, b"router-id")
+        self.assertIsNone(request_id.get())
+
+    def test_id_made_up(self):
+        middleware = RequestIdMiddleware(lambda request: HttpResponse())
+        response = middleware(RequestFactory().get("/"))
+        self.assertRegex(response["X-Request-ID"], r"^[0-9a-f]{32}$")
@@ -0,0 +1,113 @@
+"""Test the metrics served to Prometheus."""
+
+import threading
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from api import views as api_views
+from registrar.models import User
+from registrar.utility import email
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@override_settings(METRICS_TOKEN="scraper-token")  # nosec
+class TestMetricsView(TestCase):
+    def test_anonymous_is_refused(self):
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], "Bearer")
+
+    def test_wrong_token_is_refused(self):
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer guess"
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_token(self):
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer scraper-token"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "registry_command_seconds")
+
+    def test_staff(self):
+        self.client.force_login(User.objects.create(username="staff", is_staff=True))
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 200)
+
+    def test_other_users_are_refused(self):
+        self.client.force_login(User.objects.create(username="mayor"))
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 401)
+
+
+class TestQueryCounts(TestCase):
+    def test_counted_by_view(self):
+        before = sample("view_db_queries_count", view="home")
+        self.client.force_login(User.objects.create(username="mayor"))
+        self.client.get(reverse("home"))
+        self.assertEqual(sample("view_db_queries_count", view="home"), before + 1)
+        self.assertGreater(sample("view_db_queries_sum", view="home"), 0)
+
+
+class TestConnectionMetrics(TestCase):
+    def test_new_connections_counted(self):
+        def query():
+            # each thread has a connection of its own
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.close()
+
+        before = sample("db_connections_opened_total", alias="default")
+        thread = threading.Thread(target=query)
+        thread.start()
+        thread.join()
+        self.assertEqual(
+            sample("db_connections_opened_total", alias="default"), before + 1
+        )
+
+
+class TestDomainListMetrics(TestCase):
+    def setUp(self):
+        api_views._domains.cache_clear()
+        self.addCleanup(api_views._domains.cache_clear)
+
+    def test_hits_and_misses(self):
+        misses = sample("domain_list_lookups_total", result="miss")
+        hits = sample("domain_list_lookups_total", result="hit")
+        with patch.object(api_views.requests, "get") as get:
+            get.return_value.text = "Domain Name\ngsa.gov,Federal\n"
+            self.assertTrue(api_views.in_domains("gsa.gov"))
+            self.assertFalse(api_views.in_domains("igorville"))
+        self.assertEqual(sample("domain_list_lookups_total", result="miss"), misses + 1)
+        self.assertEqual(sample("domain_list_lookups_total", result="hit"), hits + 1)
+        self.assertGreater(sample("domain_list_fetched_timestamp_seconds"), 0)
+
+
+class TestEmailMetrics(TestCase):
+    def test_send_results(self):
+        sent = sample("email_send_seconds_count", result="sent")
+        failed = sample("email_send_seconds_count", result="failed")
+        with patch.object(email, "_ses_client") as ses_client:
+            ses_client.return_value.send_bulk_email.return_value = {
+                "BulkEmailEntryResults": [
+                    {"Status": "SUCCESS"},
+                    {"Status": "FAILED", "Error": "Address is blocked"},
+                ]
+            }
+            with self.assertLogs(email.logger, "WARNING"):
+                email.send_templated_emails(
+                    "emails/domain_invitation.txt",
+                    "emails/domain_invitation_subject.txt",
+                    ["one@example.com", "two@example.com"],
+                    context={"domain": "igorville.gov"},
+                )
+        self.assertEqual(sample("email_send_seconds_count", result="sent"), sent + 1)
+        self.assertEqual(
+            sample("email_send_seconds_count", result="failed"), failed + 1
+        )
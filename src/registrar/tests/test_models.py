@@ -1,4 +1,5 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.core.cache import caches
 from django.db.utils import IntegrityError
 
 from registrar.models import (
@@ -155,6 +156,48 @@ class TestPermissions(TestCase):
         self.assertTrue(UserDomainRole.objects.get(user=user, domain=domain))
 
 
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    DOMAIN_ROLE_CACHE_ALIAS="default",
+)
+class TestDomainRoleCache(TestCase):
+
+    """Test caching of each user's roles on domains."""
+
+    def setUp(self):
+        # ids are reused between tests, so start from an empty cache
+        caches["default"].clear()
+        self.user = User.objects.create(username="roles")
+        self.domain = Domain.objects.create(name="igorville.gov")
+
+    def test_roles_are_cached(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            UserDomainRole.objects.create(
+                user=self.user, domain=self.domain, role=UserDomainRole.Roles.ADMIN
+            )
+        self.assertEqual(
+            UserDomainRole.roles_for(self.user.id), {self.domain.id: "admin"}
+        )
+        with self.assertNumQueries(0):
+            UserDomainRole.roles_for(self.user.id)
+
+    def test_role_changes_invalidate_cache(self):
+        self.assertEqual(UserDomainRole.roles_for(self.user.id), {})
+        with self.captureOnCommitCallbacks(execute=True):
+            role = UserDomainRole.objects.create(
+                user=self.user, domain=self.domain, role=UserDomainRole.Roles.ADMIN
+            )
+        self.assertIn(self.domain.id, UserDomainRole.roles_for(self.user.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            role.delete()
+        self.assertEqual(UserDomainRole.roles_for(self.user.id), {})
+
+    def test_roles_remembered_on_user(self):
+        with self.assertNumQueries(1):
+            self.user.domain_roles()
+            self.user.domain_roles()
+
+
 class TestDomainInfo(TestCase):
 
     """Test creation of Domain Information when approved."""
@@ -173,6 +216,62 @@ class TestDomainInfo(TestCase):
         domain = Domain.objects.get(name="igorville.gov")
         self.assertTrue(DomainInformation.objects.get(domain=domain))
 
+    def make_application(self, name, contacts=0):
+        user = User.objects.create(username=f"{name}-creator")
+        ao = Contact.objects.create(first_name="Ao")
+        application = DomainApplication.objects.create(
+            creator=user,
+            requested_domain=DraftDomain.objects.create(name=name),
+            authorizing_official=ao,
+            organization_name=f"{name} city",
+            purpose="To serve",
+        )
+        application.other_contacts.add(
+            *[Contact.objects.create(first_name=f"C{i}") for i in range(contacts)]
+        )
+        return application
+
+    def test_copies_fields_and_contacts(self):
+        application = self.make_application("igorville.gov", contacts=2)
+        domain = Domain.objects.create(name="igorville.gov")
+        info = DomainInformation.create_from_da(application, domain=domain)
+        info.refresh_from_db()
+        self.assertEqual(info.domain, domain)
+        self.assertEqual(info.domain_application, application)
+        self.assertEqual(info.creator_id, application.creator_id)
+        self.assertEqual(
+            info.authorizing_official_id, application.authorizing_official_id
+        )
+        self.assertEqual(info.organization_name, "igorville.gov city")
+        self.assertEqual(
+            set(info.other_contacts.all()), set(application.other_contacts.all())
+        )
+
+    def test_copied_only_once(self):
+        application = self.make_application("igorville.gov")
+        first = DomainInformation.create_from_da(application)
+        self.assertEqual(DomainInformation.create_from_da(application), first)
+        self.assertEqual(DomainInformation.objects.count(), 1)
+
+    def test_queries_do_not_grow_with_applications(self):
+        """One existence check, one insert, and one read and write of contacts."""
+        applications = [
+            self.make_application(f"city{i}.gov", contacts=2) for i in range(5)
+        ]
+        # fresh objects, as if just loaded, with no related objects cached
+        applications = list(
+            DomainApplication.objects.filter(pk__in=[a.pk for a in applications])
+        )
+        with self.assertNumQueries(4):
+            infos = DomainInformation.create_many_from_da(
+                [(application, None) for application in applications]
+            )
+        self.assertEqual(
+            [info.domain_application_id for info in infos],
+            [application.id for application in applications],
+        )
+        self.assertEqual(DomainInformation.other_contacts.through.objects.count(), 10)
+
 
 class TestInvitations(TestCase):
 
@@ -1,3 +1,4 @@
+from auditlog.models import LogEntry  # type: ignore
 from django.test import TestCase
 from django.db.utils import IntegrityError
 
@@ -5,8 +6,12 @@ from registrar.models import (
     DomainApplication,
     User,
     Domain,
+    Host,
+    HostIP,
 )
 from unittest import skip
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
 
 
 class TestDomain(TestCase):
@@ -52,3 +57,163 @@ class TestDomain(TestCase):
         d1.save()
         with self.assertRaises(ValueError):
             d1.activate()
+
+
+class ScriptedRegistry:
+    """Answers InfoDomain, InfoHost and CheckHost from a dict of hosts."""
+
+    def __init__(self, commands, hosts, exists=()):
+        self.commands = commands
+        self.hosts = hosts
+        self.exists = set(exists)
+        self.sent = []
+        self.send_all = MagicMock(side_effect=self._send_all)
+
+    def send(self, command, cleaned=False):
+        self.sent.append(command)
+        if command is self.commands.InfoDomain.return_value:
+            return MagicMock(res_data=[MagicMock(hosts=list(self.hosts))])
+        if command is self.commands.CheckHost.return_value:
+            names = self.commands.CheckHost.call_args.args[0]
+            return MagicMock(
+                res_data=[MagicMock(avail=name not in self.exists) for name in names]
+            )
+        raise AssertionError("unexpected command")
+
+    def _send_all(self, commands, cleaned=False):
+        responses = []
+        for command in commands:
+            name = command.name
+            addrs = [MagicMock(addr=address) for address in self.hosts.get(name, ())]
+            responses.append(MagicMock(res_data=[MagicMock(addrs=addrs)]))
+        return responses
+
+
+class TestDomainNameservers(TestCase):
+    def setUp(self):
+        self.domain = Domain.objects.create(name="igorville.gov")
+        patcher = patch("registrar.models.domain.commands")
+        self.commands = patcher.start()
+        self.addCleanup(patcher.stop)
+        # each command remembers its arguments, like the real ones
+        for command in ["CreateHost", "UpdateHost", "InfoHost"]:
+            getattr(self.commands, command).side_effect = SimpleNamespace
+        patcher = patch("registrar.models.domain.common")
+        self.common = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.common.HostObjSet.side_effect = lambda hosts: hosts
+
+    def use_registry(self, hosts, exists=()):
+        registry = ScriptedRegistry(self.commands, hosts, exists)
+        patcher = patch("registrar.models.domain.registry", registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return registry
+
+    def test_get_asks_registry_once(self):
+        """Addresses are only fetched for subordinate hosts, and only once."""
+        registry = self.use_registry(
+            {"ns1.example.com": (), "ns1.igorville.gov": ("1.2.3.4",)}
+        )
+        expected = [("ns1.example.com",), ("ns1.igorville.gov", "1.2.3.4")]
+        self.assertEqual(self.domain.nameservers, expected)
+        self.assertEqual(self.domain.nameservers, expected)
+        self.assertEqual(len(registry.sent), 1)
+        registry.send_all.assert_called_once()
+        self.commands.InfoHost.assert_called_once_with(name="ns1.igorville.gov")
+
+    def test_set_sends_one_update(self):
+        """Only missing hosts are created, and the domain is updated once."""
+        registry = self.use_registry(
+            {"ns1.example.com": (), "ns2.example.com": ()}, exists=["ns3.example.com"]
+        )
+        self.domain.nameservers = [
+            ("ns2.example.com",),
+            ("NS3.example.com.",),
+            ("ns4.example.com",),
+        ]
+        self.commands.CheckHost.assert_called_once_with(
+            ["ns3.example.com", "ns4.example.com"]
+        )
+        self.commands.CreateHost.assert_called_once_with(
+            name="ns4.example.com", addrs=[]
+        )
+        self.commands.UpdateDomain.assert_called_once_with(
+            name="igorville.gov",
+            add=[["ns3.example.com", "ns4.example.com"]],
+            rem=[["ns1.example.com"]],
+        )
+        # the hosts and the domain update are sent over one connection
+        registry.send_all.assert_called_once()
+        self.assertEqual(
+            self.domain.nameservers,
+            [("ns2.example.com",), ("ns3.example.com",), ("ns4.example.com",)],
+        )
+
+    def test_set_same_hosts_sends_nothing(self):
+        registry = self.use_registry({"ns1.example.com": ()})
+        self.domain.nameservers = [("ns1.example.com",)]
+        self.assertEqual(len(registry.sent), 1)  # just the InfoDomain
+        registry.send_all.assert_not_called()
+
+    def test_set_changed_addresses(self):
+        """A subordinate host with new addresses is updated, not recreated."""
+        self.use_registry({"ns1.igorville.gov": ("1.2.3.4",)})
+        self.domain.nameservers = [("ns1.igorville.gov", "1.2.3.4", "::1")]
+        self.commands.UpdateHost.assert_called_once()
+        self.commands.CreateHost.assert_not_called()
+        self.commands.UpdateDomain.assert_not_called()
+        self.assertEqual(
+            set(HostIP.objects.values_list("address", flat=True)), {"1.2.3.4", "::1"}
+        )
+
+    def test_set_checks_addresses(self):
+        self.use_registry({})
+        with self.assertRaises(ValueError):
+            self.domain.nameservers = [("ns1.igorville.gov",)]
+        with self.assertRaises(ValueError):
+            self.domain.nameservers = [("ns1.example.com", "1.2.3.4")]
+
+    def test_set_creates_local_hosts_once(self):
+        self.use_registry({})
+        self.domain.nameservers = [("ns1.example.com",), ("ns1.igorville.gov", "::1")]
+        self.domain.nameservers = [("ns1.igorville.gov", "::1")]
+        self.domain.nameservers = [("ns1.example.com",), ("ns1.igorville.gov", "::1")]
+        self.assertEqual(Host.objects.count(), 2)
+        self.assertEqual(HostIP.objects.count(), 1)
+
+    def test_set_audits_new_rows(self):
+        self.use_registry({})
+        self.domain.nameservers = [("ns1.example.com",), ("ns1.igorville.gov", "::1")]
+        for model, count in ((Host, 2), (HostIP, 1)):
+            self.assertEqual(
+                LogEntry.objects.get_for_model(model)
+                .filter(action=LogEntry.Action.CREATE)
+                .count(),
+                count,
+            )
+
+    def test_set_deletes_hosts_no_domain_uses(self):
+        self.use_registry({})
+        self.domain.nameservers = [("ns1.example.com",), ("ns1.igorville.gov", "::1")]
+        self.domain.nameservers = [("ns2.example.com",)]
+        self.assertEqual(
+            list(Host.objects.values_list("name", flat=True)), ["ns2.example.com"]
+        )
+        self.assertFalse(HostIP.objects.exists())
+
+    def test_set_keeps_hosts_other_domains_use(self):
+        """A shared host is handed to a domain which still uses it."""
+        other = Domain.objects.create(name="other.gov")
+        self.use_registry({})
+        self.domain.nameservers = [("ns1.example.com",)]
+        other.nameservers = [("ns1.example.com",)]
+        self.assertEqual(
+            sorted(Host.objects.get().domains.values_list("name", flat=True)),
+            ["igorville.gov", "other.gov"],
+        )
+
+        self.domain.nameservers = [("ns2.example.com",)]
+        shared = Host.objects.get(name="ns1.example.com")
+        self.assertEqual(shared.domain, other)
+        self.assertEqual(list(shared.domains.all()), [other])
@@ -0,0 +1,104 @@
+"""Test changing a nameserver on many domains at once."""
+
+from threading import Barrier
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from epplibwrapper import RegistryError
+from registrar.models import Domain, User, UserDomainRole
+from registrar.utility.nameservers import replace_nameserver
+
+from .common import MockRegistry, less_console_noise
+
+
+class TestReplaceNameserver(TestCase):
+    def setUp(self):
+        self.registry = MockRegistry(
+            {"ns1.example.com": (), "ns2.example.com": ()}
+        ).start()
+        self.addCleanup(self.registry.stop)
+        self.domains = [
+            Domain.objects.create(name=f"igorville{i}.gov") for i in range(3)
+        ]
+
+    def test_replaces_on_each_domain(self):
+        result = replace_nameserver(
+            self.domains, "NS1.example.com.", ("ns3.example.com",), max_workers=1
+        )
+        self.assertEqual(len(result.changed), 3)
+        self.assertEqual(
+            self.domains[0].nameservers, [("ns3.example.com",), ("ns2.example.com",)]
+        )
+
+    def test_unused_nameserver_changes_nothing(self):
+        result = replace_nameserver(
+            self.domains, "ns9.example.com", ("ns3.example.com",), max_workers=1
+        )
+        self.assertEqual(len(result.unchanged), 3)
+        self.registry.registry.send_all.assert_not_called()
+
+    def test_new_host_already_used(self):
+        """Replacing with a host the domain already has leaves one copy."""
+        replace_nameserver(
+            self.domains[:1], "ns1.example.com", ("ns2.example.com",), max_workers=1
+        )
+        self.assertEqual(self.domains[0].nameservers, [("ns2.example.com",)])
+
+    def test_failures_do_not_stop_other_domains(self):
+        self.registry.registry.send_all.side_effect = [
+            RegistryError("busy"),
+            None,
+            None,
+        ]
+        with less_console_noise():
+            result = replace_nameserver(
+                self.domains, "ns1.example.com", ("ns3.example.com",), max_workers=1
+            )
+        self.assertEqual(list(result.failed), ["igorville0.gov"])
+        self.assertEqual(len(result.changed), 2)
+
+    def test_unexpected_errors_do_not_stop_other_domains(self):
+        self.registry.registry.send_all.side_effect = [
+            None,
+            RuntimeError("unexpected"),
+            None,
+        ]
+        with less_console_noise():
+            result = replace_nameserver(
+                self.domains, "ns1.example.com", ("ns3.example.com",), max_workers=1
+            )
+        self.assertEqual(result.failed, {"igorville1.gov": "unexpected"})
+        self.assertEqual(len(result.changed), 2)
+
+    def test_command_uses_users_domains(self):
+        user = User.objects.create(username="mayor", email="mayor@igorville.gov")
+        UserDomainRole.objects.create(
+            user=user, domain=self.domains[0], role=UserDomainRole.Roles.ADMIN
+        )
+        call_command(
+            "replace_nameserver",
+            "Mayor@igorville.gov",
+            "ns1.example.com",
+            "ns3.example.com",
+            workers=1,
+        )
+        self.registry.registry.send_all.assert_called_once()
+
+
+class TestReplaceNameserverConcurrently(TransactionTestCase):
+    def test_domains_are_updated_in_parallel(self):
+        registry = MockRegistry({"ns1.example.com": ()}).start()
+        self.addCleanup(registry.stop)
+        # only finishes if three domains are in the registry at the same time
+        barrier = Barrier(3, timeout=5)
+        registry.registry.send_all.side_effect = lambda *args, **kwargs: barrier.wait()
+        domains = [Domain.objects.create(name=f"igorville{i}.gov") for i in range(6)]
+        # only the registry calls are being tested here
+        with patch.object(Domain, "_save_hosts"):
+            result = replace_nameserver(
+                domains, "ns1.example.com", ("ns3.example.com",), max_workers=3
+            )
+        self.assertEqual(result.failed, {})
+        self.assertEqual(sorted(result.changed), sorted(d.name for d in domains))
@@ -0,0 +1,136 @@
+"""Test watching the SQL which requests run."""
+
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from registrar.management.commands.benchmark_views import ViewBenchmark
+from registrar.management.commands.explain_queries import (
+    hot_queries,
+    sequential_scans,
+)
+from registrar.models import Domain, DomainInvitation, User
+from registrar.utility import queries
+from registrar.utility.queries import (
+    QueryBudgetExceeded,
+    budget_for,
+    fingerprint,
+    query_budget,
+)
+
+from .common import less_console_noise
+
+
+class TestFingerprint(TestCase):
+    def test_values_are_removed(self):
+        shape, digest = fingerprint(
+            'SELECT "name" FROM "domain" WHERE "id" IN (%s, %s, %s) AND x = \'a\''
+        )
+        self.assertEqual(
+            shape, 'SELECT "name" FROM "domain" WHERE "id" IN (...) AND x = ?'
+        )
+        self.assertEqual(len(digest), 12)
+
+    def test_repeats_match(self):
+        one = 'SELECT "name" FROM "domain" WHERE "id" IN (%s) AND x = 5'
+        two = 'SELECT "name" FROM "domain" WHERE "id" IN (%s, %s) AND x = 9'
+        self.assertEqual(fingerprint(one), fingerprint(two))
+
+
+class TestSlowQueries(TestCase):
+    def setUp(self):
+        self.addCleanup(queries._seen.clear)
+
+    @override_settings(SLOW_QUERY_MS=0, QUERY_LOG_SAMPLING=2)
+    def test_logged_with_call_site(self):
+        with self.assertLogs(queries.logger, "WARNING") as logs:
+            with query_budget(10):
+                for _ in range(3):
+                    list(Domain.objects.filter(name="igorville.gov"))
+        # the first, then one in two
+        self.assertEqual(len(logs.records), 2)
+        record = logs.records[0]
+        self.assertIn('FROM "registrar_domain"', record.sql)
+        self.assertIn("registrar/tests/test_queries.py", record.call_site[-1])
+        self.assertIn("test_logged_with_call_site", record.call_site[-1])
+
+
+class TestQueryBudgets(TestCase):
+    def setUp(self):
+        self.addCleanup(queries._seen.clear)
+        self.client.force_login(User.objects.create(username="mayor"))
+
+    @override_settings(QUERY_BUDGETS={"home": 1}, QUERY_BUDGET_RAISE=True)
+    def test_over_budget_raises(self):
+        with less_console_noise():
+            with self.assertRaisesMessage(QueryBudgetExceeded, "home ran"):
+                self.client.get(reverse("home"))
+
+    @override_settings(QUERY_BUDGETS={"home": 1}, QUERY_BUDGET_RAISE=False)
+    def test_over_budget_is_logged(self):
+        with self.assertLogs(queries.logger, "WARNING") as logs:
+            response = self.client.get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("over its budget of 1", logs.output[0])
+
+    @override_settings(
+        QUERY_BUDGETS={"application": 60, "application:purpose": 70},
+        QUERY_BUDGET_DEFAULT=30,
+    )
+    def test_budget_by_name_then_namespace(self):
+        self.assertEqual(budget_for("application:purpose"), 70)
+        self.assertEqual(budget_for("application:review"), 60)
+        self.assertEqual(budget_for("home"), 30)
+
+    @override_settings(QUERY_BUDGET_RAISE=True)
+    def test_block_budget(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(1, "two queries"):
+                connection.cursor().execute("SELECT 1")
+                connection.cursor().execute("SELECT 2")
+
+
+class TestLoadDomainInvitations(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    @override_settings(QUERY_BUDGET_RAISE=True)
+    def test_queries_do_not_grow_with_rows(self):
+        names = [f"city{i}.gov" for i in range(20)]
+        Domain.objects.bulk_create(Domain(name=name) for name in names)
+        domain_contacts = self.directory / "domain_contacts.txt"
+        domain_contacts.write_text(
+            "".join(f"{name}|USER{i % 4}|admin\n" for i, name in enumerate(names))
+        )
+        contacts = self.directory / "contacts.txt"
+        contacts.write_text(
+            "".join(f"USER{i}|||||x|user{i}@example.com\n" for i in range(4))
+        )
+        # the domains are looked up together, then the invitations created
+        with query_budget(2, "load_domain_invitations"):
+            call_command("load_domain_invitations", domain_contacts, contacts)
+        self.assertEqual(DomainInvitation.objects.count(), 20)
+
+
+class TestHotQueries(TestCase):
+    def test_answered_from_indexes(self):
+        benchmark = ViewBenchmark(users=2, applications=3, invitations=1, owned=3)
+        benchmark.seed()
+        with connection.cursor() as cursor:
+            # a table of a few rows is rightly scanned, whatever its indexes;
+            # this way only a query which no index can answer is scanned
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        for name, queryset in hot_queries(
+            benchmark.user, benchmark.samples["domain"]
+        ).items():
+            self.assertEqual(sequential_scans(queryset.explain()), [], name)
+
+    def test_scan_is_found(self):
+        plan = User.objects.filter(first_name="Jane").explain()
+        self.assertEqual(len(sequential_scans(plan)), 1)
@@ -0,0 +1,134 @@
+"""Test that reads go to replicas only where that is safe."""
+
+from unittest.mock import patch
+
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import ResolverMatch
+
+from registrar.models import Domain, User
+from registrar.utility import replicas
+
+
+@override_settings(
+    DATABASE_REPLICAS=["replica"],
+    REPLICA_VIEWS=["home", "admin:*_changelist"],
+    REPLICA_MAX_LAG_SECONDS=5,
+    REPLICA_LAG_CHECK_INTERVAL=5,
+    REPLICA_PIN_SECONDS=10,
+)
+class TestReplicaRouting(SimpleTestCase):
+    def setUp(self):
+        self.router = replicas.ReplicaRouter()
+        patcher = patch.object(replicas, "replica_lag", return_value=0.0)
+        self.lag = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def request(self, method="get", url_name="home", namespaces=(), write=False):
+        """Run a request through the middleware, returning where it read."""
+        request = getattr(RequestFactory(), method)("/")
+        request.resolver_match = ResolverMatch(
+            lambda request: None, (), {}, url_name=url_name, namespaces=namespaces
+        )
+        return self.run_request(request, write)
+
+    def run_request(self, request, write=False):
+        reads = []
+
+        def get_response(request):
+            middleware.process_view(request, None, (), {})
+            reads.append(self.router.db_for_read(Domain))
+            if write:
+                self.router.db_for_write(Domain)
+                reads.append(self.router.db_for_read(Domain))
+            return HttpResponse()
+
+        middleware = replicas.ReplicaMiddleware(get_response)
+        return reads, middleware(request)
+
+    def test_listed_view_reads_from_replica(self):
+        reads, response = self.request()
+        self.assertEqual(reads, ["replica"])
+        self.assertNotIn(replicas.PIN_COOKIE, response.cookies)
+
+    def test_views_matched_by_pattern(self):
+        reads, _ = self.request(
+            url_name="registrar_domain_changelist", namespaces=["admin"]
+        )
+        self.assertEqual(reads, ["replica"])
+        reads, _ = self.request(
+            url_name="registrar_domain_change", namespaces=["admin"]
+        )
+        self.assertEqual(reads, ["default"])
+
+    def test_other_views_read_from_primary(self):
+        reads, _ = self.request(url_name="domain-users-add")
+        self.assertEqual(reads, ["default"])
+
+    def test_post_reads_from_primary_and_pins(self):
+        reads, response = self.request(method="post")
+        self.assertEqual(reads, ["default"])
+        self.assertEqual(response.cookies[replicas.PIN_COOKIE]["max-age"], 10)
+
+    def test_reads_after_a_write_use_primary(self):
+        reads, response = self.request(write=True)
+        self.assertEqual(reads, ["replica", "default"])
+        self.assertIn(replicas.PIN_COOKIE, response.cookies)
+
+    def test_pinned_visitor_reads_from_primary(self):
+        request = RequestFactory().get("/")
+        request.COOKIES[replicas.PIN_COOKIE] = "1"
+        request.resolver_match = ResolverMatch(
+            lambda request: None, (), {}, url_name="home"
+        )
+        reads, _ = self.run_request(request)
+        self.assertEqual(reads, ["default"])
+
+    def test_lagging_or_unreachable_replica_is_not_read(self):
+        for lag in (30.0, None):
+            self.lag.return_value = lag
+            reads, _ = self.request()
+            self.assertEqual(reads, ["default"])
+
+    def test_outside_a_request_reads_from_primary(self):
+        self.assertEqual(self.router.db_for_read(Domain), "default")
+
+    def test_sessions_and_users_read_from_primary(self):
+        reads = []
+
+        def get_response(request):
+            middleware.process_view(request, None, (), {})
+            reads.extend(self.router.db_for_read(m) for m in (Session, User, Domain))
+            return HttpResponse()
+
+        request = RequestFactory().get("/")
+        request.resolver_match = ResolverMatch(
+            lambda request: None, (), {}, url_name="home"
+        )
+        middleware = replicas.ReplicaMiddleware(get_response)
+        middleware(request)
+        self.assertEqual(reads, ["default", "default", "replica"])
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica", "registrar"))
+        self.assertTrue(self.router.allow_migrate("default", "registrar"))
+
+
+@override_settings(REPLICA_LAG_CHECK_INTERVAL=5)
+class TestReplicaLag(SimpleTestCase):
+    def setUp(self):
+        replicas._lags.clear()
+        self.addCleanup(replicas._lags.clear)
+
+    def test_measured_once_per_interval(self):
+        with patch.object(replicas, "_measure", return_value=1.5) as measure:
+            self.assertEqual(replicas.replica_lag("default"), 1.5)
+            self.assertEqual(replicas.replica_lag("default"), 1.5)
+        measure.assert_called_once()
+
+    def test_unreachable(self):
+        error = replicas.DatabaseError("could not connect")
+        with patch.object(replicas, "_measure", side_effect=error):
+            with self.assertLogs(replicas.logger, "WARNING"):
+                self.assertIsNone(replicas.replica_lag("default"))
@@ -0,0 +1,73 @@
+"""Test the session engine's cache and deleting expired sessions in batches."""
+
+from datetime import timedelta
+
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from registrar.utility.sessions import SessionStore
+
+
+class TestSessionStore(TestCase):
+    def setUp(self):
+        cache.clear()
+        store = SessionStore()
+        store["step"] = "contact"
+        store.save()
+        self.key = store.session_key
+
+    def test_no_cache_by_default(self):
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.assertEqual(SessionStore(self.key)["step"], "contact")
+
+    @override_settings(SESSION_STORE_CACHE_ALIAS="default")
+    def test_reads_come_from_the_cache(self):
+        with self.assertNumQueries(1):
+            SessionStore(self.key).load()
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(self.key)["step"], "contact")
+
+    @override_settings(SESSION_STORE_CACHE_ALIAS="default")
+    def test_changes_are_written_to_both(self):
+        store = SessionStore(self.key)
+        store["step"] = "review"
+        store.save()
+        self.assertEqual(SessionStore(self.key)["step"], "review")
+        self.assertEqual(
+            Session.objects.get(pk=self.key).get_decoded()["step"], "review"
+        )
+
+    @override_settings(SESSION_STORE_CACHE_ALIAS="default")
+    def test_ended_sessions_are_gone_from_both(self):
+        SessionStore(self.key).delete()
+        self.assertFalse(Session.objects.filter(pk=self.key).exists())
+        self.assertNotIn("step", SessionStore(self.key))
+
+
+class TestClearExpired(TestCase):
+    def test_deleted_in_batches(self):
+        past = timezone.now() - timedelta(days=1)
+        future = timezone.now() + timedelta(days=1)
+        Session.objects.bulk_create(
+            Session(session_key=f"key{i}", session_data="", expire_date=past)
+            for i in range(5)
+        )
+        Session.objects.create(session_key="live", session_data="", expire_date=future)
+
+        # a select and a delete per batch, and a select to find none are left
+        with self.assertNumQueries(7):
+            self.assertEqual(SessionStore.clear_expired(batch_size=2), 5)
+        self.assertEqual(list(Session.objects.values_list("pk", flat=True)), ["live"])
+
+    def test_command(self):
+        Session.objects.create(
+            session_key="old",
+            session_data="",
+            expire_date=timezone.now() - timedelta(days=1),
+        )
+        call_command("sweep_sessions")
+        self.assertFalse(Session.objects.exists())
@@ -0,0 +1,23 @@
+from django.test import SimpleTestCase
+
+from registrar.management.commands.startup_profile import parse_importtime
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     json.decoder
+import time:       200 |        300 |   json
+import time:      1000 |       1300 | registrar.models
+import time:       500 |        500 |   djangooidc.oidc
+import time:      2000 |       2500 | djangooidc
+"""
+
+
+class ParseImporttimeTest(SimpleTestCase):
+    def test_builds_tree(self):
+        """Children are printed before the module which imported them."""
+        registrar, djangooidc = parse_importtime(IMPORTTIME)
+        self.assertEqual(registrar.name, "registrar.models")
+        self.assertEqual(registrar.cumulative_ms, 1.3)
+        self.assertEqual([m.name for m in registrar.children], ["json"])
+        self.assertEqual(registrar.children[0].children[0].name, "json.decoder")
+        self.assertEqual([m.name for m in djangooidc.children], ["djangooidc.oidc"])
@@ -0,0 +1,40 @@
+"""Test collecting static files as they are in production."""
+
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import SimpleTestCase, override_settings
+
+PRODUCTION_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"
+    },
+}
+
+
+class TestCollectStatic(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        settings = override_settings(
+            STATIC_ROOT=self.root, STORAGES=PRODUCTION_STORAGES
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        call_command("collectstatic", interactive=False, verbosity=0)
+
+    def test_hashed_names_in_manifest(self):
+        manifest = json.loads((self.root / "staticfiles.json").read_text())
+        hashed = manifest["paths"]["js/get-gov.js"]
+        self.assertRegex(hashed, r"^js/get-gov\.[0-9a-f]{12}\.js$")
+        self.assertEqual(static("js/get-gov.js"), "/public/" + hashed)
+
+    def test_compressed_copies(self):
+        manifest = json.loads((self.root / "staticfiles.json").read_text())
+        hashed = self.root / manifest["paths"]["js/get-gov.js"]
+        self.assertTrue(hashed.with_name(hashed.name + ".gz").exists())
@@ -1,9 +1,18 @@
 """Test template tags."""
 
+from unittest.mock import patch
+
+from django import forms
 from django.conf import settings
 from django.test import TestCase
 from django.template import Context, Template
 
+from registrar.templatetags.field_helpers import field_plan
+
+
+class RequiredForm(forms.Form):
+    name = forms.CharField(widget=forms.TextInput(attrs={"class": "base"}))
+
 
 class TestTemplateTags(TestCase):
     def _render_template(self, string, context=None):
@@ -29,3 +38,41 @@ class TestTemplateTags(TestCase):
         self.assertTrue(result.startswith(settings.GETGOV_PUBLIC_SITE_URL))
         # slash-slash host slash directory slash page
         self.assertEqual(result.count("/"), 4)
+
+
+class TestInputWithErrors(TestCase):
+    def setUp(self):
+        self.form = RequiredForm()
+
+    def render(self, template, **context):
+        return Template("{% load field_helpers %}" + template).render(
+            Context({"form": self.form, **context})
+        )
+
+    def test_magic_context(self):
+        result = self.render(
+            "{% with add_class='wide' attr_auto_validate=True %}"
+            "{% with add_required_class='needed' %}"
+            "{% input_with_errors form.name %}"
+            "{% endwith %}{% endwith %}"
+        )
+        self.assertIn('class="usa-input base wide needed"', result)
+        self.assertIn("auto-validate", result)
+        self.assertIn('class=" usa-label"', result)
+
+    def test_only_what_the_field_uses_is_passed_on(self):
+        result = self.render(
+            "{% input_with_errors form.name %}",
+            sublabel_text="A hint",
+            label_tag="section",
+        )
+        self.assertIn("A hint", result)
+        self.assertIn("<label", result)
+
+    def test_plan_is_made_once_per_form_class(self):
+        field_plan(self.form["name"])
+        with patch.dict("registrar.templatetags.field_helpers._plans"):
+            plan = field_plan(RequiredForm()["name"])
+            self.assertIs(field_plan(RequiredForm()["name"]), plan)
+            self.assertEqual(plan.classes, ("base",))
+            self.assertNotIn("class", plan.attrs)
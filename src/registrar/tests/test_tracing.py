@@ -0,0 +1,95 @@
+"""Test tracing where slow requests spend their time."""
+
+import json
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from registrar.models import User
+from registrar.utility import tracing
+from registrar.utility.tracing import Trace, span
+from registrar.utility.workers import run_concurrently
+
+
+class TestSpan(SimpleTestCase):
+    def trace(self):
+        trace = Trace("trace")
+        token = tracing._trace.set(trace)
+        self.addCleanup(tracing._trace.reset, token)
+        return trace
+
+    def test_nothing_outside_a_trace(self):
+        with span("registry") as attributes:
+            attributes["code"] = 1000
+        self.assertIsNone(tracing._trace.get())
+
+    def test_nested(self):
+        trace = self.trace()
+        with span("registry"):
+            with span("registry command", command="InfoDomain") as attributes:
+                attributes["code"] = 1000
+        command, registry = trace.spans
+        self.assertEqual(registry["parent"], None)
+        self.assertEqual(command["parent"], registry["id"])
+        self.assertEqual(command["attributes"], {"command": "InfoDomain", "code": 1000})
+
+    def test_error(self):
+        trace = self.trace()
+        with self.assertRaises(ValueError):
+            with span("ses"):
+                raise ValueError
+        self.assertEqual(trace.spans[0]["error"], "ValueError")
+
+    @override_settings(REGISTRY_MAX_WORKERS=2)
+    def test_worker_threads(self):
+        trace = self.trace()
+
+        def work(item):
+            with span("registry", item=item):
+                pass
+
+        with span("update"):
+            run_concurrently(work, [1, 2])
+        update = trace.spans[-1]
+        self.assertEqual(
+            sorted(s["attributes"]["item"] for s in trace.spans[:-1]), [1, 2]
+        )
+        self.assertTrue(all(s["parent"] == update["id"] for s in trace.spans[:-1]))
+
+
+class TestTracingMiddleware(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "traces.jsonl"
+        self.client.force_login(User.objects.create(username="mayor"))
+
+    def traces(self):
+        if not self.path.exists():
+            return []
+        return [json.loads(line) for line in self.path.read_text().splitlines()]
+
+    def test_slow_request_is_written(self):
+        with override_settings(TRACE_SLOW_MS=0, TRACE_FILE=self.path):
+            response = self.client.get(reverse("home"))
+        [trace] = self.traces()
+        self.assertEqual(trace["trace_id"], response["X-Request-ID"])
+        spans = {s["name"]: s for s in trace["spans"]}
+        self.assertEqual(spans["request"]["attributes"]["status"], 200)
+        self.assertEqual(spans["template"]["attributes"]["template"], "home.html")
+        self.assertEqual(spans["template"]["parent"], spans["request"]["id"])
+        queries = [s["attributes"]["sql"] for s in trace["spans"] if s["name"] == "db"]
+        self.assertTrue(any(sql.startswith("SELECT") for sql in queries))
+
+    def test_fast_request_is_not_written(self):
+        with override_settings(TRACE_SLOW_MS=60000, TRACE_FILE=self.path):
+            self.client.get(reverse("home"))
+        self.assertEqual(self.traces(), [])
+
+    def test_logged_without_a_file(self):
+        with override_settings(TRACE_SLOW_MS=0, TRACE_FILE=None):
+            with self.assertLogs("registrar.traces") as logs:
+                self.client.get(reverse("home"))
+        self.assertTrue(logs.records[0].spans)
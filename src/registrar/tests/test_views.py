@@ -1,12 +1,15 @@
 from unittest import skip
-from unittest.mock import MagicMock, ANY
+from unittest.mock import MagicMock, ANY, patch
 
 from django.conf import settings
 from django.test import Client, TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from django_webtest import WebTest  # type: ignore
+from epplibwrapper import RegistryError
 import boto3_mocking  # type: ignore
 
 
@@ -20,10 +23,13 @@ from registrar.models import (
     Website,
     UserDomainRole,
     User,
+    Host,
+    Delegation,
 )
 from registrar.views.application import ApplicationWizard, Step
+from registrar.views.index import PER_PAGE
 
-from .common import less_console_noise
+from .common import MockRegistry, less_console_noise
 
 
 class TestViews(TestCase):
@@ -99,6 +105,55 @@ class LoggedInTests(TestWithUser):
         # clean up
         role.delete()
 
+    def test_home_paginates_domains(self):
+        """Domains beyond the first page are reached with the next link."""
+        for i in range(PER_PAGE + 1):
+            domain = Domain.objects.create(name=f"igorville{i:02}.gov")
+            UserDomainRole.objects.create(
+                user=self.user, domain=domain, role=UserDomainRole.Roles.ADMIN
+            )
+        response = self.client.get("/")
+        self.assertContains(response, "igorville00.gov")
+        self.assertNotContains(response, f"igorville{PER_PAGE:02}.gov")
+
+        response = self.client.get("/" + response.context["domains_links"]["next"])
+        self.assertContains(response, f"igorville{PER_PAGE:02}.gov")
+        self.assertNotContains(response, "igorville00.gov")
+        self.assertIsNotNone(response.context["domains_links"]["previous"])
+        self.assertIsNone(response.context["domains_links"]["next"])
+
+    def test_home_sorts_and_filters_domains(self):
+        for name in ["alpha.gov", "beta.gov", "bravo.gov"]:
+            domain = Domain.objects.create(name=name)
+            UserDomainRole.objects.create(
+                user=self.user, domain=domain, role=UserDomainRole.Roles.ADMIN
+            )
+        response = self.client.get("/?domains_sort=-name&domains_q=b")
+        names = [domain["name"] for domain in response.context["domains"]]
+        self.assertEqual(names, ["bravo.gov", "beta.gov"])
+        self.assertEqual(response.context["domain_counts"]["total"], 3)
+        self.assertEqual(response.context["domain_counts"]["matching"], 2)
+
+    def test_home_query_count_does_not_grow(self):
+        """The home page makes the same number of queries for any portfolio."""
+
+        def create(count):
+            for _ in range(count):
+                DomainApplication.objects.create(
+                    creator=self.user,
+                    requested_domain=DraftDomain.objects.create(
+                        name=f"igorville{DraftDomain.objects.count()}.gov"
+                    ),
+                )
+
+        create(1)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get("/")
+        create(PER_PAGE * 2)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get("/")
+        self.assertEqual(len(few), len(many))
+
     def test_whoami_page(self):
         """User information appears on the whoami page."""
         response = self.client.get("/whoami/")
@@ -1029,6 +1084,8 @@ class DomainApplicationTests(TestWithUser, WebTest):
 class TestWithDomainPermissions(TestWithUser):
     def setUp(self):
         super().setUp()
+        self.registry = MockRegistry().start()
+        self.addCleanup(self.registry.stop)
         self.domain, _ = Domain.objects.get_or_create(name="igorville.gov")
         self.domain_information, _ = DomainInformation.objects.get_or_create(
             creator=self.user, domain=self.domain
@@ -1042,6 +1099,7 @@ class TestWithDomainPermissions(TestWithUser):
             self.domain_information.delete()
             if hasattr(self.domain, "contacts"):
                 self.domain.contacts.all().delete()
+            self.domain.host.all().delete()
             self.domain.delete()
             self.role.delete()
         except ValueError:  # pass if already deleted
@@ -1088,6 +1146,21 @@ class TestDomainPermissions(TestWithDomainPermissions):
                     )
                 self.assertEqual(response.status_code, 403)
 
+    def test_permission_check_fetches_once(self):
+        """Roles are loaded once, and the domain is not fetched again."""
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(
+                reverse("domain-nameservers", kwargs={"pk": self.domain.id})
+            )
+        sql = [query["sql"] for query in queries]
+        self.assertEqual(
+            len([q for q in sql if 'FROM "registrar_userdomainrole"' in q]), 1
+        )
+        self.assertEqual(
+            len([q for q in sql if q.startswith('SELECT "registrar_domain"')]), 1
+        )
+
 
 class TestDomainDetail(TestWithDomainPermissions, WebTest):
     def setUp(self):
@@ -1102,6 +1175,15 @@ class TestDomainDetail(TestWithDomainPermissions, WebTest):
         detail_page = home_page.click("Manage")
         self.assertContains(detail_page, "igorville.gov")
 
+    def test_domain_detail_registry_unavailable(self):
+        """The overview is shown when the registry cannot be reached."""
+        with patch.object(
+            Domain, "_fetch_hosts", side_effect=RegistryError("down")
+        ), less_console_noise():
+            page = self.client.get(reverse("domain", kwargs={"pk": self.domain.id}))
+        self.assertContains(page, "can’t be shown right now")
+        self.assertContains(page, "igorville.gov")
+
     def test_domain_user_management(self):
         response = self.client.get(
             reverse("domain-users", kwargs={"pk": self.domain.id})
@@ -1196,6 +1278,37 @@ class TestDomainDetail(TestWithDomainPermissions, WebTest):
             Content=ANY,
         )
 
+    @boto3_mocking.patching
+    def test_domain_add_many_users(self):
+        """Many addresses can be added and invited from one form."""
+        get_user_model().objects.get_or_create(email="mayor@igorville.gov")
+        add_page = self.app.get(
+            reverse("domain-users-add-many", kwargs={"pk": self.domain.id})
+        )
+        session_id = self.app.cookies[settings.SESSION_COOKIE_NAME]
+        add_page.form["emails"] = "mayor@igorville.gov,\nclerk@igorville.gov"
+        self.app.set_cookie(settings.SESSION_COOKIE_NAME, session_id)
+        with boto3_mocking.clients.handler_for("sesv2", MagicMock()):
+            success_result = add_page.form.submit()
+        self.app.set_cookie(settings.SESSION_COOKIE_NAME, session_id)
+        success_page = success_result.follow()
+
+        self.assertContains(success_page, "Added user mayor@igorville.gov.")
+        self.assertContains(success_page, "Invited clerk@igorville.gov")
+        self.assertTrue(
+            DomainInvitation.objects.filter(email="clerk@igorville.gov").exists()
+        )
+
+    def test_domain_add_many_users_invalid(self):
+        add_page = self.app.get(
+            reverse("domain-users-add-many", kwargs={"pk": self.domain.id})
+        )
+        session_id = self.app.cookies[settings.SESSION_COOKIE_NAME]
+        add_page.form["emails"] = "mayor@igorville.gov nonsense"
+        self.app.set_cookie(settings.SESSION_COOKIE_NAME, session_id)
+        result = add_page.form.submit()
+        self.assertContains(result, "These are not valid email addresses: nonsense")
+
     def test_domain_invitation_cancel(self):
         """Posting to the delete view deletes an invitation."""
         EMAIL = "mayor@igorville.gov"
@@ -1254,6 +1367,29 @@ class TestDomainDetail(TestWithDomainPermissions, WebTest):
         )
         self.assertContains(page, "Domain name servers")
 
+    def test_domain_nameservers_lame(self):
+        """Nameservers which did not answer when last checked are pointed out."""
+        host = Host.objects.create(name="ns2.example.com", domain=self.domain)
+        Delegation.objects.create(
+            host=host, domain=self.domain, status=Delegation.Status.LAME
+        )
+        page = self.client.get(
+            reverse("domain-nameservers", kwargs={"pk": self.domain.id})
+        )
+        self.assertContains(page, "did not answer for igorville.gov")
+        self.assertContains(page, "<strong>ns2.example.com</strong>")
+        self.assertNotContains(page, "<strong>ns1.example.com</strong>")
+
+    def test_domain_nameservers_registry_unavailable(self):
+        """The nameservers page is shown when the registry cannot be reached."""
+        with patch.object(
+            Domain, "_fetch_hosts", side_effect=RegistryError("down")
+        ), less_console_noise():
+            page = self.client.get(
+                reverse("domain-nameservers", kwargs={"pk": self.domain.id})
+            )
+        self.assertContains(page, "can’t be shown right now")
+
     def test_domain_nameservers_form(self):
         """Can change domain's nameservers.
 
@@ -1296,6 +1432,19 @@ class TestDomainDetail(TestWithDomainPermissions, WebTest):
         # the field.
         self.assertContains(result, "This field is required", count=2, status_code=200)
 
+    def test_domain_nameservers_form_registry_error(self):
+        """A registry failure is reported and the form is shown again."""
+        nameservers_page = self.app.get(
+            reverse("domain-nameservers", kwargs={"pk": self.domain.id})
+        )
+        session_id = self.app.cookies[settings.SESSION_COOKIE_NAME]
+        self.app.set_cookie(settings.SESSION_COOKIE_NAME, session_id)
+        nameservers_page.form["form-1-server"] = "ns3.example.com"
+        self.registry.registry.send_all.side_effect = RegistryError("busy")
+        with less_console_noise():
+            result = nameservers_page.form.submit()
+        self.assertContains(result, "could not be updated", status_code=200)
+
     def test_domain_authorizing_official(self):
         """Can load domain's authorizing official page."""
         page = self.client.get(
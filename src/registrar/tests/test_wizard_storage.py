@@ -0,0 +1,103 @@
+"""Test keeping the application wizard's progress out of the session."""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from registrar.models import DomainApplication, User, WizardDraft
+from registrar.views.utility import WizardStorage
+
+
+class TestWizardStorage(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="mayor")
+
+    def storage(self):
+        return WizardStorage(self.user, "wizard_application").load()
+
+    def test_saved_and_read_back(self):
+        storage = self.storage()
+        storage["current_step"] = "purpose"
+        storage.setdefault("step_history", []).append("purpose")
+        storage.save()
+        self.assertEqual(
+            self.storage(), {"current_step": "purpose", "step_history": ["purpose"]}
+        )
+
+    def test_unchanged_is_not_written(self):
+        storage = self.storage()
+        storage["application_id"] = 1
+        storage.save()
+
+        storage = self.storage()
+        storage["application_id"] = 1
+        with self.assertNumQueries(0):
+            storage.save()
+
+    def test_nested_change_is_written(self):
+        storage = self.storage()
+        storage["step_history"] = ["purpose"]
+        storage.save()
+
+        storage = self.storage()
+        storage["step_history"].append("review")
+        self.assertTrue(storage.changed)
+        with self.assertNumQueries(1):
+            storage.save()
+        self.assertEqual(self.storage()["step_history"], ["purpose", "review"])
+
+    def test_emptied_is_deleted(self):
+        storage = self.storage()
+        storage["application_id"] = 1
+        storage.save()
+        storage.clear()
+        storage.save()
+        self.assertFalse(WizardDraft.objects.exists())
+
+    def test_per_user(self):
+        storage = self.storage()
+        storage["application_id"] = 1
+        storage.save()
+        other = User.objects.create(username="clerk")
+        self.assertEqual(WizardStorage(other, "wizard_application").load(), {})
+
+
+class TestApplicationWizardStorage(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="mayor")
+        self.client.force_login(self.user)
+
+    def get(self, step):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(f"application:{step}"))
+        self.assertEqual(response.status_code, 200)
+        return [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+        ]
+
+    def test_revisiting_a_page_writes_nothing(self):
+        self.get("organization_type")
+        self.assertEqual(self.get("organization_type"), [])
+
+    def test_progress_is_kept(self):
+        self.get("organization_type")
+        self.get("purpose")
+        draft = WizardDraft.objects.get(user=self.user)
+        self.assertEqual(draft.data["current_step"], "purpose")
+        self.assertEqual(draft.data["step_history"], ["organization_type", "purpose"])
+        self.assertEqual(
+            draft.data["application_id"], DomainApplication.objects.get().id
+        )
+        self.assertNotIn("wizard_application", self.client.session)
+
+    def test_sidebar_follows_progress(self):
+        """The cached sidebar changes as steps are visited."""
+        purpose = reverse("application:purpose")
+        response = self.client.get(reverse("application:organization_type"))
+        self.assertNotContains(response, f'href="{purpose}"')
+        self.client.get(purpose)
+        response = self.client.get(reverse("application:organization_type"))
+        self.assertContains(response, f'href="{purpose}"')
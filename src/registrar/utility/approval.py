@@ -0,0 +1,189 @@
+"""Approve many domain applications at once, creating their domains in the registry."""
+
+import logging
+import secrets
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.db import transaction
+
+from epplibwrapper import CLIENT as registry, RegistryError, commands, common
+from registrar.models import Domain, DomainApplication, PublicContact
+
+from .audit import buffered_audit_log
+from .workers import run_concurrently
+
+logger = logging.getLogger(__name__)
+
+APPROVABLE = [DomainApplication.SUBMITTED, DomainApplication.INVESTIGATING]
+
+
+@dataclass
+class ApprovalResult:
+    """What happened to each application, by requested domain name."""
+
+    # applications which were approved; their domains now exist
+    approved: List[str] = field(default_factory=list)
+    # applications which were not approved, with the reason
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
+def approve_applications(applications, max_workers: Optional[int] = None):
+    """Approve `applications` with `DomainApplication.approve`.
+
+    Each domain is also created in the registry, with a registrant contact.
+    All names are checked with one request, and then up to `max_workers`
+    domains are created at the same time. Then each application is approved
+    and saved in turn. An application which cannot be approved is reported
+    in the result and does not stop the others.
+    """
+    if hasattr(applications, "select_related"):
+        applications = applications.select_related("requested_domain", "creator")
+    result = ApprovalResult()
+
+    candidates = _approvable(list(applications), result)
+    candidates = _available(candidates, result)
+    outcomes = run_concurrently(_provision, candidates, max_workers)
+
+    provisioned = []
+    for application, (registrant, error) in zip(candidates, outcomes):
+        if error:
+            result.failed[_label(application)] = error
+        else:
+            provisioned.append((application, registrant))
+    if provisioned:
+        _save(provisioned, result)
+    return result
+
+
+def _label(application) -> str:
+    if application.requested_domain:
+        return application.requested_domain.name
+    return f"Application {application.id}"
+
+
+def _approvable(applications, result) -> list:
+    """The applications which may be approved, one per requested name."""
+    by_name: Dict[str, DomainApplication] = {}
+    for application in applications:
+        if application.status not in APPROVABLE:
+            result.failed[
+                _label(application)
+            ] = f"Cannot approve an application which is {application.status}."
+        elif not application.requested_domain:
+            result.failed[_label(application)] = "No domain was requested."
+        elif application.requested_domain.name in by_name:
+            result.failed[
+                _label(application)
+            ] = "Another application in this batch requests the same domain."
+        else:
+            by_name[application.requested_domain.name] = application
+
+    for name in Domain.objects.filter(name__in=by_name).values_list("name", flat=True):
+        result.failed[name] = "Requested domain is already in use."
+        del by_name[name]
+    return list(by_name.values())
+
+
+def _available(applications, result) -> list:
+    """The applications whose domains the registry says are available."""
+    if not applications:
+        return []
+    names = [application.requested_domain.name for application in applications]
+    try:
+        response = registry.send(commands.CheckDomain(names=names), cleaned=True)
+    except RegistryError as err:
+        logger.warning("Could not check domain availability", exc_info=True)
+        for name in names:
+            result.failed[name] = f"Could not check availability: {err}"
+        return []
+
+    available = []
+    for application, checked in zip(applications, response.res_data):
+        if checked.avail:
+            available.append(application)
+        else:
+            result.failed[_label(application)] = "Not available in the registry."
+    return available
+
+
+def _provision(application):
+    """Create the domain and its registrant in the registry, over one connection.
+
+    Returns the registrant, and why it failed if it did.
+    """
+    registrant = PublicContact.get_default_registrant()
+    try:
+        registry.send_all(
+            [
+                _create_contact(registrant),
+                commands.CreateDomain(
+                    name=application.requested_domain.name,
+                    registrant=registrant.registry_id,
+                    auth_info=common.DomainAuthInfo(pw=secrets.token_urlsafe(12)),
+                ),
+            ],
+            cleaned=True,
+        )
+    except RegistryError as err:
+        logger.warning("Could not create %s", _label(application), exc_info=True)
+        return None, str(err) or err.__class__.__name__
+    return registrant, None
+
+
+def _create_contact(contact: PublicContact):
+    DF = common.DiscloseField
+    return commands.CreateContact(
+        id=contact.registry_id,
+        postal_info=common.PostalInfo(
+            name=contact.name,
+            addr=common.ContactAddr(
+                street=[s for s in (contact.street1, contact.street2) if s],
+                city=contact.city,
+                pc=contact.pc,
+                cc=contact.cc,
+                sp=contact.sp,
+            ),
+            org=contact.org,
+            type="loc",
+        ),
+        email=contact.email,
+        voice=contact.voice,
+        fax=contact.fax,
+        auth_info=common.ContactAuthInfo(pw=contact.pw),
+        disclose=common.Disclose(
+            flag=False, fields={DF.FAX, DF.VOICE, DF.ADDR}, types={DF.ADDR: "loc"}
+        ),
+        vat=None,
+        ident=None,
+        notify_email=None,
+    )
+
+
+def _save(provisioned, result):
+    """Approve each application, saving its rows in a transaction of its own.
+
+    Its domain already exists in the registry, so an application which
+    cannot be saved must not undo the others. Audit log entries are still
+    written together at the end.
+    """
+    with buffered_audit_log():
+        for application, registrant in provisioned:
+            try:
+                with transaction.atomic():
+                    application.approve()
+                    application.save()
+                    registrant.domain = application.approved_domain
+                    # _provision has already created it in the registry
+                    registrant.save(skip_epp_save=True)
+            except Exception as err:
+                logger.error(
+                    "Created %s in the registry but could not save it",
+                    _label(application),
+                    exc_info=True,
+                )
+                result.failed[
+                    _label(application)
+                ] = f"Created in the registry, but could not be saved here: {err}"
+            else:
+                result.approved.append(application.approved_domain.name)
@@ -0,0 +1,249 @@
+"""
+Write audit log entries in batches.
+
+django-auditlog writes one LogEntry as each audited model is saved, so a
+request which saves fifty objects makes fifty more inserts. Within
+`buffered_audit_log()` (which `AuditLogBufferMiddleware` puts around every
+request) entries are collected instead, and written with one `bulk_create`
+once the changes they describe have been committed. Entries for changes
+which are rolled back are never written.
+
+With AUDIT_LOG_QUEUE set, entries go to the `QueuedLogEntry` table instead,
+and `drain_audit_log_queue` (run by the `drain_audit_log` command) moves
+them to the audit log. Pages which show the audit log move one batch first.
+
+Models are audited with `register`, which swaps django-auditlog's receivers
+for the ones here.
+"""
+
+import contextlib
+import json
+import threading
+from functools import partial
+
+from auditlog.context import threadlocal  # type: ignore
+from auditlog.diff import model_instance_diff  # type: ignore
+from auditlog.models import LogEntry  # type: ignore
+from auditlog import receivers as auditlog_receivers  # type: ignore
+from auditlog.receivers import check_disable  # type: ignore
+from auditlog.registry import auditlog  # type: ignore
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+from django.utils.encoding import smart_str
+
+from registrar.models.queued_log_entry import QueuedLogEntry
+
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def buffered_audit_log():
+    """Collect audit log entries, and write them all at once at the end.
+
+    Blocks may be nested; everything is written when the outermost ends.
+    """
+    if getattr(_local, "buffer", None) is not None:
+        yield
+        return
+
+    _local.buffer = buffer = []
+    try:
+        yield
+    finally:
+        _local.buffer = None
+        if connection.in_atomic_block:
+            # after the entries which are themselves waiting for this commit
+            transaction.on_commit(partial(_write, buffer))
+        else:
+            _write(buffer)
+
+
+class AuditLogBufferMiddleware:
+    """Write each request's audit log entries together, after its changes."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with buffered_audit_log():
+            return self.get_response(request)
+
+
+def drain_audit_log_queue(batch_size=None) -> int:
+    """Move queued entries to the audit log, oldest first. Returns how many.
+
+    Several workers may drain at once; each takes rows the others have not.
+    """
+    with transaction.atomic():
+        queued = QueuedLogEntry.objects.select_for_update(skip_locked=True).order_by(
+            "id"
+        )
+        rows = list(queued[:batch_size] if batch_size else queued)
+        if not rows:
+            return 0
+        _insert([LogEntry(timestamp=row.timestamp, **row.entry) for row in rows])
+        QueuedLogEntry.objects.filter(id__in=[row.id for row in rows]).delete()
+    return len(rows)
+
+
+# the same receivers as django-auditlog's, except for how entries are saved
+
+
+@check_disable
+def log_create(sender, instance, created, **kwargs):
+    if created:
+        record(instance, LogEntry.Action.CREATE, model_instance_diff(None, instance))
+
+
+@check_disable
+def log_update(sender, instance, **kwargs):
+    if instance.pk is None:
+        return
+    try:
+        old = sender.objects.get(pk=instance.pk)
+    except sender.DoesNotExist:
+        return
+    changes = model_instance_diff(
+        old, instance, fields_to_check=kwargs.get("update_fields")
+    )
+    if changes:
+        record(instance, LogEntry.Action.UPDATE, changes)
+
+
+@check_disable
+def log_delete(sender, instance, **kwargs):
+    if instance.pk is not None:
+        record(instance, LogEntry.Action.DELETE, model_instance_diff(instance, None))
+
+
+# by signal, django-auditlog's receiver and the one which replaces it
+RECEIVERS = {
+    post_save: (auditlog_receivers.log_create, log_create),
+    pre_save: (auditlog_receivers.log_update, log_update),
+    post_delete: (auditlog_receivers.log_delete, log_delete),
+}
+
+
+def register(model):
+    """Audit changes to `model`, through `record`.
+
+    The model is registered with django-auditlog, which still decides which
+    fields are compared and how entries are shown. Then the receivers it
+    connected are disconnected, and ours connected in their place.
+    """
+    auditlog.register(model)
+    for signal, (theirs, ours) in RECEIVERS.items():
+        disconnected = signal.disconnect(
+            sender=model, dispatch_uid=auditlog._dispatch_uid(signal, theirs)
+        )
+        if not disconnected:
+            # entries would be written twice
+            raise ImproperlyConfigured(
+                f"django-auditlog did not connect {theirs.__name__} for {model}"
+            )
+        signal.connect(ours, sender=model, dispatch_uid=(__name__, ours.__name__))
+
+
+def record(instance, action, changes):
+    """Log `changes` to `instance`, a dict like {"field": [old, new]}.
+
+    The receivers call this as objects are saved. Call it directly for
+    changes saved without sending signals, such as with `bulk_create`.
+    Nothing is logged inside `auditlog.context.disable_auditlog()`.
+    """
+    if getattr(threadlocal, "auditlog_disabled", False):
+        return
+    buffer = getattr(_local, "buffer", None)
+    if buffer is None and not settings.AUDIT_LOG_QUEUE:
+        LogEntry.objects.log_create(
+            instance, action=action, changes=json.dumps(changes)
+        )
+        return
+
+    entry = _entry(instance, action, json.dumps(changes))
+    if buffer is None:
+        # written at once, but to the queue like any other
+        QueuedLogEntry.objects.create(timestamp=timezone.now(), entry=_fields(entry))
+    elif connection.in_atomic_block:
+        # dropped if this change is rolled back
+        transaction.on_commit(partial(buffer.append, entry))
+    else:
+        buffer.append(entry)
+
+
+def record_created(instances):
+    """Log the creation of `instances`, saved without signals by `bulk_create`.
+
+    Each must have its primary key, and should have the related objects
+    which its audited fields name already loaded.
+    """
+    for instance in instances:
+        record(instance, LogEntry.Action.CREATE, model_instance_diff(None, instance))
+
+
+def _entry(instance, action, changes) -> LogEntry:
+    """An unsaved LogEntry with what `LogEntry.objects.log_create` would fill in."""
+    manager = LogEntry.objects
+    pk = manager._get_pk_value(instance)
+    entry = LogEntry(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_pk=pk,
+        object_id=pk if isinstance(pk, int) else None,
+        object_repr=smart_str(instance),
+        serialized_data=manager._get_serialized_data_or_none(instance),
+        action=action,
+        changes=changes,
+    )
+    get_additional_data = getattr(instance, "get_additional_data", None)
+    if callable(get_additional_data):
+        entry.additional_data = get_additional_data()
+    # django-auditlog fills in the user and their address as entries are saved
+    pre_save.send(
+        sender=LogEntry, instance=entry, raw=False, using=None, update_fields=None
+    )
+    return entry
+
+
+def _write(entries):
+    if not entries:
+        return
+    with transaction.atomic():
+        if settings.AUDIT_LOG_QUEUE:
+            QueuedLogEntry.objects.bulk_create(
+                QueuedLogEntry(timestamp=timezone.now(), entry=_fields(entry))
+                for entry in entries
+            )
+        else:
+            _insert(entries)
+
+
+def _insert(entries):
+    """Write entries to the audit log, keeping any timestamps they were given."""
+    # like log_create, forget entries about an earlier object with a reused pk
+    created = Q()
+    for entry in entries:
+        if entry.action == LogEntry.Action.CREATE:
+            created |= Q(content_type=entry.content_type, object_pk=entry.object_pk)
+    if created:
+        LogEntry.objects.filter(created).delete()
+
+    timestamps = [entry.timestamp for entry in entries]
+    LogEntry.objects.bulk_create(entries)
+    if any(timestamps):
+        # bulk_create sets the time of insertion, whatever was given
+        for entry, timestamp in zip(entries, timestamps):
+            entry.timestamp = timestamp or entry.timestamp
+        LogEntry.objects.bulk_update(entries, ["timestamp"])
+
+
+def _fields(entry) -> dict:
+    return {
+        field.attname: getattr(entry, field.attname)
+        for field in LogEntry._meta.concrete_fields
+        if field.attname not in ("id", "timestamp")
+    }
@@ -0,0 +1,335 @@
+"""
+Check that a domain's nameservers answer for it.
+
+A nameserver which is listed for a domain but does not answer for it
+authoritatively is a "lame delegation". Visitors whose resolver picks that
+nameserver get an error, or no answer at all.
+
+Every nameserver address of every domain is sent an SOA query for the
+domain, many at a time. Answers are cached for as long as their TTL says.
+"""
+
+import asyncio
+import logging
+import secrets
+import socket
+import struct
+import time
+from dataclasses import dataclass, replace
+from datetime import timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from epplibwrapper import RegistryError
+from registrar.models import Delegation, Host
+from registrar.utility import audit
+
+logger = logging.getLogger(__name__)
+
+# record type and class of an SOA query (RFC 1035, section 3.2)
+SOA = 6
+IN = 1
+
+# header flags (RFC 1035, section 4.1.1)
+QR = 0x8000
+AA = 0x0400
+TC = 0x0200
+
+# how long answers are cached, in seconds, whatever their TTL says
+MIN_TTL = 60
+MAX_TTL = 3600
+# failures are retried sooner than answers
+FAILURE_TTL = 300
+
+
+Status = Delegation.Status
+
+# which of two answers is worse
+RANK: Dict[str, int] = {Status.OK: 0, Status.LAME: 1, Status.UNREACHABLE: 2}
+
+
+@dataclass
+class HostResult:
+    """How one nameserver answered for one domain."""
+
+    host: str
+    address: Optional[str]
+    status: str
+    detail: str = ""
+    ttl: int = FAILURE_TTL
+
+
+def build_query(zone: str, query_id: int) -> bytes:
+    """A DNS message asking for the SOA record of `zone`."""
+    # not recursive: we want this server's own answer
+    header = struct.pack("!HHHHHH", query_id, 0, 1, 0, 0, 0)
+    question = b"".join(
+        bytes([len(label)]) + label.encode("idna")
+        for label in zone.rstrip(".").split(".")
+    )
+    return header + question + b"\0" + struct.pack("!HH", SOA, IN)
+
+
+def _skip_name(message: bytes, offset: int) -> int:
+    """The offset just past the (possibly compressed) name at `offset`."""
+    while True:
+        length = message[offset]
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        offset += 1 + length
+        if length == 0:
+            return offset
+
+
+def parse_response(message: bytes, query_id: int) -> Tuple[int, int, Optional[int]]:
+    """Returns the header flags, rcode and the SOA's TTL, if it was answered."""
+    if len(message) < 12:
+        raise ValueError("Response is too short")
+    response_id, flags, questions, answers = struct.unpack("!HHHH", message[:8])
+    if response_id != query_id or not flags & QR:
+        raise ValueError("Not a response to our query")
+
+    offset = 12
+    for _ in range(questions):
+        offset = _skip_name(message, offset) + 4
+    for _ in range(answers):
+        offset = _skip_name(message, offset)
+        rtype, _, ttl, length = struct.unpack("!HHIH", message[offset : offset + 10])
+        if rtype == SOA:
+            return flags, flags & 0xF, ttl
+        offset += 10 + length
+    return flags, flags & 0xF, None
+
+
+class _UDPQuery(asyncio.DatagramProtocol):
+    def __init__(self, message: bytes, answer: asyncio.Future):
+        self.message = message
+        self.answer = answer
+
+    def connection_made(self, transport):
+        transport.sendto(self.message)
+
+    def datagram_received(self, data, addr):
+        # ignore stray packets; only a reply to this query will do
+        if data[:2] == self.message[:2] and not self.answer.done():
+            self.answer.set_result(data)
+
+    def error_received(self, exc):
+        if not self.answer.done():
+            self.answer.set_exception(exc)
+
+
+class DelegationChecker:
+    """
+    Query nameservers concurrently, without blocking on any one of them.
+
+    At most `concurrency` queries are in flight at once. Each is sent over
+    UDP, and again over TCP if the answer was too big for UDP. Results are
+    kept for their TTL, so checking the same nameserver for the same domain
+    again soon after does not send another query.
+    """
+
+    def __init__(self, concurrency=None, timeout=None, port=53):
+        self.concurrency = concurrency or settings.DELEGATION_CHECK_CONCURRENCY
+        self.timeout = timeout or settings.DELEGATION_CHECK_TIMEOUT
+        self.port = port
+        self._cache: Dict[Tuple[str, str], Tuple[float, HostResult]] = {}
+
+    async def check(
+        self, zones: Dict[str, Dict[str, tuple]]
+    ) -> Dict[str, List[HostResult]]:
+        """Check each zone's hosts, given like {"a.gov": {"ns1.a.gov": ("1.2.3.4",)}}.
+
+        Hosts without addresses are looked up. Returns results by zone.
+        """
+        self._limit = asyncio.Semaphore(self.concurrency)
+        self._pending: Dict[Tuple[str, str], asyncio.Future] = {}
+        zone_names = list(zones)
+        checked = await asyncio.gather(
+            *(self._check_zone(zone, zones[zone]) for zone in zone_names)
+        )
+        return dict(zip(zone_names, checked))
+
+    async def _check_zone(self, zone, hosts) -> List[HostResult]:
+        results = await asyncio.gather(
+            *(
+                self._check_host(zone, host, addresses)
+                for host, addresses in hosts.items()
+            )
+        )
+        return [result for host_results in results for result in host_results]
+
+    async def _check_host(self, zone, host, addresses) -> List[HostResult]:
+        if not addresses:
+            try:
+                addresses = await self._resolve(host)
+            except OSError as err:
+                return [
+                    HostResult(host, None, Status.UNREACHABLE, f"No address: {err}")
+                ]
+        return await asyncio.gather(
+            *(self._query(zone, host, address) for address in addresses)
+        )
+
+    async def _resolve(self, host) -> List[str]:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, self.port, type=socket.SOCK_DGRAM
+        )
+        return list(dict.fromkeys(info[4][0] for info in infos))
+
+    async def _query(self, zone, host, address) -> HostResult:
+        """Ask `address` about `zone`, unless it has been asked already.
+
+        Several hosts may share an address; they also share one query.
+        """
+        key = (address, zone)
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return replace(cached[1], host=host)
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = asyncio.ensure_future(
+                self._ask_limited(zone, host, address)
+            )
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        result = await pending
+        self._cache[key] = (time.monotonic() + result.ttl, result)
+        return replace(result, host=host)
+
+    async def _ask_limited(self, zone, host, address) -> HostResult:
+        async with self._limit:
+            return await self._ask(zone, host, address)
+
+    async def _ask(self, zone, host, address) -> HostResult:
+        query_id = secrets.randbelow(0x10000)
+        message = build_query(zone, query_id)
+        try:
+            response = await asyncio.wait_for(
+                self._send_udp(message, address), self.timeout
+            )
+            flags, rcode, ttl = parse_response(response, query_id)
+            if flags & TC:
+                response = await asyncio.wait_for(
+                    self._send_tcp(message, address), self.timeout
+                )
+                flags, rcode, ttl = parse_response(response, query_id)
+        except asyncio.TimeoutError:
+            return HostResult(host, address, Status.UNREACHABLE, "No answer")
+        except (struct.error, asyncio.IncompleteReadError) as err:
+            detail = f"Answer was cut short: {err}"
+            return HostResult(host, address, Status.UNREACHABLE, detail)
+        except (OSError, ValueError, IndexError) as err:
+            return HostResult(host, address, Status.UNREACHABLE, str(err))
+
+        if rcode != 0:
+            return HostResult(host, address, Status.LAME, f"Response code {rcode}")
+        if not flags & AA or ttl is None:
+            return HostResult(host, address, Status.LAME, "Not authoritative")
+        return HostResult(host, address, Status.OK, ttl=min(max(ttl, MIN_TTL), MAX_TTL))
+
+    async def _send_udp(self, message, address) -> bytes:
+        loop = asyncio.get_running_loop()
+        answer = loop.create_future()
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _UDPQuery(message, answer), remote_addr=(address, self.port)
+        )
+        try:
+            return await answer
+        finally:
+            transport.close()
+
+    async def _send_tcp(self, message, address) -> bytes:
+        reader, writer = await asyncio.open_connection(address, self.port)
+        try:
+            writer.write(struct.pack("!H", len(message)) + message)
+            await writer.drain()
+            (length,) = struct.unpack("!H", await reader.readexactly(2))
+            return await reader.readexactly(length)
+        finally:
+            writer.close()
+
+
+def check_delegations(
+    domains, checker=None, force=False
+) -> Dict[str, List[HostResult]]:
+    """Check the nameservers of `domains` and save how each answered for each.
+
+    A host is not checked again for a domain while its last answer for that
+    domain has not expired, unless `force` is given. Returns the new
+    results, by domain name.
+    """
+    checker = checker or DelegationChecker()
+    now = timezone.now()
+    fresh: Set[Tuple[str, str]] = set()
+    if not force:
+        fresh = set(
+            Delegation.objects.filter(expires_at__gt=now).values_list(
+                "host__name", "domain__name"
+            )
+        )
+
+    zones, by_name = {}, {}
+    for domain in domains:
+        try:
+            listed = {name: tuple(addresses) for name, *addresses in domain.nameservers}
+        except RegistryError:
+            logger.warning("Could not get nameservers of %s", domain, exc_info=True)
+            continue
+        stale = {
+            name: addresses
+            for name, addresses in listed.items()
+            if (name, domain.name) not in fresh
+        }
+        if stale:
+            zones[domain.name] = stale
+            by_name[domain.name] = domain
+
+    results = asyncio.run(checker.check(zones))
+
+    # a host with several addresses is as healthy as its worst answer
+    worst: Dict[Tuple[str, str], HostResult] = {}
+    for zone, zone_results in results.items():
+        for result in zone_results:
+            key = (result.host, zone)
+            if key not in worst or RANK[result.status] > RANK[worst[key].status]:
+                worst[key] = result
+
+    with transaction.atomic():
+        names = list({host for host, _ in worst})
+        known = set(Host.objects.filter(name__in=names).values_list("name", flat=True))
+        new = {host: zone for host, zone in worst if host not in known}
+        Host.objects.bulk_create(
+            [Host(name=host, domain=by_name[zone]) for host, zone in new.items()],
+            ignore_conflicts=True,
+        )
+        if new:
+            audit.record_created(
+                Host.objects.filter(name__in=list(new)).select_related("domain")
+            )
+        ids = dict(Host.objects.filter(name__in=names).values_list("name", "id"))
+        # links the host to the domain too, if it was not yet
+        Delegation.objects.bulk_create(
+            [
+                Delegation(
+                    host_id=ids[host],
+                    domain=by_name[zone],
+                    status=result.status,
+                    detail=(
+                        f"{result.address}: {result.detail}"
+                        if result.detail and result.address
+                        else result.detail
+                    ),
+                    checked_at=now,
+                    expires_at=now + timedelta(seconds=result.ttl),
+                )
+                for (host, zone), result in worst.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["host", "domain"],
+            update_fields=["status", "detail", "checked_at", "expires_at"],
+        )
+    return results
@@ -0,0 +1,137 @@
+"""Give many people access to a domain at once."""
+
+import logging
+from dataclasses import dataclass, field
+from typing import List
+
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from registrar.models import DomainInvitation, User, UserDomainRole
+
+from .audit import buffered_audit_log, record_created
+from .email import EmailSendingError, send_templated_emails
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AddUsersResult:
+    """What happened to each email address, in the order they were given."""
+
+    # people with an account, who now have a role on the domain
+    added: List[str] = field(default_factory=list)
+    # people with an account, who already had a role
+    already_added: List[str] = field(default_factory=list)
+    # people without an account, who have been sent an invitation
+    invited: List[str] = field(default_factory=list)
+    # people without an account, who had already been invited
+    already_invited: List[str] = field(default_factory=list)
+    # invited, but the invitation email could not be sent
+    not_sent: List[str] = field(default_factory=list)
+
+
+def add_users_to_domain(
+    domain, emails, domain_url, role=UserDomainRole.Roles.ADMIN, send_email=True
+) -> AddUsersResult:
+    """Give everyone in `emails` a role on `domain`, or invite them.
+
+    Email addresses are matched without regard to case. The number of
+    queries does not depend on how many addresses there are. Invitation
+    emails are sent after the database work, with a link to `domain_url`.
+    """
+    result = AddUsersResult()
+    emails = _unique(emails)
+    if not emails:
+        return result
+
+    with buffered_audit_log(), transaction.atomic():
+        users = _users_by_email(emails)
+        has_role = set(
+            UserDomainRole.objects.filter(
+                domain=domain, user__in=users.values()
+            ).values_list("user_id", flat=True)
+        )
+
+        invited = set(
+            DomainInvitation.objects.filter(domain=domain)
+            .annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=[e.lower() for e in emails])
+            .values_list("email_lower", flat=True)
+        )
+
+        new_roles, new_invitations = [], []
+        for email in emails:
+            user = users.get(email.lower())
+            if user is None:
+                if email.lower() in invited:
+                    result.already_invited.append(email)
+                else:
+                    result.invited.append(email)
+                    new_invitations.append(DomainInvitation(email=email, domain=domain))
+            elif user.id in has_role:
+                result.already_added.append(email)
+            else:
+                result.added.append(email)
+                new_roles.append(UserDomainRole(user=user, domain=domain, role=role))
+
+        # another request may have added some of these meanwhile
+        UserDomainRole.objects.bulk_create(new_roles, ignore_conflicts=True)
+        DomainInvitation.objects.bulk_create(new_invitations)
+
+        # bulk_create does not send the signals which write the audit log,
+        # and with ignore_conflicts it does not return the new roles' ids
+        if new_roles:
+            record_created(
+                UserDomainRole.objects.filter(
+                    domain=domain, user__in=[r.user for r in new_roles]
+                ).select_related("user", "domain")
+            )
+        record_created(new_invitations)
+
+        # bulk_create does not send the signals which keep cached roles fresh
+        for new_role in new_roles:
+            UserDomainRole.invalidate(new_role.user.id)
+
+    if send_email:
+        result.not_sent = _send_invitations(domain, result.invited, domain_url)
+    return result
+
+
+def _users_by_email(emails):
+    """Find the accounts for these addresses, by lowercased address."""
+    users = {}
+    for user in (
+        User.objects.annotate(email_lower=Lower("email"))
+        .filter(email_lower__in=[email.lower() for email in emails])
+        .order_by("id")
+    ):
+        # if several accounts share an email address, use the oldest
+        users.setdefault(user.email_lower, user)
+    return users
+
+
+def _send_invitations(domain, emails, domain_url):
+    """Email each invitee. Returns the addresses which could not be sent to."""
+    try:
+        return send_templated_emails(
+            "emails/domain_invitation.txt",
+            "emails/domain_invitation_subject.txt",
+            to_addresses=emails,
+            context={"domain_url": domain_url, "domain": domain},
+        )
+    except EmailSendingError:
+        logger.warning("Could not send email invitations", exc_info=True)
+        return list(emails)
+
+
+def _unique(emails):
+    """Drop blanks and repeats (ignoring case), keeping the original order."""
+    seen = set()
+    unique = []
+    for email in emails:
+        email = email.strip()
+        if email and email.lower() not in seen:
+            seen.add(email.lower())
+            unique.append(email)
+    return unique
@@ -1,9 +1,32 @@
 """Utilities for sending emails."""
 
+import json
+import logging
+from time import perf_counter
+
 import boto3
 
 from django.conf import settings
 from django.template.loader import get_template
+from prometheus_client import Histogram
+
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+SEND_SECONDS = Histogram(
+    "email_send_seconds",
+    "Time taken to hand one email to SES, by whether it was accepted",
+    ["result"],
+)
+
+# SES sends bulk email from a stored template. Ours has no content of its
+# own: the subject and body are rendered by Django and passed in as data.
+BULK_TEMPLATE = "registrar-prerendered"
+# the most destinations SES accepts in one SendBulkEmail call
+BULK_LIMIT = 50
+
+_bulk_template_ready = False
 
 
 class EmailSendingError(RuntimeError):
@@ -22,15 +45,64 @@ def send_templated_email(
     context as Django's HTML templates. context gives additional information
     that the template may use.
     """
+    subject, email_body = _render(template_name, subject_template_name, context)
+    ses_client = _ses_client()
+
+    try:
+        _send(ses_client, to_address, subject, email_body)
+    except Exception as exc:
+        raise EmailSendingError("Could not send SES email.") from exc
+
+
+def send_templated_emails(
+    template_name: str, subject_template_name: str, to_addresses: list, context={}
+) -> list:
+    """Send the same templated email to many addresses, one message each.
+
+    The templates are rendered once, and up to BULK_LIMIT addresses are sent
+    to with each SES call. A failure for one address does not stop the
+    others; the addresses which failed are returned.
+    """
+    if not to_addresses:
+        return []
+    subject, email_body = _render(template_name, subject_template_name, context)
+    ses_client = _ses_client()
 
+    if len(to_addresses) == 1:
+        try:
+            _send(ses_client, to_addresses[0], subject, email_body)
+        except Exception:
+            logger.warning(
+                "Could not send SES email to %s", to_addresses, exc_info=True
+            )
+            return list(to_addresses)
+        return []
+
+    _ensure_bulk_template(ses_client)
+
+    failed = []
+    for start in range(0, len(to_addresses), BULK_LIMIT):
+        batch = to_addresses[start : start + BULK_LIMIT]
+        try:
+            failed += _send_bulk(ses_client, batch, subject, email_body)
+        except Exception:
+            logger.warning("Could not send SES email to %s", batch, exc_info=True)
+            failed += batch
+    return failed
+
+
+def _render(template_name, subject_template_name, context):
     template = get_template(template_name)
     email_body = template.render(context=context)
 
     subject_template = get_template(subject_template_name)
     subject = subject_template.render(context=context)
+    return subject, email_body
 
+
+def _ses_client():
     try:
-        ses_client = boto3.client(
+        return boto3.client(
             "sesv2",
             region_name=settings.AWS_REGION,
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
@@ -40,16 +112,84 @@ def send_templated_email(
     except Exception as exc:
         raise EmailSendingError("Could not access the SES client.") from exc
 
+
+def _send(ses_client, to_address, subject, email_body):
+    start = perf_counter()
+    result = "failed"
     try:
-        ses_client.send_email(
-            FromEmailAddress=settings.DEFAULT_FROM_EMAIL,
-            Destination={"ToAddresses": [to_address]},
-            Content={
-                "Simple": {
-                    "Subject": {"Data": subject},
-                    "Body": {"Text": {"Data": email_body}},
+        with span("ses", operation="SendEmail"):
+            ses_client.send_email(
+                FromEmailAddress=settings.DEFAULT_FROM_EMAIL,
+                Destination={"ToAddresses": [to_address]},
+                Content={
+                    "Simple": {
+                        "Subject": {"Data": subject},
+                        "Body": {"Text": {"Data": email_body}},
+                    },
                 },
-            },
+            )
+        result = "sent"
+    finally:
+        SEND_SECONDS.labels(result).observe(perf_counter() - start)
+
+
+def _ensure_bulk_template(ses_client):
+    """Create the template used for bulk sending, once per process."""
+    global _bulk_template_ready
+    if _bulk_template_ready:
+        return
+    try:
+        ses_client.create_email_template(
+            TemplateName=BULK_TEMPLATE,
+            # three braces, so that the text is not HTML-escaped
+            TemplateContent={"Subject": "{{{subject}}}", "Text": "{{{body}}}"},
         )
+    except ses_client.exceptions.AlreadyExistsException:
+        pass
     except Exception as exc:
-        raise EmailSendingError("Could not send SES email.") from exc
+        raise EmailSendingError("Could not create the SES template.") from exc
+    _bulk_template_ready = True
+
+
+def _send_bulk(ses_client, to_addresses, subject, email_body):
+    """Send to each of `to_addresses`. Returns those which SES did not accept."""
+    start = perf_counter()
+    with span("ses", operation="SendBulkEmail"):
+        try:
+            response = ses_client.send_bulk_email(
+                FromEmailAddress=settings.DEFAULT_FROM_EMAIL,
+                DefaultContent={
+                    "Template": {
+                        "TemplateName": BULK_TEMPLATE,
+                        "TemplateData": json.dumps(
+                            {"subject": subject, "body": email_body}
+                        ),
+                    }
+                },
+                BulkEmailEntries=[
+                    {"Destination": {"ToAddresses": [to_address]}}
+                    for to_address in to_addresses
+                ],
+            )
+        except Exception:
+            elapsed = (perf_counter() - start) / len(to_addresses)
+            for _ in to_addresses:
+                SEND_SECONDS.labels("failed").observe(elapsed)
+            raise
+    # SES does not say how long each message took, so share the time out
+    elapsed = (perf_counter() - start) / len(to_addresses)
+
+    # results are in the same order as the entries
+    failed = []
+    for to_address, entry in zip(to_addresses, response["BulkEmailEntryResults"]):
+        if entry["Status"] == "SUCCESS":
+            SEND_SECONDS.labels("sent").observe(elapsed)
+        else:
+            SEND_SECONDS.labels("failed").observe(elapsed)
+            logger.warning(
+                "Could not send SES email to %s: %s",
+                to_address,
+                entry.get("Error", entry["Status"]),
+            )
+            failed.append(to_address)
+    return failed
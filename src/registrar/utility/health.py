@@ -0,0 +1,260 @@
+"""
+Know whether this instance, and the services it depends on, are working.
+
+There are two questions which an orchestrator asks. Is the process alive?
+`/health/` answers that without touching anything else. Is it ready to
+serve requests? `/health/ready/` answers that from `CHECKER`, which checks
+each dependency from background threads every HEALTH_CHECK_INTERVAL
+seconds. A probe only reads the latest results, so it is never held up by
+a slow database or registry.
+
+Only the checks in HEALTH_REQUIRED_CHECKS decide whether an instance is
+ready. The others are reported, but every instance shares those services,
+and an outage of one should not take all of them out of rotation at once.
+They are run every HEALTH_REPORTED_CHECK_INTERVAL seconds instead, since
+every worker of every instance runs them against the same services.
+
+A check is a function which returns a short description of what it found,
+or raises if the dependency is not working:
+
+    @check("cache")
+    def check_cache():
+        caches["default"].get("anything")
+        return "answered"
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from time import perf_counter, sleep, time
+
+from django.conf import settings
+from django.db import connection, connections
+from prometheus_client import Gauge
+
+from .replicas import replica_lag
+
+logger = logging.getLogger(__name__)
+
+HEALTHY = Gauge(
+    "health_check_ok",
+    "Whether each dependency passed its latest health check, by the "
+    "process which found it least healthy",
+    ["check"],
+    multiprocess_mode="livemin",
+)
+
+# name -> function, for each check which `CHECKER` runs
+CHECKS: dict = {}
+
+
+def check(name):
+    """Register a function as the check called `name`."""
+
+    def register(function):
+        CHECKS[name] = function
+        return function
+
+    return register
+
+
+@dataclass
+class Result:
+    ok: bool
+    detail: str
+    checked_at: float
+    duration_ms: float
+
+
+class HealthChecker:
+    """Runs each check in a thread of its own, keeping its latest result."""
+
+    def __init__(self, checks=None):
+        self.checks = CHECKS if checks is None else checks
+        self.results: dict = {}
+        self._running: dict = {}
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Check every HEALTH_CHECK_INTERVAL seconds, from now on."""
+        # threads do not survive a fork, so start one in each process
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                threading.Thread(
+                    target=self._run_forever, name="health-checker", daemon=True
+                ).start()
+                self._pid = os.getpid()
+
+    def run_once(self):
+        """Run the checks, waiting up to HEALTH_CHECK_TIMEOUT for them.
+
+        A check which is still running from an earlier round is not started
+        again, and is reported as failing until it finishes.
+        """
+        started = []
+        now = time()
+        for name, function in self.checks.items():
+            running = self._running.get(name)
+            if running is not None and running.is_alive():
+                continue
+            result = self.results.get(name)
+            if result is not None and now - result.checked_at < _interval(name):
+                continue
+            thread = threading.Thread(
+                target=self._run,
+                args=(name, function),
+                name=f"health-check-{name}",
+                daemon=True,
+            )
+            thread.start()
+            self._running[name] = thread
+            started.append(thread)
+        deadline = perf_counter() + settings.HEALTH_CHECK_TIMEOUT
+        for thread in started:
+            thread.join(max(0, deadline - perf_counter()))
+        for name, thread in self._running.items():
+            if thread.is_alive():
+                detail = f"no answer within {settings.HEALTH_CHECK_TIMEOUT}s"
+                self._record(name, Result(False, detail, time(), 0.0))
+
+    def report(self):
+        """The latest results, and whether they make this instance ready."""
+        self.start()
+        now = time()
+        checks = {}
+        for name in self.checks:
+            result = self.results.get(name)
+            if result is None:
+                entry = {"ok": False, "detail": "not checked yet"}
+            # results this old mean that the checker itself has stopped
+            elif now - result.checked_at > _interval(name) * 3:
+                entry = {"ok": False, "detail": "result is out of date"}
+            else:
+                entry = {"ok": result.ok, "detail": result.detail}
+            if result is not None:
+                entry["age_seconds"] = round(now - result.checked_at, 1)
+                entry["duration_ms"] = result.duration_ms
+            entry["required"] = name in settings.HEALTH_REQUIRED_CHECKS
+            checks[name] = entry
+        failing = [name for name, entry in checks.items() if not entry["ok"]]
+        return {
+            "ready": not any(checks[name]["required"] for name in failing),
+            "failing": failing,
+            "checks": checks,
+        }
+
+    def _run_forever(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Health checks could not be run")
+            sleep(settings.HEALTH_CHECK_INTERVAL)
+
+    def _run(self, name, function):
+        start = perf_counter()
+        try:
+            ok, detail, error = True, function(), None
+        except Exception as err:
+            # the report is public, so it names the error without its message
+            ok, detail, error = False, type(err).__name__, err
+        finally:
+            # each thread has connections of its own, which would be left open
+            connections.close_all()
+        duration_ms = round((perf_counter() - start) * 1000, 1)
+        previous = self.results.get(name)
+        if not ok and (previous is None or previous.ok):
+            logger.warning("Health check %s failed", name, exc_info=error)
+        elif ok and previous is not None and not previous.ok:
+            logger.info("Health check %s passed again", name)
+        self._record(name, Result(ok, str(detail), time(), duration_ms))
+
+    def _record(self, name, result):
+        self.results[name] = result
+        HEALTHY.labels(name).set(int(result.ok))
+
+
+CHECKER = HealthChecker()
+
+
+def _interval(name):
+    """Seconds between runs of the check called `name`."""
+    if name in settings.HEALTH_REQUIRED_CHECKS:
+        return settings.HEALTH_CHECK_INTERVAL
+    return settings.HEALTH_REPORTED_CHECK_INTERVAL
+
+
+def _ago(timestamp):
+    return f"{time() - timestamp:.0f}s ago"
+
+
+@check("database")
+def check_database():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    return "answered"
+
+
+@check("replica")
+def check_replica():
+    """Lagging replicas only mean that reads go to the primary instead."""
+    if not settings.DATABASE_REPLICAS:
+        return "none configured"
+    lags = {alias: replica_lag(alias) for alias in settings.DATABASE_REPLICAS}
+    behind = [
+        alias
+        for alias, lag in lags.items()
+        if lag is None or lag > settings.REPLICA_MAX_LAG_SECONDS
+    ]
+    if behind:
+        raise RuntimeError(f"Not reading from {', '.join(behind)}.")
+    return ", ".join(f"{alias} {lag:.1f}s behind" for alias, lag in lags.items())
+
+
+@check("registry")
+def check_registry():
+    """Commands are not sent just to check; this is how the last ones went."""
+    from epplibwrapper import CLIENT
+
+    if not CLIENT.warm_up():
+        raise RuntimeError("The registry client is not configured.")
+    answer, failure = CLIENT.last_answer, CLIENT.last_failure
+    if failure is not None and (answer is None or failure > answer):
+        raise ConnectionError(f"The registry failed {_ago(failure)}.")
+    if answer is None:
+        return "configured, no commands sent yet"
+    return f"answered {_ago(answer)}"
+
+
+@check("domain_list")
+def check_domain_list():
+    """Fetches the list when the cached copy expires, so requests need not."""
+    from api.views import _domains
+
+    return f"{len(_domains())} domains"
+
+
+@check("email")
+def check_email():
+    from .email import _ses_client
+
+    account = _ses_client().get_account()
+    if not account.get("SendingEnabled"):
+        raise RuntimeError("Sending is disabled for the SES account.")
+    return "sending enabled"
+
+
+@check("login")
+def check_login():
+    from djangooidc.views import CLIENT
+
+    if CLIENT is None:
+        raise RuntimeError("The OpenID Connect client is not configured.")
+    entry = CLIENT.provider_cache.get()
+    if entry is None:
+        raise RuntimeError("The provider's configuration has expired.")
+    return f"provider configuration fetched {_ago(entry['fetched_at'])}"
@@ -0,0 +1,190 @@
+"""
+Structured logging which stays out of the way of requests.
+
+`JSONFormatter` writes each record as one line of JSON, including any
+`extra` fields and the id of the request which logged it, which
+`RequestIdMiddleware` sets. `QueueStreamHandler` hands records to a thread
+which formats and writes them, so a request never waits for its logs.
+`SamplingFilter` keeps only some of the debug and info records of noisy
+loggers. Arguments wrapped in `Lazy` are only worked out if their record
+is going to be written.
+
+    logger.debug("state: %s", Lazy(lambda: expensive_summary()))
+"""
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+import uuid
+from itertools import count
+from logging.handlers import QueueHandler, QueueListener
+
+# the id of the request being handled, for each record logged during it
+request_id = contextvars.ContextVar("request_id", default=None)
+
+# attributes of every LogRecord; anything else was passed in `extra`
+_STANDARD = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class Lazy:
+    """A log argument which is only worked out when the record is written."""
+
+    def __init__(self, function):
+        self.function = function
+
+    def __str__(self):
+        return str(self.function())
+
+    def __repr__(self):
+        return repr(self.function())
+
+
+class RequestIdMiddleware:
+    """Give each request an id, for its log records and its response.
+
+    The id is taken from the X-Request-ID or X-Vcap-Request-Id header of the
+    request (cloud.gov's router sets the latter) or made up if neither is set.
+    """
+
+    HEADERS = ("HTTP_X_REQUEST_ID", "HTTP_X_VCAP_REQUEST_ID")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        value = next(
+            (request.META[h][:64] for h in self.HEADERS if request.META.get(h)),
+            None,
+        )
+        token = request_id.set(value or uuid.uuid4().hex)
+        try:
+            response = self.get_response(request)
+            response["X-Request-ID"] = request_id.get()
+            return response
+        finally:
+            request_id.reset(token)
+
+
+class RequestIdFilter(logging.Filter):
+    """Add `request_id` to each record, which is None outside of a request."""
+
+    def filter(self, record):
+        record.request_id = request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep one in every `rates[name]` debug and info records of each logger.
+
+    `rates` is by logger name, and also applies to the loggers below it.
+    Warnings and worse are always kept.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self._counters: dict = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate <= 1:
+            return True
+        counter = self._counters.setdefault(record.name, count())
+        return next(counter) % rate == 0
+
+    def _rate(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1
+
+
+class JSONFormatter(logging.Formatter):
+    """Write each record as a line of JSON."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD and key not in entry:
+                entry[key] = str(value) if isinstance(value, Lazy) else value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class QueueStreamHandler(QueueHandler):
+    """
+    Write records to a stream from a thread, instead of where they are logged.
+
+    The message and any exception are put into text where they are logged,
+    so that later changes to the objects in them do not show. Formatting
+    with this handler's formatter, and writing, happen in the thread.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        self.target = logging.StreamHandler(stream)
+        self._listener = None
+        self._pid = None
+        self._running = threading.Lock()
+
+    def setFormatter(self, fmt):
+        # used by the thread's handler, not for preparing records here
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        for key, value in vars(record).items():
+            if isinstance(value, Lazy):
+                setattr(record, key, str(value))
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        # threads do not survive a fork, so start one in each process
+        if self._pid != os.getpid():
+            with self._running:
+                if self._pid != os.getpid():
+                    self._listener = QueueListener(self.queue, self.target)
+                    self._listener.start()
+                    self._pid = os.getpid()
+                    atexit.register(self.close)
+        super().enqueue(record)
+
+    def flush(self):
+        """Wait until everything logged so far has been written."""
+        with self._running:
+            if self._pid == os.getpid():
+                self._listener.stop()
+                self._listener.start()
+        self.target.flush()
+
+    def close(self):
+        with self._running:
+            if self._pid == os.getpid():
+                self._listener.stop()
+                self._pid = None
+        super().close()
@@ -0,0 +1,73 @@
+"""Change a nameserver on many domains at once."""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from epplibwrapper import RegistryError
+
+from .workers import run_concurrently
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReplaceResult:
+    """What happened to each domain, by domain name."""
+
+    # domains which used the old nameserver and now use the new one
+    changed: List[str] = field(default_factory=list)
+    # domains which did not use the old nameserver
+    unchanged: List[str] = field(default_factory=list)
+    # domains which could not be updated, with the reason
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
+def replace_nameserver(
+    domains, old: str, new: tuple, max_workers: Optional[int] = None
+) -> ReplaceResult:
+    """Use the host `new`, like ("ns2.example.com",), instead of `old`.
+
+    Each domain is read from and written to the registry separately, but up
+    to `max_workers` domains are worked on at the same time. A failure on
+    one domain does not stop the others.
+    """
+    old = old.strip().lower().rstrip(".")
+    domains = list(domains)
+    result = ReplaceResult()
+
+    outcomes = run_concurrently(
+        lambda domain: _replace_one(domain, old, new), domains, max_workers
+    )
+
+    for domain, (changed, error) in zip(domains, outcomes):
+        if error:
+            result.failed[domain.name] = error
+        elif changed:
+            result.changed.append(domain.name)
+        else:
+            result.unchanged.append(domain.name)
+    return result
+
+
+def _replace_one(domain, old, new):
+    """Returns whether `domain` was changed, and why it failed, if it did."""
+    try:
+        hosts = domain.nameservers
+        if old not in [name for name, *_ in hosts]:
+            return False, None
+        replaced = []
+        for host in hosts:
+            replacement = tuple(new) if host[0] == old else host
+            # the new host may already have been one of this domain's hosts
+            if replacement[0] not in [name for name, *_ in replaced]:
+                replaced.append(replacement)
+        domain.nameservers = replaced
+        return True, None
+    except (RegistryError, ValueError) as err:
+        logger.warning("Could not replace nameserver on %s", domain, exc_info=True)
+        return False, str(err) or err.__class__.__name__
+    except Exception as err:
+        # a bug, but it must not stop the other domains either
+        logger.error("Could not replace nameserver on %s", domain, exc_info=True)
+        return False, str(err) or err.__class__.__name__
@@ -0,0 +1,167 @@
+"""
+Watch the SQL which each request runs.
+
+`QueryMiddleware` counts each request's queries and adds up their time,
+for /metrics. A query slower than SLOW_QUERY_MS is logged with its
+fingerprint (its SQL without any values, so that repeats of it can be
+grouped) and the lines of this project's code which ran it. A view which
+runs more queries than its budget is logged too, or fails outright if
+QUERY_BUDGET_RAISE is set, as it is in development and in CI's tests.
+
+`query_budget` applies a budget to any block of code, such as a
+management command.
+
+`CONNECTIONS_OPENED` counts new database connections. With CONN_MAX_AGE
+set, a worker should seldom need one.
+"""
+
+import hashlib
+import logging
+import re
+import traceback
+from contextlib import ExitStack, contextmanager
+from itertools import count
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from prometheus_client import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+QUERIES = Histogram(
+    "view_db_queries",
+    "Database queries made while handling a request, by view",
+    ["view"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+QUERY_SECONDS = Histogram(
+    "view_db_seconds",
+    "Time spent waiting for the database while handling a request, by view",
+    ["view"],
+)
+CONNECTIONS_OPENED = Counter(
+    "db_connections_opened_total",
+    "Database connections opened, by database alias",
+    ["alias"],
+)
+
+# frames of this project's code logged for each slow query
+STACK_DEPTH = 5
+
+_VALUES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+_LISTS = re.compile(r"\(\?(?:, \?)*\)")
+_SPACE = re.compile(r"\s+")
+# key -> count of how often it has been seen, for sampling what is logged
+_seen: dict = {}
+
+
+class QueryBudgetExceeded(Exception):
+    """More queries were run than the budget allows."""
+
+
+class QueryMonitor:
+    """Counts and times queries, and logs slow ones, while installed."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - start
+            self.count += 1
+            self.seconds += elapsed
+            if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+                _log_slow_query(sql, elapsed)
+
+    @contextmanager
+    def installed(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    def check_budget(self, name, budget):
+        if self.count <= budget:
+            return
+        message = "%s ran %d queries, over its budget of %d"
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(message % (name, self.count, budget))
+        if _sampled(("budget", name)):
+            logger.warning(message, name, self.count, budget)
+
+
+@contextmanager
+def query_budget(budget, name="block"):
+    """Hold the `with` block to `budget` queries, like a view."""
+    with QueryMonitor().installed() as monitor:
+        yield monitor
+    monitor.check_budget(name, budget)
+
+
+class QueryMiddleware:
+    """Count and time each request's queries, and hold views to a budget."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryMonitor().installed() as monitor:
+            response = self.get_response(request)
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        QUERIES.labels(view).observe(monitor.count)
+        QUERY_SECONDS.labels(view).observe(monitor.seconds)
+        logger.debug(
+            "%s ran %d queries in %.1f ms", view, monitor.count, monitor.seconds * 1000
+        )
+        monitor.check_budget(view, budget_for(view))
+        return response
+
+
+def budget_for(view):
+    """The budget for a view's URL name, or else for its namespace."""
+    budgets = settings.QUERY_BUDGETS
+    namespace = view.rpartition(":")[0]
+    return budgets.get(view, budgets.get(namespace, settings.QUERY_BUDGET_DEFAULT))
+
+
+def fingerprint(sql):
+    """The SQL without its values, and a short hash of that to group by."""
+    shape = _SPACE.sub(" ", _LISTS.sub("(...)", _VALUES.sub("?", sql))).strip()
+    return shape, hashlib.sha1(shape.encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+def _log_slow_query(sql, elapsed):
+    shape, digest = fingerprint(sql)
+    if not _sampled(("slow", digest)):
+        return
+    logger.warning(
+        "Slow query %s took %.1f ms",
+        digest,
+        elapsed * 1000,
+        extra={"fingerprint": digest, "sql": shape, "call_site": _call_site()},
+    )
+
+
+def _call_site():
+    """The innermost frames of this project's code, outermost first."""
+    root = str(settings.BASE_DIR)
+    frames = [
+        f"{frame.filename[len(root) + 1 :]}:{frame.lineno} in {frame.name}"
+        for frame in traceback.extract_stack()[:-1]
+        if frame.filename.startswith(root)
+        and "site-packages" not in frame.filename
+        and frame.filename != __file__
+    ]
+    return frames[-STACK_DEPTH:]
+
+
+def _sampled(key):
+    """Log the first occurrence of `key`, then one in QUERY_LOG_SAMPLING."""
+    seen = _seen.setdefault(key, count())
+    return next(seen) % settings.QUERY_LOG_SAMPLING == 0
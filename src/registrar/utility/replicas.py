@@ -0,0 +1,183 @@
+"""
+Send reads which can be a little out of date to read replicas.
+
+Only views named in REPLICA_VIEWS read from a replica, and only for GET and
+HEAD requests. Everything else, including management commands and anything
+a view runs after it has written, uses the primary database ("default").
+
+Read-your-writes: a request which writes, or which is not a GET or HEAD,
+sets a cookie which keeps that visitor on the primary for the next
+REPLICA_PIN_SECONDS, so that they see their own changes even before the
+replicas have caught up.
+
+Sessions and users are always read from the primary. They are loaded
+before the view runs, and a visitor who has just logged in or out must not
+be shown a replica's older copy.
+
+Each replica's lag is measured at most every REPLICA_LAG_CHECK_INTERVAL
+seconds, by each process. A replica more than REPLICA_MAX_LAG_SECONDS
+behind, or which cannot be reached, is not read from until it catches up.
+"""
+
+import logging
+import random
+from contextvars import ContextVar
+from fnmatch import fnmatchcase
+from time import monotonic
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from prometheus_client import Gauge
+
+logger = logging.getLogger(__name__)
+
+REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "How far each read replica is behind the primary database, as last "
+    "measured by the process which found it furthest behind",
+    ["alias"],
+    multiprocess_mode="livemax",
+)
+
+# the cookie which keeps a visitor on the primary after they have written
+PIN_COOKIE = "primary_db"
+
+SAFE_METHODS = ("GET", "HEAD")
+
+# apps whose models are always read from the primary
+PRIMARY_APPS = ("sessions", "auth")
+
+# on a replica, seconds since the last transaction it replayed, unless it
+# has replayed everything it has been sent (when the primary is idle)
+LAG_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+_routing: ContextVar = ContextVar("replica_routing", default=None)
+# alias -> (when measured, by monotonic clock; lag in seconds or None)
+_lags: dict = {}
+
+
+class Routing:
+    """Where the database work of one request may read from."""
+
+    def __init__(self):
+        self.replicas_allowed = False
+        self.wrote = False
+
+
+class ReplicaRouter:
+    """Read from a replica where the request allows it, and write to the primary."""
+
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None or not routing.replicas_allowed or routing.wrote:
+            return DEFAULT_DB_ALIAS
+        if _primary_only(model):
+            return DEFAULT_DB_ALIAS
+        usable = [alias for alias in settings.DATABASE_REPLICAS if _usable(alias)]
+        return random.choice(usable) if usable else DEFAULT_DB_ALIAS  # nosec
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None:
+            # whatever is read after this should include what was written
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas have the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get their tables from the primary
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+    """Decide whether each request may read from a replica."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        routing = Routing()
+        token = _routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if routing.wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        routing = _routing.get()
+        if routing is not None:
+            routing.replicas_allowed = (
+                request.method in SAFE_METHODS
+                and PIN_COOKIE not in request.COOKIES
+                and reads_from_replica(request.resolver_match.view_name)
+            )
+
+
+def reads_from_replica(view):
+    """Whether a view's URL name matches a pattern in REPLICA_VIEWS."""
+    return any(fnmatchcase(view, pattern) for pattern in settings.REPLICA_VIEWS)
+
+
+def replica_lag(alias):
+    """Seconds that a replica is behind the primary, or None if unreachable.
+
+    The last measurement is reused for REPLICA_LAG_CHECK_INTERVAL seconds.
+    """
+    measured_at, lag = _lags.get(alias, (None, None))
+    if (
+        measured_at is not None
+        and monotonic() - measured_at < settings.REPLICA_LAG_CHECK_INTERVAL
+    ):
+        return lag
+    # other threads use the last measurement while this one is taken
+    _lags[alias] = (monotonic(), lag)
+    try:
+        lag = _measure(connections[alias])
+    except DatabaseError:
+        logger.warning("Unable to measure the lag of replica %s", alias, exc_info=True)
+        lag = None
+    _lags[alias] = (monotonic(), lag)
+    REPLICA_LAG.labels(alias).set(float("inf") if lag is None else lag)
+    return lag
+
+
+def _measure(connection):
+    if connection.vendor != "postgresql":
+        # other databases, such as SQLite files in development, do not replicate
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        (lag,) = cursor.fetchone()
+    return float(lag or 0)
+
+
+def _primary_only(model):
+    return (
+        model._meta.app_label in PRIMARY_APPS
+        or model._meta.label == settings.AUTH_USER_MODEL
+    )
+
+
+def _usable(alias):
+    lag = replica_lag(alias)
+    return lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
@@ -0,0 +1,47 @@
+"""
+Django's database session engine, optionally with a cache in front of it.
+
+Set SESSION_ENGINE to this module. If SESSION_STORE_CACHE_ALIAS names a
+cache, sessions are read from it, and from the database only when it does
+not have them; changes are written to both, as with Django's `cached_db`
+engine. If it is None, as by default, every read goes to the database.
+
+`clearsessions` and `sweep_sessions` delete expired sessions a batch at a
+time, rather than in one statement which locks the whole table while it
+runs.
+"""
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.utils import timezone
+
+# rows deleted per statement by `clear_expired`
+SWEEP_BATCH_SIZE = 1000
+
+# used when no cache is set: it never has a session, and keeps none
+_NO_CACHE = DummyCache("", {})
+
+
+class SessionStore(CachedDBStore):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        alias = settings.SESSION_STORE_CACHE_ALIAS
+        self._cache = caches[alias] if alias else _NO_CACHE
+
+    @classmethod
+    def clear_expired(cls, batch_size=SWEEP_BATCH_SIZE):
+        """Delete expired sessions, a batch at a time. Returns how many.
+
+        Cached copies are not touched; they expire from the cache by
+        themselves at the same time.
+        """
+        model = cls.get_model_class()
+        expired = model.objects.filter(expire_date__lt=timezone.now())
+        deleted = 0
+        while True:
+            keys = list(expired.values_list("session_key", flat=True)[:batch_size])
+            if not keys:
+                return deleted
+            deleted += model.objects.filter(session_key__in=keys).delete()[0]
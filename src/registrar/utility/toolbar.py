@@ -0,0 +1,13 @@
+"""When to show django-debug-toolbar, which is only installed with DEBUG."""
+
+from django.conf import settings
+
+
+def show_toolbar(request) -> bool:
+    """Show the toolbar while DEBUG is on.
+
+    Docker's addresses are not in INTERNAL_IPS, so they are not checked.
+    The test runner turns DEBUG off, which keeps the toolbar (and its
+    panels' queries and cache calls) out of tests.
+    """
+    return settings.DEBUG
@@ -0,0 +1,151 @@
+"""
+Find out where a slow request's time went.
+
+`TracingMiddleware` starts a trace for each request, with a span for every
+database query. Code which calls out to something slow wraps the call in a
+span of its own, which may be given attributes when it starts or later:
+
+    with span("registry", command="InfoDomain") as attributes:
+        response = ...
+        attributes["code"] = response.code
+
+Outside of a traced request, `span` does nothing. A trace is only kept if
+its request took at least TRACE_SLOW_MS. It is then appended to TRACE_FILE
+as a line of JSON or, if that is not set, logged by the "registrar.traces"
+logger, so that it reaches whatever collects the logs.
+"""
+
+import json
+import logging
+import threading
+import uuid
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from itertools import count
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+from .logs import request_id
+
+logger = logging.getLogger("registrar.traces")
+
+# characters of each query's SQL kept in its span
+SQL_LENGTH = 200
+
+_trace: ContextVar = ContextVar("trace", default=None)
+_parent: ContextVar = ContextVar("span_parent", default=None)
+_file_lock = threading.Lock()
+
+
+class Trace:
+    """The spans of one request, as they finish."""
+
+    def __init__(self, trace_id):
+        self.id = trace_id
+        self.start = perf_counter()
+        self.spans: list = []
+        self._ids = count(1)
+
+    def to_dict(self):
+        return {"trace_id": self.id, "spans": self.spans}
+
+
+@contextmanager
+def span(name, **attributes):
+    """Time the `with` block as part of the current trace, if there is one."""
+    trace = _trace.get()
+    if trace is None:
+        yield attributes
+        return
+    span_id = next(trace._ids)
+    parent_id = _parent.get()
+    token = _parent.set(span_id)
+    start = perf_counter()
+    error = None
+    try:
+        yield attributes
+    except BaseException as err:
+        error = type(err).__name__
+        raise
+    finally:
+        end = perf_counter()
+        _parent.reset(token)
+        trace.spans.append(
+            {
+                "id": span_id,
+                "parent": parent_id,
+                "name": name,
+                "start_ms": round((start - trace.start) * 1000, 3),
+                "duration_ms": round((end - start) * 1000, 3),
+                "attributes": attributes,
+                "error": error,
+            }
+        )
+
+
+class TracingMiddleware:
+    """Trace each request, and keep the trace if the request was slow."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if settings.TRACE_SLOW_MS is None:
+            return self.get_response(request)
+        trace = Trace(request_id.get() or uuid.uuid4().hex)
+        token = _trace.set(trace)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_trace_query))
+                attributes = stack.enter_context(
+                    span("request", method=request.method, path=request.path)
+                )
+                response = self.get_response(request)
+                attributes["status"] = response.status_code
+        finally:
+            _trace.reset(token)
+        if (perf_counter() - trace.start) * 1000 >= settings.TRACE_SLOW_MS:
+            export(trace)
+        return response
+
+
+def _trace_query(execute, sql, params, many, context):
+    with span("db", alias=context["connection"].alias, sql=sql[:SQL_LENGTH]):
+        return execute(sql, params, many, context)
+
+
+def export(trace):
+    """Write out a finished trace."""
+    path = settings.TRACE_FILE
+    if not path:
+        logger.info("slow request %s", trace.id, extra=trace.to_dict())
+        return
+    line = json.dumps(trace.to_dict(), default=str) + "\n"
+    try:
+        with _file_lock, open(path, "a") as file:
+            file.write(line)
+    except OSError:
+        logger.warning("Could not write trace %s to %s", trace.id, path, exc_info=True)
+
+
+class TracedTemplate(Template):
+    def render(self, context=None, request=None):
+        with span("template", template=self.origin.template_name):
+            return super().render(context, request)
+
+
+class TracedDjangoTemplates(DjangoTemplates):
+    """Django's template backend, with a span for each template rendered.
+
+    Templates included by other templates are part of their span.
+    """
+
+    def from_string(self, template_code):
+        return TracedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TracedTemplate(super().get_template(template_name).template, self)
@@ -0,0 +1,44 @@
+"""Run slow, independent pieces of work (like registry calls) side by side."""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+from django.conf import settings
+from django.db import connections
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def run_concurrently(
+    function: Callable[[T], R], items: Iterable[T], max_workers: Optional[int] = None
+) -> List[R]:
+    """Call `function` on each item, up to `max_workers` at once, in order.
+
+    With one worker (or one item) everything runs in this thread. Otherwise
+    each worker thread closes the database connection it opened when done,
+    and sees this thread's context variables, such as the request's trace.
+    """
+    if max_workers is None:
+        max_workers = settings.REGISTRY_MAX_WORKERS
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # a context can only be entered by one thread at a time
+        contexts = [copy_context() for _ in items]
+        return list(
+            executor.map(
+                lambda context, item: context.run(_in_thread, function, item),
+                contexts,
+                items,
+            )
+        )
+
+
+def _in_thread(function, item):
+    try:
+        return function(item)
+    finally:
+        connections.close_all()
@@ -7,8 +7,10 @@ from .domain import (
     DomainSecurityEmailView,
     DomainUsersView,
     DomainAddUserView,
+    DomainAddUsersView,
     DomainInvitationDeleteView,
 )
 from .health import *
 from .index import *
+from .metrics import *
 from .whoami import *
@@ -10,7 +10,7 @@ from django.contrib import messages
 from registrar.forms import application_wizard as forms
 from registrar.models import DomainApplication
 from registrar.utility import StrEnum
-from registrar.views.utility import StepsHelper
+from registrar.views.utility import StepsHelper, WizardStorage
 
 from .utility import DomainApplicationPermissionView
 
@@ -50,7 +50,7 @@ class ApplicationWizard(TemplateView):
     The registrar's domain application is several pages of "steps".
     Together, these steps constitute a "wizard".
 
-    This base class sets up a shared state (stored in the user's session)
+    This base class sets up a shared state (stored in the WizardDraft table)
     between pages of the application and provides common methods for
     processing form data.
 
@@ -108,6 +108,7 @@ class ApplicationWizard(TemplateView):
         super().__init__()
         self.steps = StepsHelper(self)
         self._application = None  # for caching
+        self._storage = None  # loaded when first used
 
     def has_pk(self):
         """Does this wizard know about a DomainApplication database record?"""
@@ -139,7 +140,7 @@ class ApplicationWizard(TemplateView):
                 )
                 return self._application
             except DomainApplication.DoesNotExist:
-                logger.debug("Application id %s did not have a DomainApplication" % id)
+                logger.debug("Application id %s did not have a DomainApplication", id)
 
         self._application = DomainApplication.objects.create(
             creator=self.request.user,  # type: ignore
@@ -149,21 +150,25 @@ class ApplicationWizard(TemplateView):
 
     @property
     def storage(self):
-        # marking session as modified on every access
-        # so that updates to nested keys are always saved
-        self.request.session.modified = True
-        return self.request.session.setdefault(self.prefix, {})
+        # saved at the end of the request, and only if it has changed
+        if self._storage is None:
+            self._storage = WizardStorage(self.request.user, self.prefix)
+        return self._storage.load()
 
     @storage.setter
     def storage(self, value):
-        self.request.session[self.prefix] = value
-        self.request.session.modified = True
+        self.storage.clear()
+        self.storage.update(value)
 
     @storage.deleter
     def storage(self):
-        if self.prefix in self.request.session:
-            del self.request.session[self.prefix]
-            self.request.session.modified = True
+        self.storage.clear()
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        if self._storage is not None:
+            self._storage.save()
+        return response
 
     def done(self):
         """Called when the user clicks the submit button, if all forms are valid."""
@@ -200,7 +205,7 @@ class ApplicationWizard(TemplateView):
 
         # if user visited via an "edit" url, associate the id of the
         # application they are trying to edit to this wizard instance
-        # and remove any prior wizard data from their session
+        # and remove any prior wizard data
         if current_url == self.EDIT_URL_NAME and "id" in kwargs:
             del self.storage
             self.storage["application_id"] = kwargs["id"]
@@ -471,7 +476,7 @@ class Finished(ApplicationWizard):
     def get(self, request, *args, **kwargs):
         context = self.get_context_data()
         context["application_id"] = self.application.id
-        # clean up this wizard session, because we are done with it
+        # clean up this wizard draft, because we are done with it
         del self.storage
         return render(self.request, self.template_name, context)
 
@@ -500,7 +505,7 @@ class ApplicationWithdrawn(DomainApplicationPermissionView):
         If user click on withdraw confirm button, this view updates the status
         to withdraw and send back to homepage.
         """
-        application = DomainApplication.objects.get(id=self.kwargs["pk"])
+        application = self.get_object()
         application.withdraw()
         application.save()
         return HttpResponseRedirect(reverse("home"))
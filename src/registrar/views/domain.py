@@ -7,34 +7,68 @@ inherit from `DomainPermissionView` (or DomainInvitationPermissionDeleteView).
 
 import logging
 
+from django import forms
 from django.contrib import messages
 from django.contrib.messages.views import SuccessMessageMixin
-from django.db import IntegrityError
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.views.generic.edit import FormMixin
 
-from registrar.models import (
-    Domain,
-    DomainInvitation,
-    User,
-    UserDomainRole,
-)
+from epplibwrapper import RegistryError
+from registrar.models import Domain, DomainInvitation
 
 from ..forms import (
     DomainAddUserForm,
+    DomainAddUsersForm,
     NameserverFormset,
     DomainSecurityEmailForm,
     ContactForm,
 )
-from ..utility.email import send_templated_email, EmailSendingError
+from ..utility.domain_users import add_users_to_domain
 from .utility import DomainPermissionView, DomainInvitationPermissionDeleteView
 
 
 logger = logging.getLogger(__name__)
 
 
-class DomainView(DomainPermissionView):
+class NameserversMixin:
+
+    """Put the domain's nameservers in the context, asking the registry here.
+
+    Templates read `nameservers` and `lame_nameservers` from the context
+    rather than from the domain, so that a registry which cannot be reached
+    is shown as `nameservers_unavailable` instead of failing the page.
+    """
+
+    _nameservers_context = None
+
+    def nameservers_context(self):
+        if self._nameservers_context is None:
+            domain = self.object
+            try:
+                self._nameservers_context = {
+                    "nameservers": domain.nameservers,
+                    "lame_nameservers": domain.lame_nameservers,
+                    "nameservers_unavailable": False,
+                }
+            except RegistryError:
+                logger.warning(
+                    "Could not get nameservers for %s", domain, exc_info=True
+                )
+                self._nameservers_context = {
+                    "nameservers": [],
+                    "lame_nameservers": [],
+                    "nameservers_unavailable": True,
+                }
+        return self._nameservers_context
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(self.nameservers_context())
+        return context
+
+
+class DomainView(NameserversMixin, DomainPermissionView):
 
     """Domain detail overview page."""
 
@@ -83,7 +117,7 @@ class DomainAuthorizingOfficialView(DomainPermissionView, FormMixin):
         return super().form_valid(form)
 
 
-class DomainNameserversView(DomainPermissionView, FormMixin):
+class DomainNameserversView(NameserversMixin, DomainPermissionView, FormMixin):
 
     """Domain nameserver editing view."""
 
@@ -92,8 +126,8 @@ class DomainNameserversView(DomainPermissionView, FormMixin):
 
     def get_initial(self):
         """The initial value for the form (which is a formset here)."""
-        domain = self.get_object()
-        return [{"server": name} for name, *ip in domain.nameservers]
+        nameservers = self.nameservers_context()["nameservers"]
+        return [{"server": name} for name, *ip in nameservers]
 
     def get_success_url(self):
         """Redirect to the nameservers page for the domain."""
@@ -140,7 +174,18 @@ class DomainNameserversView(DomainPermissionView, FormMixin):
                 # no server information in this field, skip it
                 pass
         domain = self.get_object()
-        domain.nameservers = nameservers
+        try:
+            domain.nameservers = nameservers
+        except ValueError as err:
+            messages.error(self.request, str(err))
+            return self.form_invalid(formset)
+        except RegistryError:
+            logger.warning("Could not update nameservers", exc_info=True)
+            messages.error(
+                self.request,
+                "The name servers could not be updated. Please try again later.",
+            )
+            return self.form_invalid(formset)
 
         messages.success(
             self.request, "The name servers for this domain have been updated."
@@ -250,7 +295,8 @@ class DomainAddUserView(DomainPermissionView, FormMixin):
     """
 
     template_name = "domain_add_user.html"
-    form_class = DomainAddUserForm
+    # DomainAddUsersView uses a different form
+    form_class: type[forms.Form] = DomainAddUserForm
 
     def get_success_url(self):
         return reverse("domain-users", kwargs={"pk": self.object.pk})
@@ -270,63 +316,54 @@ class DomainAddUserView(DomainPermissionView, FormMixin):
             reverse("domain", kwargs={"pk": self.object.id})
         )
 
-    def _make_invitation(self, email_address):
-        """Make a Domain invitation for this email and redirect with a message."""
-        invitation, created = DomainInvitation.objects.get_or_create(
-            email=email_address, domain=self.object
-        )
-        if not created:
-            # that invitation already existed
+    def form_valid(self, form):
+        """Add the specified user on this domain, or invite them."""
+        return self._add_users([form.cleaned_data["email"]])
+
+    def _add_users(self, emails):
+        """Add or invite everyone in `emails` and say how it went."""
+        result = add_users_to_domain(self.object, emails, self._domain_abs_url())
+
+        added = result.added + result.already_added
+        if added:
+            messages.success(self.request, f"Added {_users(added)}.")
+        if result.already_invited:
             messages.warning(
                 self.request,
-                f"{email_address} has already been invited to this domain.",
+                f"{', '.join(result.already_invited)} "
+                f"{'has' if len(result.already_invited) == 1 else 'have'} "
+                "already been invited to this domain.",
+            )
+        sent = [email for email in result.invited if email not in result.not_sent]
+        if sent:
+            messages.success(self.request, f"Invited {', '.join(sent)} to this domain.")
+        if result.not_sent:
+            messages.warning(
+                self.request,
+                "Could not send email invitation"
+                + ("." if len(emails) == 1 else f" to {', '.join(result.not_sent)}."),
+            )
+            logger.warning(
+                "Could not send email invitation to %s for domain %s",
+                ", ".join(result.not_sent),
+                self.object,
             )
-        else:
-            # created a new invitation in the database, so send an email
-            try:
-                send_templated_email(
-                    "emails/domain_invitation.txt",
-                    "emails/domain_invitation_subject.txt",
-                    to_address=email_address,
-                    context={
-                        "domain_url": self._domain_abs_url(),
-                        "domain": self.object,
-                    },
-                )
-            except EmailSendingError:
-                messages.warning(self.request, "Could not send email invitation.")
-                logger.warn(
-                    "Could not sent email invitation to %s for domain %s",
-                    email_address,
-                    self.object,
-                    exc_info=True,
-                )
-            else:
-                messages.success(
-                    self.request, f"Invited {email_address} to this domain."
-                )
         return redirect(self.get_success_url())
 
+
+class DomainAddUsersView(DomainAddUserView):
+
+    """Add or invite many users to a domain at once."""
+
+    template_name = "domain_add_users.html"
+    form_class = DomainAddUsersForm
+
     def form_valid(self, form):
-        """Add the specified user on this domain."""
-        requested_email = form.cleaned_data["email"]
-        # look up a user with that email
-        try:
-            requested_user = User.objects.get(email=requested_email)
-        except User.DoesNotExist:
-            # no matching user, go make an invitation
-            return self._make_invitation(requested_email)
+        return self._add_users(form.cleaned_data["emails"])
 
-        try:
-            UserDomainRole.objects.create(
-                user=requested_user, domain=self.object, role=UserDomainRole.Roles.ADMIN
-            )
-        except IntegrityError:
-            # User already has the desired role! Do nothing??
-            pass
 
-        messages.success(self.request, f"Added user {requested_email}.")
-        return redirect(self.get_success_url())
+def _users(emails):
+    return ("user " if len(emails) == 1 else "users ") + ", ".join(emails)
 
 
 class DomainInvitationDeleteView(
@@ -1,12 +1,33 @@
-from django.http import HttpResponse
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.cache import never_cache
 
 from login_required import login_not_required
 
+from registrar.utility.health import CHECKER
+
 
 # the health check endpoint needs to be globally available so that the
 # PaaS orchestrator can make sure the app has come up properly
+# it answers as long as the process does, without checking anything else,
+# and without the transaction which ATOMIC_REQUESTS would open for it
 @login_not_required
+@transaction.non_atomic_requests
 def health(request):
     return HttpResponse(
         '<html lang="en"><head><title>OK - Get.gov</title></head><body>OK</body>'
     )
+
+
+# whether this instance can serve requests, from checks which have already
+# been run in the background, so that this answers as quickly as `health`
+@login_not_required
+@transaction.non_atomic_requests
+@never_cache
+def ready(request):
+    report = CHECKER.report()
+    status = 200 if report["ready"] else 503
+    if not request.user.is_staff:
+        # what each check found is for staff; anyone may see what is failing
+        report = {"ready": report["ready"], "failing": report["failing"]}
+    return JsonResponse(report, status=status)
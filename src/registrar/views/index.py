@@ -1,22 +1,117 @@
-from django.db.models import F
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Coalesce
 from django.shortcuts import render
 
-from registrar.models import DomainApplication
+from registrar.models import Domain, DomainApplication
+
+from .utility.pagination import KeysetPaginator
+
+# rows per table on the home page
+PER_PAGE = 20
+
+# sorts offered to the user, mapped to what the query orders by
+DOMAIN_SORTS = {"name": "name", "created": "created_time", "status": "status_sort"}
+APPLICATION_SORTS = {"name": "name_sort", "created": "created_at", "status": "status"}
 
 
 def index(request):
     """This page is available to anyone without logging in."""
     context = {}
     if request.user.is_authenticated:
-        applications = DomainApplication.objects.filter(creator=request.user)
-        context["domain_applications"] = applications
-
-        domains = request.user.permissions.values(
-            "role",
-            pk=F("domain__id"),
-            name=F("domain__name"),
-            created_time=F("domain__created_at"),
-            application_status=F("domain__domain_application__status"),
-        )
-        context["domains"] = domains
+        context.update(_domains(request))
+        context.update(_applications(request))
     return render(request, "home.html", context)
+
+
+def _domains(request):
+    """One page of the user's domains, with counts. Always two queries."""
+    domains = Domain.objects.filter(permissions__user=request.user)
+    search = request.GET.get("domains_q", "").strip()
+    matching = Q(name__istartswith=search) if search else Q()
+
+    counts = domains.aggregate(total=Count("id"), matching=Count("id", filter=matching))
+
+    sort = _sort(request, "domains_sort", DOMAIN_SORTS, "name")
+    rows = (
+        domains.filter(matching)
+        .annotate(
+            created_time=F("created_at"),
+            application_status=F("domain_application__status"),
+            status_sort=Coalesce("domain_application__status", Value("")),
+        )
+        .values("pk", "name", "created_time", "application_status", "status_sort")
+    )
+    page = KeysetPaginator(rows, _ordering(sort, DOMAIN_SORTS), PER_PAGE).page(
+        request.GET.get("domains_cursor")
+    )
+    return {
+        "domains": page,
+        "domain_counts": counts,
+        "domains_q": search,
+        "domains_sort": sort,
+        "domains_links": _links(request, "domains", page, sort, DOMAIN_SORTS),
+    }
+
+
+def _applications(request):
+    """One page of the user's applications, with counts. Always two queries."""
+    applications = DomainApplication.objects.filter(creator=request.user)
+    status = request.GET.get("applications_status", "")
+    matching = Q(status=status) if status else Q()
+
+    counts = applications.aggregate(
+        total=Count("id"), matching=Count("id", filter=matching)
+    )
+
+    sort = _sort(request, "applications_sort", APPLICATION_SORTS, "-created")
+    rows = (
+        applications.filter(matching)
+        .select_related("requested_domain")
+        .annotate(name_sort=Coalesce("requested_domain__name", Value("")))
+    )
+    page = KeysetPaginator(rows, _ordering(sort, APPLICATION_SORTS), PER_PAGE).page(
+        request.GET.get("applications_cursor")
+    )
+    return {
+        "domain_applications": page,
+        "application_counts": counts,
+        "applications_status": status,
+        "application_statuses": DomainApplication.STATUS_CHOICES,
+        "applications_sort": sort,
+        "applications_links": _links(
+            request, "applications", page, sort, APPLICATION_SORTS
+        ),
+    }
+
+
+def _sort(request, param, sorts, default):
+    """The requested sort, such as "name" or "-created", if it is allowed."""
+    sort = request.GET.get(param, default)
+    return sort if sort.lstrip("-") in sorts else default
+
+
+def _ordering(sort, sorts):
+    return ("-" if sort.startswith("-") else "") + sorts[sort.lstrip("-")]
+
+
+def _links(request, prefix, page, sort, sorts):
+    """Query strings for sorting and paging one table, keeping the other's."""
+    params = request.GET.copy()
+    params.pop(f"{prefix}_cursor", None)
+
+    def link(**changes):
+        query = params.copy()
+        for key, value in changes.items():
+            query[f"{prefix}_{key}"] = value
+        return "?" + query.urlencode()
+
+    return {
+        # clicking the current sort reverses it; sorting starts a new first page
+        "sort": {
+            name: link(sort=name if sort != name else f"-{name}") for name in sorts
+        },
+        "next": link(cursor=page.next_cursor) if page.next_cursor else None,
+        "previous": (
+            link(cursor=page.previous_cursor) if page.previous_cursor else None
+        ),
+    }
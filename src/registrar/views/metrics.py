@@ -0,0 +1,37 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.http import HttpResponse
+from login_required import login_not_required
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+    multiprocess,
+)
+
+
+# scrapers cannot log in, so they send METRICS_TOKEN instead
+@login_not_required
+def metrics(request):
+    """Serve every metric, added up across the worker processes."""
+    if not _may_read_metrics(request):
+        response = HttpResponse("Unauthorized", status=401)
+        response["WWW-Authenticate"] = "Bearer"
+        return response
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+def _may_read_metrics(request):
+    if request.user.is_staff:
+        return True
+    token = settings.METRICS_TOKEN
+    given = request.headers.get("Authorization", "")
+    return bool(token) and hmac.compare_digest(given, f"Bearer {token}")
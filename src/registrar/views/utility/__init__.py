@@ -1,4 +1,5 @@
 from .steps_helper import StepsHelper
+from .wizard_storage import WizardStorage
 from .always_404 import always_404
 
 from .permission_views import (
@@ -2,7 +2,7 @@
 
 from django.contrib.auth.mixins import PermissionRequiredMixin
 
-from registrar.models import UserDomainRole, DomainApplication, DomainInvitation
+from registrar.models import DomainApplication, DomainInvitation
 
 
 class PermissionsLoginMixin(PermissionRequiredMixin):
@@ -13,6 +13,18 @@ class PermissionsLoginMixin(PermissionRequiredMixin):
         self.raise_exception = self.request.user.is_authenticated
         return super().handle_no_permission()
 
+    def get_object(self, queryset=None):
+        """Fetch the object once, however many times the view asks for it.
+
+        A permission check which had to fetch the object anyway may hand
+        it over by setting `self._object`.
+        """
+        if queryset is not None:
+            return super().get_object(queryset)
+        if getattr(self, "_object", None) is None:
+            self._object = super().get_object()
+        return self._object
+
 
 class DomainPermission(PermissionsLoginMixin):
 
@@ -28,9 +40,7 @@ class DomainPermission(PermissionsLoginMixin):
             return False
 
         # user needs to have a role on the domain
-        if not UserDomainRole.objects.filter(
-            user=self.request.user, domain__id=self.kwargs["pk"]
-        ).exists():
+        if int(self.kwargs["pk"]) not in self.request.user.domain_roles():
             return False
 
         # if we need to check more about the nature of role, do it here.
@@ -53,9 +63,10 @@ class DomainApplicationPermission(PermissionsLoginMixin):
         # user needs to be the creator of the application
         # this query is empty if there isn't a domain application with this
         # id and this user as creator
-        if not DomainApplication.objects.filter(
+        self._object = DomainApplication.objects.filter(
             creator=self.request.user, id=self.kwargs["pk"]
-        ).exists():
+        ).first()
+        if self._object is None:
             return False
 
         return True
@@ -74,9 +85,11 @@ class DomainInvitationPermission(PermissionsLoginMixin):
         if not self.request.user.is_authenticated:
             return False
 
-        if not DomainInvitation.objects.filter(
-            id=self.kwargs["pk"], domain__permissions__user=self.request.user
-        ).exists():
+        self._object = DomainInvitation.objects.filter(id=self.kwargs["pk"]).first()
+        if self._object is None:
+            return False
+
+        if self._object.domain_id not in self.request.user.domain_roles():
             return False
 
         return True
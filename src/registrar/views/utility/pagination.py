@@ -0,0 +1,179 @@
+"""Pagination for lists which can grow long."""
+
+import datetime
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from django.core import signing
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+# unfiltered tables with more rows than this are counted approximately
+ESTIMATE_COUNTS_ABOVE = 10000
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keep microseconds, which DjangoJSONEncoder drops; keys must be exact."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class CursorSerializer(signing.JSONSerializer):
+    """Allow dates and times in cursors."""
+
+    def dumps(self, obj):
+        return CursorEncoder(separators=(",", ":")).encode(obj).encode("latin-1")
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    next_cursor: Optional[str]
+    previous_cursor: Optional[str]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset by the last row seen instead of by page number.
+
+    With LIMIT and OFFSET the database must read and discard every row
+    before the requested page. Here a page begins with a WHERE clause on
+    the sort key, so every page costs the same. Primary key breaks ties.
+
+    `ordering` is a field (or annotation) name, optionally prefixed by "-".
+    Rows may be model instances or dicts from `values()`, but must include
+    both the ordering field and "pk".
+    """
+
+    salt = "registrar.views.utility.pagination"
+
+    def __init__(self, queryset, ordering: str, per_page: int = 20):
+        self.queryset = queryset
+        self.ordering = ordering
+        self.field = ordering.lstrip("-")
+        self.descending = ordering.startswith("-")
+        self.per_page = per_page
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        position = self._decode(cursor)
+        backwards = bool(position and position["backwards"])
+
+        queryset = self.queryset
+        if position:
+            # strictly after (or before) the row the cursor points at
+            op = "gt" if self.descending == backwards else "lt"
+            queryset = queryset.filter(
+                Q(**{f"{self.field}__{op}": position["key"]})
+                | Q(**{self.field: position["key"], f"pk__{op}": position["pk"]})
+            )
+        sign = "-" if self.descending != backwards else ""
+        queryset = queryset.order_by(sign + self.field, sign + "pk")
+
+        # one extra row tells us whether there is another page
+        rows = list(queryset[: self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if backwards:
+            rows.reverse()
+
+        has_next = more if not backwards else True
+        has_previous = more if backwards else position is not None
+        return KeysetPage(
+            object_list=rows,
+            next_cursor=self._encode(rows[-1], False) if rows and has_next else None,
+            previous_cursor=(
+                self._encode(rows[0], True) if rows and has_previous else None
+            ),
+        )
+
+    def _value(self, row, name) -> Any:
+        return row[name] if isinstance(row, dict) else getattr(row, name)
+
+    def _encode(self, row, backwards: bool) -> str:
+        return signing.dumps(
+            {
+                "key": self._value(row, self.field),
+                "pk": self._value(row, "pk"),
+                "backwards": backwards,
+                "ordering": self.ordering,
+            },
+            salt=self.salt,
+            serializer=CursorSerializer,
+        )
+
+    def _decode(self, cursor: Optional[str]) -> Optional[dict]:
+        """A tampered or stale cursor just starts again from the beginning."""
+        if not cursor:
+            return None
+        try:
+            position = signing.loads(
+                cursor, salt=self.salt, serializer=CursorSerializer
+            )
+        except signing.BadSignature:
+            return None
+        # a cursor from a differently sorted list is meaningless here
+        if position.get("ordering") != self.ordering:
+            return None
+        return position
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Page numbers, made cheaper for big tables.
+
+    Counting every row of a big table takes as long as reading it, so an
+    unfiltered count uses the planner's estimate (on PostgreSQL) once the
+    table has more than ESTIMATE_COUNTS_ABOVE rows. Filtered lists are
+    counted exactly.
+
+    Each page first reads only the primary keys it holds, from the index,
+    and then loads those rows, so a page deep in the list does not read and
+    discard every row (and every joined row) before it.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where and not queryset.query.distinct:
+            estimate = estimated_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > ESTIMATE_COUNTS_ABOVE:
+                return estimate
+        return super().count
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        pks = list(self.object_list.values_list("pk", flat=True)[bottom:top])
+        # same ordering as the keys, since the queryset's ordering is unchanged
+        rows = list(self.object_list.filter(pk__in=pks)) if pks else []
+        return self._get_page(rows, number, self)
+
+
+def estimated_count(model, using="default") -> Optional[int]:
+    """The planner's idea of how many rows `model`'s table has, if it has one."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [connection.ops.quote_name(model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    # -1 means the table has never been analyzed
+    return row[0] if row and row[0] >= 0 else None
@@ -87,7 +87,7 @@ class StepsHelper:
         if step in self.all:
             self._wizard.storage["current_step"] = step
         else:
-            logger.debug("Invalid step name %s given to StepHelper" % str(step))
+            logger.debug("Invalid step name %s given to StepHelper", step)
             self._wizard.storage["current_step"] = self.first
 
         # can't serialize a set, so keep list entries unique
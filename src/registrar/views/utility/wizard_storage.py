@@ -0,0 +1,47 @@
+import copy
+
+from registrar.models import WizardDraft
+
+
+class WizardStorage(dict):
+    """
+    A user's progress through a wizard, saved in the `WizardDraft` table.
+
+    Behaves as a dict. It is read on first use and written by `save` only if
+    something in it, nested lists included, has changed since it was read.
+    """
+
+    def __init__(self, user, prefix):
+        super().__init__()
+        self.user = user
+        self.prefix = prefix
+        self._saved = None  # as read, or last saved; None if not read yet
+
+    def load(self):
+        if self._saved is None:
+            draft = WizardDraft.objects.filter(user=self.user, prefix=self.prefix)
+            data = draft.values_list("data", flat=True).first()
+            self._saved = data or {}
+            super().clear()
+            super().update(copy.deepcopy(self._saved))
+        return self
+
+    @property
+    def changed(self) -> bool:
+        return self._saved is not None and dict(self) != self._saved
+
+    def save(self):
+        """Write any changes; an emptied draft is deleted."""
+        if not self.changed:
+            return
+        if self:
+            # one statement, whether or not the draft has been saved before
+            WizardDraft.objects.bulk_create(
+                [WizardDraft(user=self.user, prefix=self.prefix, data=dict(self))],
+                update_conflicts=True,
+                unique_fields=["user", "prefix"],
+                update_fields=["data", "updated_at"],
+            )
+        else:
+            WizardDraft.objects.filter(user=self.user, prefix=self.prefix).delete()
+        self._saved = copy.deepcopy(dict(self))